@@ -0,0 +1,127 @@
+"""
+Alert listener for the cimd_alerts channel (16_alert_notify.sql).
+The high CPU, high error rate and critical alert triggers send one NOTIFY per
+statement, summarised per server. This turns each notification into one alert
+event per server and prints it, as text or as JSON lines for a log shipper, and
+can POST the events of each notification to a webhook.
+The connection is re-opened if it drops (notifications sent meanwhile are lost;
+the rows themselves are in the tables).
+
+Run it as a service, e.g. under systemd or
+    nohup python3 alert_listener.py --json >> alerts.log &
+
+nano alert_listener.py
+python3 alert_listener.py
+python3 alert_listener.py --json
+python3 alert_listener.py --webhook https://hooks.example.com/cimd --event high_cpu --event critical_alert
+"""
+
+import argparse
+import json
+import os
+import select
+import time
+import urllib.request
+
+import psycopg2
+
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "postgres",
+    "user": "postgres",
+    "password": os.getenv("TELE_POSTGRES_PASS"),
+}
+
+CHANNEL = "cimd_alerts"
+KEEPALIVE_SECS = 60         # check the connection when nothing arrived for this long
+RECONNECT_SECS = (1, 60)    # first and longest wait before reconnecting
+
+
+def get_conn():
+    return psycopg2.connect(**DB_CONFIG)
+
+def alert_events(payload):
+    """One event per server from a notification payload."""
+    batch = json.loads(payload)
+    events = [{
+        "event": batch["event"],
+        "table": batch["table"],
+        "op": batch["op"],
+        "server_id": server["server_id"],
+        "rows": server["rows"],
+        "peak": server["peak"],
+        "last_at": server["last_at"],
+        "ids": server["ids"] or [],
+        "notified_at": batch["at"],
+    } for server in batch["servers"] or []]
+    if batch["truncated"]:
+        # Servers left out of the payload: one event for the rest of the batch.
+        rows = batch["rows"] - sum(e["rows"] for e in events)
+        events.append({"event": batch["event"], "table": batch["table"], "op": batch["op"], "server_id": None,
+                       "rows": rows, "peak": None, "last_at": None, "ids": [], "notified_at": batch["at"],
+                       "other_servers": batch["server_count"] - len(events)})
+    return events
+
+def describe(event):
+    if event["server_id"] is None:
+        return f"{event['event']}: {event['rows']:,} more rows on {event['other_servers']:,} other servers"
+    peak = f", peak {event['peak']}" if event["peak"] is not None else ""
+    ids = f" ({', '.join(event['ids'])})" if event["ids"] else ""
+    return f"{event['event']}: server {event['server_id']}, {event['rows']:,} rows{peak}, last at {event['last_at']}{ids}"
+
+def post(url, events):
+    request = urllib.request.Request(url, data=json.dumps(events).encode(),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=10):
+            pass
+    except OSError as e:
+        print(f"Webhook failed ({e}); {len(events)} events not delivered", flush=True)
+
+def listen(args):
+    conn = get_conn()
+    conn.set_session(autocommit=True)
+    with conn.cursor() as cur:
+        cur.execute(f"LISTEN {CHANNEL}")
+    print(f"Listening on {CHANNEL}", flush=True)
+    try:
+        while True:
+            if not select.select([conn], [], [], KEEPALIVE_SECS)[0]:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                events = [e for e in alert_events(notify.payload) if not args.event or e["event"] in args.event]
+                for event in events:
+                    print(json.dumps(event) if args.json else describe(event), flush=True)
+                if events and args.webhook:
+                    post(args.webhook, events)
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Turn {CHANNEL} notifications into alert events.")
+    parser.add_argument("--json", action="store_true", help="print events as JSON lines")
+    parser.add_argument("--webhook", metavar="URL", help="also POST each notification's events as a JSON list")
+    parser.add_argument("--event", action="append", choices=("high_cpu", "high_error_rate", "critical_alert"),
+                        help="only these events (repeatable, default all)")
+    args = parser.parse_args()
+
+    wait = RECONNECT_SECS[0]
+    while True:
+        started = time.monotonic()
+        try:
+            listen(args)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            if time.monotonic() - started > RECONNECT_SECS[1]:
+                wait = RECONNECT_SECS[0]
+            print(f"Connection lost ({str(e).strip()}); reconnecting in {wait}s", flush=True)
+            time.sleep(wait)
+            wait = min(wait * 2, RECONNECT_SECS[1])
+        except KeyboardInterrupt:
+            break
+
+if __name__ == "__main__":
+    main()
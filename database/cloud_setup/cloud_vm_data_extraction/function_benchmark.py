@@ -0,0 +1,201 @@
+"""
+Benchmark of the SQL functions of 18_inline_functions.sql against the plpgsql versions
+of 06_functions.sql they replaced. The old versions are created as pg_temp functions for
+the run (nothing is left behind); each case is run with EXPLAIN (ANALYZE, BUFFERS) and
+reports the median execution time, the shared buffers touched and whether the function
+was inlined into the calling query (its tables and indexes show up in the plan) or ran as
+an opaque call. Cases with no old column only exist in the new version (time windows).
+
+nano function_benchmark.py
+python3 function_benchmark.py
+python3 function_benchmark.py --server <server_id> --hours 6 --runs 11
+python3 function_benchmark.py --plans          (also print both plans of every case)
+"""
+
+import argparse
+import json
+import os
+import statistics
+
+import psycopg2
+
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "postgres",
+    "user": "postgres",
+    "password": os.getenv("TELE_POSTGRES_PASS"),
+}
+
+# As in 06_functions.sql. The two RETURNS TABLE versions fail there with "column reference
+# is ambiguous" (their OUT columns shadow the table's); use_column lets them run as meant.
+OLD_FUNCTIONS = [
+    """
+    CREATE FUNCTION pg_temp.get_avg_cpu_usage(server UUID)
+    RETURNS FLOAT AS $$
+    DECLARE avg_cpu FLOAT;
+    BEGIN
+        SELECT AVG(cpu_usage) INTO avg_cpu FROM server_metrics WHERE server_id = server;
+        RETURN avg_cpu;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE FUNCTION pg_temp.get_high_error_servers(threshold DECIMAL(5,2))
+    RETURNS TABLE(server_id UUID, error_rate DECIMAL(5,2)) AS $$
+    #variable_conflict use_column
+    BEGIN
+        RETURN QUERY
+        SELECT server_id, error_rate
+        FROM aggregated_metrics
+        WHERE error_rate > threshold;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE FUNCTION pg_temp.calculate_annual_cost(server UUID) RETURNS DECIMAL(10,2) AS $$
+    BEGIN
+        RETURN (SELECT SUM(total_monthly_cost) * 12 FROM cost_data WHERE server_id = server);
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE FUNCTION pg_temp.get_downtime_for_server(p_server_id UUID) RETURNS TABLE (
+        start_time TIMESTAMP,
+        end_time TIMESTAMP,
+        downtime_cause VARCHAR(255),
+        downtime_duration_minutes INTEGER
+    ) AS $$
+    #variable_conflict use_column
+    BEGIN
+        RETURN QUERY SELECT start_time, end_time, downtime_cause, downtime_duration_minutes
+        FROM downtime_logs WHERE server_id = p_server_id;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+# Tables each function reads: when they are scanned in the calling query's own plan, the
+# function was inlined.
+FUNCTION_TABLES = {
+    "get_avg_cpu_usage": ("server_metrics", "aggregated_metrics"),
+    "calculate_annual_cost": ("cost_data", "cost_totals"),
+    "get_high_error_servers": ("aggregated_metrics",),
+    "get_downtime_for_server": ("downtime_logs",),
+}
+# (function, case, old SQL or None, new SQL)
+CASES = [
+    ("get_avg_cpu_usage", "one server, all history",
+     "SELECT pg_temp.get_avg_cpu_usage(%(server)s)",
+     "SELECT * FROM public.get_avg_cpu_usage(%(server)s)"),
+    ("get_avg_cpu_usage", "one server, window", None,
+     "SELECT * FROM public.get_avg_cpu_usage(%(server)s, since => %(since)s)"),
+    ("get_avg_cpu_usage", "every server",
+     "SELECT s.server_id, pg_temp.get_avg_cpu_usage(s.server_id) FROM public.server s",
+     "SELECT s.server_id, c.* FROM public.server s CROSS JOIN LATERAL public.get_avg_cpu_usage(s.server_id) c"),
+    ("calculate_annual_cost", "one server",
+     "SELECT pg_temp.calculate_annual_cost(%(server)s)",
+     "SELECT * FROM public.calculate_annual_cost(%(server)s)"),
+    ("calculate_annual_cost", "one server, window", None,
+     "SELECT * FROM public.calculate_annual_cost(%(server)s, since => %(since)s)"),
+    ("calculate_annual_cost", "every server",
+     "SELECT s.server_id, pg_temp.calculate_annual_cost(s.server_id) FROM public.server s",
+     "SELECT s.server_id, c.* FROM public.server s CROSS JOIN LATERAL public.calculate_annual_cost(s.server_id) c"),
+    ("get_high_error_servers", "all hours",
+     "SELECT * FROM pg_temp.get_high_error_servers(%(threshold)s)",
+     "SELECT * FROM public.get_high_error_servers(%(threshold)s)"),
+    ("get_high_error_servers", "window", None,
+     "SELECT * FROM public.get_high_error_servers(%(threshold)s, since => %(since)s)"),
+    ("get_downtime_for_server", "one server",
+     "SELECT * FROM pg_temp.get_downtime_for_server(%(server)s)",
+     "SELECT * FROM public.get_downtime_for_server(%(server)s)"),
+    ("get_downtime_for_server", "one server, window", None,
+     "SELECT * FROM public.get_downtime_for_server(%(server)s, since => %(since)s)"),
+]
+
+
+def get_conn():
+    return psycopg2.connect(**DB_CONFIG)
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+def shape(plan, function):
+    """'inlined (indexes)' when the function's tables are scanned in the plan itself."""
+    nodes = list(plan_nodes(plan))
+    scanned = {n["Relation Name"] for n in nodes if "Relation Name" in n}
+    # A partitioned table is scanned as its partitions, <table>_p<day> and <table>_default.
+    if not any(name == table or name == f"{table}_default" or name.startswith(f"{table}_p")
+               for name in scanned for table in FUNCTION_TABLES[function]):
+        return "opaque call"
+    indexes = sorted({n["Index Name"] for n in nodes if "Index Name" in n})
+    if not indexes:
+        return "inlined, no index"
+    shown = ", ".join(indexes[:3]) + (f" +{len(indexes) - 3}" if len(indexes) > 3 else "")
+    return f"inlined ({shown})"
+
+def measure(cur, sql, params, runs):
+    """(median ms, shared buffers, plan) over `runs` EXPLAIN ANALYZE runs, after one warm-up."""
+    times = []
+    for _ in range(runs + 1):
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+        result = cur.fetchone()[0]
+        result = (result if isinstance(result, list) else json.loads(result))[0]
+        times.append(result["Execution Time"])
+    plan = result["Plan"]
+    return statistics.median(times[1:]), plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0), plan
+
+def text_plan(cur, sql, params):
+    cur.execute(f"EXPLAIN (COSTS OFF) {sql}", params)
+    return "\n".join("      " + row[0] for row in cur.fetchall())
+
+def default_server(cur):
+    cur.execute("""
+        SELECT server_id FROM public.aggregated_metrics GROUP BY server_id ORDER BY count(*) DESC LIMIT 1
+    """)
+    row = cur.fetchone()
+    if not row:
+        cur.execute("SELECT server_id FROM public.server ORDER BY server_id LIMIT 1")
+        row = cur.fetchone()
+    return row[0] if row else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the 18_inline_functions.sql functions with the 06 versions.")
+    parser.add_argument("--server", help="server_id for the one-server cases (default: the one with most hourly rows)")
+    parser.add_argument("--hours", type=int, default=24, help="window of the window cases, back from now")
+    parser.add_argument("--threshold", type=float, default=5.00, help="get_high_error_servers threshold")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per case (the median is reported)")
+    parser.add_argument("--plans", action="store_true", help="print the old and new plan of every case")
+    args = parser.parse_args()
+
+    with get_conn() as conn, conn.cursor() as cur:
+        for ddl in OLD_FUNCTIONS:
+            cur.execute(ddl)
+        cur.execute("SELECT now()::TIMESTAMP - make_interval(hours => %s)", (args.hours,))
+        since = cur.fetchone()[0]
+        params = {"server": args.server or default_server(cur), "since": since, "threshold": args.threshold}
+        if params["server"] is None:
+            raise SystemExit("public.server is empty; seed it first (seed_reference_data.py --only server)")
+        print(f"server {params['server']}, window since {params['since']:%Y-%m-%d %H:%M}, "
+              f"median of {args.runs} runs", flush=True)
+
+        function = None
+        for name, case, old_sql, new_sql in CASES:
+            if name != function:
+                function = name
+                print(f"--- {name} ---", flush=True)
+            for version, sql in (("old", old_sql), ("new", new_sql)):
+                label = case if version == "old" or old_sql is None else ""
+                if sql is None:
+                    continue
+                ms, buffers, plan = measure(cur, sql, params, args.runs)
+                print(f"  {label:<24} {version}  {ms:9.3f} ms  {buffers:8,} buffers  "
+                      f"{shape(plan, name)}", flush=True)
+                if args.plans:
+                    print(text_plan(cur, sql, params), flush=True)
+        conn.rollback()
+
+if __name__ == "__main__":
+    main()
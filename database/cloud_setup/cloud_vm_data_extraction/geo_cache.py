@@ -0,0 +1,83 @@
+"""
+Lazy, offline-friendly city reference data for the mock generators.
+uszipcode's SearchEngine opens (and may download) a large SQLite database, so it is
+only touched the first time city data is actually needed. The result is cached as a
+compact .npz of name/state/lat/lng arrays; every later run loads that file in
+milliseconds. With no cache and no uszipcode (or no network), the cities seeded by
+seed_locations_and_servers.py are used instead, so generation still works offline.
+
+nano geo_cache.py
+python3 geo_cache.py   (build the cache once while online)
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+MIN_POPULATION = 10000
+MAX_CITIES = 10000
+CACHE_PATH = Path(os.getenv("CIMD_CITY_CACHE", Path(__file__).resolve().parent / ".geo_cache" / "cities.npz"))
+
+_cities = None
+
+
+def _from_uszipcode(min_population, max_cities):
+    from uszipcode import SearchEngine
+
+    search = SearchEngine()
+    rows = [
+        (z.major_city, z.state, z.lat, z.lng)
+        for z in search.by_population(lower=min_population, returns=max_cities)
+        if z.major_city and z.lat is not None and z.lng is not None
+    ]
+    return _to_arrays(rows)
+
+def _from_seeded_locations():
+    from seed_locations_and_servers import LOCATION_DATA
+
+    return _to_arrays([(loc["city"], loc["region"], loc["lat"], loc["lng"]) for loc in LOCATION_DATA])
+
+def _to_arrays(rows):
+    names, states, lats, lngs = zip(*rows)
+    return {
+        "name": np.array(names, dtype=str),
+        "state": np.array(states, dtype=str),
+        "lat": np.array(lats, dtype=np.float32),
+        "lng": np.array(lngs, dtype=np.float32),
+    }
+
+def save_cities(cities, path=CACHE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+    np.savez_compressed(tmp, **cities)
+    os.replace(tmp, path)
+
+def load_cities(path=CACHE_PATH, min_population=MIN_POPULATION, max_cities=MAX_CITIES):
+    """Return {"name", "state", "lat", "lng"} arrays, building the cache on first use."""
+    global _cities
+    if _cities is not None:
+        return _cities
+    path = Path(path)
+    if path.exists():
+        with np.load(path, allow_pickle=False) as data:
+            _cities = {k: data[k] for k in data.files}
+        return _cities
+    try:
+        _cities = _from_uszipcode(min_population, max_cities)
+        save_cities(_cities, path)
+    except Exception as e:
+        print(f"uszipcode unavailable ({e}); using seeded locations", flush=True)
+        _cities = _from_seeded_locations()
+    return _cities
+
+def sample_cities(rng, n):
+    """n cities as a dict of arrays, drawn with a numpy Generator."""
+    cities = load_cities()
+    idx = rng.integers(0, len(cities["name"]), n)
+    return {k: v[idx] for k, v in cities.items()}
+
+if __name__ == "__main__":
+    cities = load_cities()
+    print(f"{len(cities['name']):,} cities cached at {CACHE_PATH}", flush=True)
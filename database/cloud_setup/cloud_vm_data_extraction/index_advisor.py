@@ -0,0 +1,655 @@
+"""
+Index advisor. Replays the workload - the queries in 08_queries.sql, the views of
+05_views.sql and any others in the database, and the most expensive statements in
+pg_stat_statements (when the extension is loaded) - through EXPLAIN, and proposes
+index changes:
+  * add: composite indexes (equality columns, then the range or ORDER BY columns), partial
+    indexes for constant filters on low-cardinality columns (WHERE status = 'OPEN'), and
+    covering indexes (INCLUDE) when a query reads only a few more columns;
+  * drop: indexes never scanned since the statistics were reset (pg_stat_user_indexes),
+    single-column indexes on low-cardinality columns (replaced by a partial index when
+    the workload reads them), and indexes that are a prefix of another one.
+Each candidate is costed by re-planning the queries it came from with the index in
+place - hypothetically with hypopg when it is installed, or, with --try-build, by
+building it in a transaction that is rolled back (this locks the table against writes
+while it builds). The report ends with the effect on write cost per table: index
+entries written per inserted row and index growth per day, before and after.
+
+Nothing is changed; --sql writes the proposals as a migration to review
+(13_index_recommendations.sql is the set applied for the reference workload).
+
+nano index_advisor.py
+python3 index_advisor.py
+python3 index_advisor.py --try-build --sql proposed_indexes.sql
+"""
+
+import argparse
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+import psycopg2
+
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "postgres",
+    "user": "postgres",
+    "password": os.getenv("TELE_POSTGRES_PASS"),
+}
+
+SQL_DIR = Path(__file__).resolve().parents[2] / "sql_scripts"
+QUERIES_FILE = SQL_DIR / "08_queries.sql"
+VIEWS_FILE = SQL_DIR / "05_views.sql"
+STATEMENTS_LIMIT = 50      # most expensive pg_stat_statements entries replayed
+LOW_CARDINALITY = 20       # columns with at most this many distinct values suit partial indexes, not keys
+MAX_INCLUDE = 3            # extra columns a covering index may carry
+MIN_GAIN = 0.2             # a costed candidate must cut its queries' planned cost by 20%
+MAX_LOSS = 0.1             # ... unless it replaces a low-cardinality index, and plans at most 10% worse
+MIN_STATS_DAYS = 7         # idx_scan = 0 over a shorter window proves nothing
+ENTRY_OVERHEAD = 16        # bytes per b-tree entry besides the key: tuple header, line pointer, alignment
+
+RANGE_OPS = {"<", "<=", ">", ">="}
+SCANS = ("Seq Scan", "Parallel Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan")
+KEEPS_ORDER = ("Limit", "Sort", "Incremental Sort", "Unique", "Append", "Merge Append", "Gather",
+               "Gather Merge", "Result")
+# Identifiers and times are always index keys, however few values a small table has so far.
+KEY_TYPES = ("uuid", "inet", "cidr", "timestamp", "date")
+CONJUNCT = re.compile(r'^\(*"?(\w+)"?\)?(?:::[\w ]+(?:\[\])?)?\s*(=|<>|<=|>=|<|>)\s*(ANY\s*)?(.+)$', re.S)
+
+
+def get_conn():
+    return psycopg2.connect(**DB_CONFIG)
+
+# --- WORKLOAD ---
+
+def file_workload(path):
+    """(label, sql, weight) per statement of a .sql file, labelled by the comment above it.
+    CREATE VIEW statements contribute their query."""
+    workload, label, lines = [], None, []
+    for line in path.read_text().splitlines():
+        stripped = line.strip()
+        if stripped.startswith("--"):
+            if not lines:
+                label = stripped.lstrip("- ").strip()
+            continue
+        if stripped:
+            lines.append(line)
+        if stripped.endswith(";"):
+            sql = "\n".join(lines).rstrip(";")
+            view = re.match(r"CREATE\s+(?:OR\s+REPLACE\s+)?VIEW\s+(\w+)\s+AS\s+(.*)$", sql, re.S | re.I)
+            if view:
+                workload.append((f"view {view.group(1)}", view.group(2), 1))
+            elif not re.match(r"\s*(CREATE|ALTER|DROP|INSERT|UPDATE|DELETE)\b", sql, re.I):
+                workload.append((label or lines[0].strip(), sql, 1))
+            label, lines = None, []
+    return workload
+
+def view_workload(cur, known):
+    """Views in the database that the views file doesn't define."""
+    cur.execute("SELECT viewname FROM pg_views WHERE schemaname = 'public' ORDER BY 1")
+    return [(f"view {name}", f'SELECT * FROM public."{name}"', 1) for (name,) in cur.fetchall()
+            if f"view {name}" not in known]
+
+def statement_workload(cur):
+    """Top SELECTs by total time, weighted by calls; [] without pg_stat_statements."""
+    cur.execute("SELECT to_regclass('pg_stat_statements') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return []
+    try:
+        cur.execute("""
+            SELECT query, calls FROM pg_stat_statements
+            WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+              AND query ~* '^\\s*(with|select)' AND query !~* 'pg_catalog|pg_stat'
+            ORDER BY total_exec_time DESC LIMIT %s
+        """, (STATEMENTS_LIMIT,))
+    except psycopg2.Error:       # installed but not in shared_preload_libraries
+        cur.connection.rollback()
+        return []
+    return [(f"pg_stat_statements ({calls:,} calls)", query, calls) for query, calls in cur.fetchall()]
+
+# --- PLANS ---
+
+class Catalog:
+    """Table facts the advisor needs: columns, row counts, statistics, partitions."""
+
+    def __init__(self, cur):
+        cur.execute("""
+            SELECT c.relname, GREATEST(c.reltuples, 0)::BIGINT + COALESCE(
+                   (SELECT sum(GREATEST(p.reltuples, 0))::BIGINT FROM pg_inherits i JOIN pg_class p ON p.oid = i.inhrelid
+                    WHERE i.inhparent = c.oid), 0)
+            FROM pg_class c WHERE c.relnamespace = 'public'::regnamespace AND c.relkind IN ('r', 'p')
+        """)
+        self.rows = dict(cur.fetchall())
+        cur.execute("""
+            SELECT c.relname, p.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relkind = 'p' AND p.relnamespace = 'public'::regnamespace
+        """)
+        self.parent = dict(cur.fetchall())
+        cur.execute("""
+            SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod) FROM pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid
+            WHERE c.relnamespace = 'public'::regnamespace AND c.relkind IN ('r', 'p') AND a.attnum > 0 AND NOT a.attisdropped
+            ORDER BY c.relname, a.attnum
+        """)
+        self.columns = {}
+        for table, column, type_name in cur.fetchall():
+            self.columns.setdefault(table, {})[column] = type_name
+        # Statistics of partitioned tables are kept on the parent (inherited = true).
+        cur.execute("""
+            SELECT DISTINCT ON (tablename, attname) tablename, attname, n_distinct, avg_width
+            FROM pg_stats WHERE schemaname = 'public' ORDER BY tablename, attname, inherited DESC
+        """)
+        self.stats = {(t, c): (n_distinct, width) for t, c, n_distinct, width in cur.fetchall()}
+        cur.execute("""
+            SELECT i.relname, a.attname, (x.indoption[k.n - 1] & 1) = 1 FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            CROSS JOIN LATERAL unnest(x.indkey[:x.indnkeyatts - 1]) WITH ORDINALITY k(attnum, n)
+            JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = k.attnum
+            WHERE i.relnamespace = 'public'::regnamespace ORDER BY i.relname, k.n
+        """)
+        self.index_keys = {}
+        for index, column, desc in cur.fetchall():
+            self.index_keys.setdefault(index, []).append((column, desc))
+        cur.execute("""
+            SELECT c.relname, p.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relkind = 'I' AND p.relnamespace = 'public'::regnamespace
+        """)
+        self.index_parent = dict(cur.fetchall())
+
+    def low_cardinality_index(self, index, table):
+        """index if it is a single-column index on a low-cardinality column of table."""
+        index = self.index_parent.get(index, index)
+        keys = self.index_keys.get(index, [])
+        return index if len(keys) == 1 and self.low_cardinality(table, keys[0][0]) else None
+
+    def table(self, relation):
+        return self.parent.get(relation, relation)
+
+    def distinct(self, table, column):
+        if self.columns.get(table, {}).get(column) == "boolean":
+            return 2
+        n_distinct = self.stats.get((table, column), (None, None))[0]
+        if n_distinct is None:
+            return None
+        return n_distinct if n_distinct > 0 else -n_distinct * max(self.rows.get(table, 0), 1)
+
+    def low_cardinality(self, table, column):
+        if self.columns.get(table, {}).get(column, "").startswith(KEY_TYPES):
+            return False
+        n = self.distinct(table, column)
+        return n is not None and n <= LOW_CARDINALITY and n * 10 <= self.rows.get(table, 0)
+
+    def width(self, table, columns):
+        return sum(self.stats.get((table, c), (None, 8))[1] or 8 for c in columns) + ENTRY_OVERHEAD
+
+def explain(cur, sql, generic=False):
+    """Planned JSON for sql, or the error that kept it from planning."""
+    options = "VERBOSE, FORMAT JSON, GENERIC_PLAN" if generic else "VERBOSE, FORMAT JSON"
+    cur.execute("SAVEPOINT advisor_explain")
+    try:
+        cur.execute(f"EXPLAIN ({options}) {sql}")
+        plan = cur.fetchone()[0]
+        cur.execute("RELEASE SAVEPOINT advisor_explain")
+        return (plan if isinstance(plan, list) else json.loads(plan))[0]["Plan"], None
+    except psycopg2.Error as exc:
+        cur.execute("ROLLBACK TO SAVEPOINT advisor_explain")
+        return None, str(exc).strip().splitlines()[0]
+
+def unqualify(text):
+    """Drop table qualifiers (server_metrics_1."timestamp" -> "timestamp"), outside string literals."""
+    parts = re.split(r"('[^']*')", text)
+    return "".join(p if p.startswith("'") else re.sub(r'(?<![\w."])"?[A-Za-z_]\w*"?\.(?=["A-Za-z_])', "", p)
+                   for p in parts)
+
+def split_and(expr):
+    """Top-level AND conjuncts of a deparsed filter."""
+    expr = expr.strip()
+    while expr.startswith("(") and expr.endswith(")") and balanced(expr[1:-1]):
+        expr = expr[1:-1].strip()
+    parts, depth, start, quoted = [], 0, 0, False
+    for i, ch in enumerate(expr):
+        if ch == "'":
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and expr.startswith(" AND ", i):
+            parts.append(expr[start:i])
+            start = i + 5
+    parts.append(expr[start:])
+    return [p.strip() for p in parts]
+
+def balanced(text):
+    depth = 0
+    for ch in re.sub(r"'[^']*'", "", text):
+        depth += (ch == "(") - (ch == ")")
+        if depth < 0:
+            return False
+    return depth == 0
+
+def strip_parens(text):
+    while text.startswith("(") and text.endswith(")") and balanced(text[1:-1]):
+        text = text[1:-1].strip()
+    return text
+
+class Access:
+    """How one query reads one table: its filter conjuncts, sort keys and output columns."""
+
+    def __init__(self, label, table, weight):
+        self.label, self.table, self.weight = label, table, weight
+        self.equal, self.ranges, self.partial, self.sort, self.output = [], [], [], [], set()
+        self.replaces = None
+
+def accesses(plan, label, weight, catalog):
+    """Scans an index would serve better - sequential scans, and index scans that still filter
+    rows or feed a sort - with the ORDER BY keys that sit above them."""
+    found = {}
+
+    def visit(node, sort_keys, ordered):
+        kind = node["Node Type"]
+        if kind in ("Sort", "Incremental Sort"):
+            sort_keys = node.get("Sort Key", [])
+        ordered = ordered or kind in ("Limit", "Unique")
+        if kind == "Bitmap Heap Scan" and node.get("Plans"):
+            node = dict(node, **{"Index Name": node["Plans"][0].get("Index Name")})
+        if kind in SCANS and node.get("Relation Name"):
+            low = catalog.low_cardinality_index(node.get("Index Name"), catalog.table(node["Relation Name"]))
+            if kind.endswith("Seq Scan") or node.get("Filter") or sort_keys or low:
+                scan(node, sort_keys, ordered)
+            return
+        for child in node.get("Plans", []):
+            visit(child, sort_keys if kind in KEEPS_ORDER else [], ordered and kind in KEEPS_ORDER)
+
+    def scan(node, sort_keys, ordered):
+        table = catalog.table(node["Relation Name"])
+        access = found.get(table) or Access(label, table, weight)
+        columns = catalog.columns.get(table, {})
+        access.output |= {unqualify(o).strip('"') for o in node.get("Output", [])} & set(columns)
+        if sort_keys and not access.sort:
+            keys = [unqualify(k) for k in sort_keys]
+            names = [strip_parens(k.rsplit(" DESC", 1)[0]).strip('"') for k in keys]
+            if all(n in columns for n in names):
+                access.sort = [(n, k.endswith(" DESC")) for n, k in zip(names, keys)]
+        elif ordered and not access.sort and node.get("Index Name"):
+            # The rows come out in the order of the index the plan walks (LIMIT / DISTINCT ON on top).
+            backward = node.get("Scan Direction") == "Backward"
+            access.sort = [(c, desc != backward) for c, desc in catalog.index_keys.get(node["Index Name"], [])]
+        access.replaces = access.replaces or catalog.low_cardinality_index(node.get("Index Name"), table)
+        # Partitions repeat the same conditions; classify them once.
+        if table not in found:
+            for condition in ("Index Cond", "Recheck Cond", "Filter"):
+                if node.get(condition):
+                    classify(access, unqualify(node[condition]), catalog)
+        found[table] = access
+
+    visit(plan, [], False)
+    return [a for a in found.values() if a.equal or a.ranges or a.partial or a.sort]
+
+def used_indexes(plan, catalog):
+    """Indexes (partitioned parents for partition indexes) a plan reads."""
+    used = {catalog.index_parent.get(plan.get("Index Name"), plan.get("Index Name"))} - {None}
+    for child in plan.get("Plans", []):
+        used |= used_indexes(child, catalog)
+    return used
+
+def conjunct_column(text):
+    text = strip_parens(text)
+    match = CONJUNCT.match(text)
+    return match.group(1) if match else text.removeprefix("NOT ").strip('"() ')
+
+def classify(access, filter_text, catalog):
+    columns = catalog.columns.get(access.table, {})
+    for conjunct in split_and(filter_text):
+        text = strip_parens(conjunct)
+        bare = text[4:].strip("() ") if text.startswith("NOT ") else text
+        if bare.strip('"') in columns:                                  # boolean column
+            access.partial.append(text)
+            continue
+        match = CONJUNCT.match(text)
+        if not match:
+            continue
+        column, op, is_any, rhs = match.groups()
+        rhs_columns = set(re.findall(r"\b(\w+)\b", re.sub(r"'[^']*'", "", rhs))) & set(columns)
+        if column not in columns or rhs_columns:
+            continue
+        constant = "now()" not in rhs
+        if catalog.low_cardinality(access.table, column) and op in ("=", "<>"):
+            access.partial.append(text)
+        elif op == "=" and not is_any:
+            access.equal.append(column)
+        elif op in RANGE_OPS:
+            # A fixed threshold (cpu_usage > 85) marks a hot subset; a moving one (now() - ...) is a key.
+            if constant and access.sort:
+                access.partial.append(text)
+            else:
+                access.ranges.append(column)
+
+# --- CANDIDATES ---
+
+class Index:
+    def __init__(self, table, keys, include=(), predicate=None, name=None, definition=None):
+        self.table, self.keys, self.include, self.predicate = table, list(keys), list(include), predicate
+        self.name = name or self.default_name()
+        self.definition = definition or self.default_definition()
+        self.queries, self.gain, self.scans, self.size, self.reason = [], None, None, None, ""
+        self.replaces = None
+
+    def default_name(self):
+        name = f"idx_{self.table}_{'_'.join(k for k, _ in self.keys)}"
+        if self.predicate:
+            filtered = dict.fromkeys(conjunct_column(c) for c in split_and(self.predicate))
+            name += "_where_" + "_".join(filtered)
+        return name[:63]
+
+    def default_definition(self):
+        keys = ", ".join(f'"{k}"' + (" DESC" if desc else "") for k, desc in self.keys)
+        include = f" INCLUDE ({', '.join(self.include)})" if self.include else ""
+        where = f" WHERE {self.predicate}" if self.predicate else ""
+        return f"CREATE INDEX IF NOT EXISTS {self.name} ON public.{self.table} ({keys}){include}{where}"
+
+    def key_names(self):
+        return [k for k, _ in self.keys]
+
+def candidate(access, catalog):
+    keys = [(c, False) for c in dict.fromkeys(access.equal)]
+    if access.sort and all(c not in dict(keys) for c, _ in access.sort):
+        keys += access.sort
+    elif access.ranges:
+        keys.append((access.ranges[0], False))
+    predicate = " AND ".join(sorted(set(access.partial))) or None
+    if not keys:
+        if not predicate:
+            return None
+        # Only a constant filter: index the rows that pass it by their first filtered column.
+        keys = [(conjunct_column(access.partial[0]), False)]
+    extra = sorted(access.output - {k for k, _ in keys})
+    total = len(catalog.columns.get(access.table, {}))
+    include = extra if extra and len(extra) <= MAX_INCLUDE and len(access.output) < total else []
+    index = Index(access.table, keys, include, predicate)
+    index.replaces = access.replaces if predicate else None
+    return index
+
+def existing_indexes(cur):
+    """Indexes of public tables, partitioned ones counted over all their partitions."""
+    cur.execute("""
+        SELECT i.relname, t.relname, pg_get_indexdef(i.oid), x.indisunique OR x.indisprimary,
+               pg_get_expr(x.indpred, x.indrelid),
+               ARRAY(SELECT a.attname FROM generate_series(0, x.indnkeyatts - 1) n JOIN pg_attribute a
+                     ON a.attrelid = x.indrelid AND a.attnum = x.indkey[n] ORDER BY n)::TEXT[],
+               -- bit 0 of indoption is DESC, one entry per key column
+               ARRAY(SELECT x.indoption[n] & 1 = 1 FROM generate_series(0, x.indnkeyatts - 1) n
+                     WHERE x.indkey[n] <> 0 ORDER BY n),
+               ARRAY(SELECT a.attname FROM generate_series(x.indnkeyatts, x.indnatts - 1) n JOIN pg_attribute a
+                     ON a.attrelid = x.indrelid AND a.attnum = x.indkey[n] ORDER BY n)::TEXT[],
+               COALESCE(s.idx_scan, 0) + COALESCE((SELECT sum(cs.idx_scan) FROM pg_inherits h
+                   JOIN pg_stat_user_indexes cs ON cs.indexrelid = h.inhrelid WHERE h.inhparent = i.oid), 0),
+               pg_relation_size(i.oid) + COALESCE((SELECT sum(pg_relation_size(h.inhrelid)) FROM pg_inherits h
+                   WHERE h.inhparent = i.oid), 0),
+               EXISTS (SELECT 1 FROM pg_constraint f WHERE f.conrelid = t.oid AND f.contype = 'f'
+                       AND f.conkey[1] = x.indkey[0]),
+               i.relkind = 'I' OR NOT EXISTS (SELECT 1 FROM pg_inherits h WHERE h.inhrelid = i.oid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid JOIN pg_class t ON t.oid = x.indrelid
+        LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = i.oid
+        WHERE t.relnamespace = 'public'::regnamespace AND t.relkind IN ('r', 'p')
+        ORDER BY t.relname, i.relname
+    """)
+    indexes = []
+    for name, table, definition, unique, predicate, keys, desc, include, scans, size, fk, top in cur.fetchall():
+        if not top:
+            continue
+        index = Index(table, list(zip(keys, desc)), include, predicate, name, definition)
+        index.unique, index.scans, index.size, index.fk = unique, int(scans), int(size), fk
+        indexes.append(index)
+    return indexes
+
+def normalized(predicate):
+    """Comparable form of a predicate: no casts or parentheses, booleans spelled out, sorted."""
+    if not predicate:
+        return None
+    conjuncts = []
+    for c in split_and(predicate):
+        c = re.sub(r"::[\w ]+(\[\])?", "", strip_parens(c)).replace("(", "").replace(")", "")
+        c = re.sub(r"^NOT (\w+)$", r"\1 = false", c.strip())
+        c = re.sub(r"^(\w+)$", r"\1 = true", c)
+        # ARRAY['a', 'b'] and '{a,b}' are the same list
+        c = re.sub(r"ARRAY\[([^\]]*)\]", lambda m: "'{" + m.group(1).replace("'", "").replace(" ", "") + "}'", c)
+        conjuncts.append(" ".join(c.lower().split()))
+    return " AND ".join(sorted(conjuncts))
+
+def implies(predicate, index_predicate):
+    """True if every row matching predicate is in an index with index_predicate."""
+    if not index_predicate:
+        return True
+    if not predicate:
+        return False
+    have = normalized(predicate).split(" AND ")
+    def values(conjunct):
+        m = re.match(r"^(\w+) = (?:any '\{(.*)\}'|'(.*)')$", conjunct)
+        return (m.group(1), set((m.group(2) or m.group(3)).split(","))) if m else (None, None)
+    for need in normalized(index_predicate).split(" AND "):
+        column, allowed = values(need)
+        if need not in have and not (column and any(values(c)[0] == column and values(c)[1] <= allowed
+                                                    for c in have)):
+            return False
+    return True
+
+def covered(new, indexes):
+    """An existing index that already serves new (its predicate implied by new's, new's keys as its prefix)."""
+    for old in indexes:
+        if old.table == new.table and implies(new.predicate, old.predicate) \
+                and (normalized(old.predicate) == normalized(new.predicate) or not new.include) \
+                and old.key_names()[:len(new.keys)] == new.key_names() \
+                and set(new.include) <= set(old.key_names() + old.include):
+            return old
+    return None
+
+def stats_since(cur):
+    cur.execute("""
+        SELECT COALESCE((SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()),
+                        pg_postmaster_start_time())
+    """)
+    return cur.fetchone()[0]
+
+def drop_candidates(indexes, catalog, proposed, since, used):
+    drops = []
+    replaced = {i.replaces: i for i in proposed if i.replaces}
+    for index in indexes:
+        if index.unique:
+            continue
+        if index.name in replaced:
+            index.reason = f"replaced by the partial {replaced[index.name].name}"
+            drops.append(index)
+            continue
+        keys = index.key_names()
+        superset = next((o for o in indexes + proposed if o is not index and o.table == index.table
+                         and normalized(o.predicate) == normalized(index.predicate) and len(o.keys) > len(keys)
+                         and o.key_names()[:len(keys)] == keys), None)
+        if superset is not None:
+            index.reason = f"prefix of {superset.name}"
+        elif index.fk or index.name in used:
+            continue            # backs a foreign key check / cascading delete, or the workload reads it
+        elif index.scans == 0 and (datetime.now(since.tzinfo) - since).days >= MIN_STATS_DAYS:
+            index.reason = f"never scanned since {since:%Y-%m-%d %H:%M}"
+        elif len(keys) == 1 and not index.predicate and catalog.low_cardinality(index.table, keys[0]):
+            index.reason = f"{keys[0]} has only {catalog.distinct(index.table, keys[0]):.0f} distinct values"
+        else:
+            continue
+        drops.append(index)
+    return drops
+
+# --- COSTING ---
+
+def hypopg_available(cur):
+    cur.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'hypopg')")
+    return cur.fetchone()[0]
+
+def plan_cost(cur, sql, generic):
+    plan, _ = explain(cur, sql, generic)
+    return plan["Total Cost"] if plan else None
+
+def cost_candidate(cur, index, workload, mode):
+    """Weighted planned-cost reduction of the candidate's queries, or None if it can't be costed."""
+    before = {label: plan_cost(cur, *workload[label][::2]) for label in index.queries}
+    cur.execute("SAVEPOINT advisor_candidate")
+    try:
+        if mode == "hypopg":
+            cur.execute("SELECT * FROM hypopg_create_index(%s)", (index.definition.replace(" IF NOT EXISTS", ""),))
+        else:
+            cur.execute(index.definition)
+        after = {label: plan_cost(cur, *workload[label][::2]) for label in index.queries}
+    except psycopg2.Error as exc:
+        index.reason = str(exc).strip().splitlines()[0]
+        after = {}
+    finally:
+        cur.execute("ROLLBACK TO SAVEPOINT advisor_candidate")
+        if mode == "hypopg":
+            cur.execute("SELECT hypopg_reset()")
+    costed = [q for q in index.queries if before.get(q) and after.get(q)]
+    total_before = sum(workload[q][1] * before[q] for q in costed)
+    total_after = sum(workload[q][1] * after[q] for q in costed)
+    return None if not total_before else 1 - total_after / total_before
+
+def row_fraction(cur, catalog, index):
+    """Share of a table's rows an index holds entries for (1 unless partial)."""
+    if not index.predicate or not catalog.rows.get(index.table):
+        return 1.0
+    plan, _ = explain(cur, f"SELECT 1 FROM public.{index.table} WHERE {index.predicate}")
+    return min(1.0, plan["Plan Rows"] / catalog.rows[index.table]) if plan else 1.0
+
+def write_rates(cur):
+    """Rows written per day (inserts and non-HOT updates, which touch every index) per table."""
+    cur.execute("""
+        SELECT COALESCE(p.relname, c.relname),
+               sum(s.n_tup_ins + s.n_tup_upd - s.n_tup_hot_upd)
+               / GREATEST(EXTRACT(EPOCH FROM now() - COALESCE(
+                     (SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()),
+                     pg_postmaster_start_time())) / 86400, 1.0 / 24)
+        FROM pg_stat_user_tables s JOIN pg_class c ON c.oid = s.relid
+        LEFT JOIN pg_inherits i ON i.inhrelid = c.oid LEFT JOIN pg_class p ON p.oid = i.inhparent AND p.relkind = 'p'
+        WHERE s.schemaname = 'public' GROUP BY 1
+    """)
+    return {table: float(rate) for table, rate in cur.fetchall()}
+
+def write_cost(cur, catalog, indexes, adds, drops):
+    """Per changed table: (entries per row before, after, bytes/day before, after)."""
+    rates = write_rates(cur)
+    dropped = {d.name for d in drops}
+    report = {}
+    for table in sorted({i.table for i in adds + drops}):
+        before = [i for i in indexes if i.table == table]
+        after = [i for i in before if i.name not in dropped] + [i for i in adds if i.table == table]
+        entries = {}
+        for i in set(before + after):
+            entries[i.name] = (row_fraction(cur, catalog, i), catalog.width(table, i.key_names() + i.include))
+        rate = rates.get(table, 0.0)
+        per_row = [sum(entries[i.name][0] for i in group) for group in (before, after)]
+        per_day = [rate * sum(entries[i.name][0] * entries[i.name][1] for i in group) for group in (before, after)]
+        report[table] = (per_row[0], per_row[1], per_day[0], per_day[1])
+    return report
+
+# --- REPORT ---
+
+def write_sql(path, adds, drops):
+    lines = [f"-- Proposed by index_advisor.py on {datetime.now():%Y-%m-%d %H:%M}. Review before applying.",
+             "", "BEGIN;", ""]
+    lines += [f"-- {', '.join(i.queries)}\n{i.definition};" for i in adds]
+    lines += [f"-- {i.reason}\nDROP INDEX IF EXISTS public.{i.name};" for i in drops]
+    lines += ["", "COMMIT;", ""]
+    Path(path).write_text("\n".join(lines))
+    print(f"Wrote {len(adds)} CREATE and {len(drops)} DROP statements to {path}", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Propose index additions and drops for the workload.")
+    parser.add_argument("--queries", type=Path, default=QUERIES_FILE, help="workload .sql file (08_queries.sql)")
+    parser.add_argument("--views", type=Path, default=VIEWS_FILE, help="view definitions (05_views.sql)")
+    parser.add_argument("--try-build", action="store_true",
+                        help="without hypopg, cost candidates by building them in a rolled-back transaction")
+    parser.add_argument("--sql", metavar="FILE", help="write the proposals as a migration")
+    args = parser.parse_args()
+
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT current_setting('server_version_num')::INT >= 160000")
+        has_generic_plan = cur.fetchone()[0]
+        statements = file_workload(args.queries) + file_workload(args.views)
+        statements += view_workload(cur, {label for label, _, _ in statements}) + statement_workload(cur)
+        catalog = Catalog(cur)
+
+        # label -> (sql, weight, plan generically); labels are numbered, comments repeat
+        print(f"--- WORKLOAD: {len(statements)} statements ---", flush=True)
+        workload, found, used = {}, [], set()
+        for i, (label, sql, weight) in enumerate(statements, 1):
+            label = f"{label} [{i}]"
+            generic = bool(re.search(r"\$\d", sql))
+            if generic and not has_generic_plan:
+                print(f"  skipped {label}: parameterized, needs PostgreSQL 16 to plan", flush=True)
+                continue
+            plan, error = explain(cur, sql, generic)
+            if plan is None:
+                print(f"  skipped {label}: {error}", flush=True)
+                continue
+            workload[label] = (sql, weight, generic)
+            found += accesses(plan, label, weight, catalog)
+            used |= used_indexes(plan, catalog)
+
+        indexes = existing_indexes(cur)
+        adds = {}
+        for access in found:
+            index = candidate(access, catalog)
+            if index is None or covered(index, indexes):
+                continue
+            adds.setdefault(index.definition, index).queries.append(access.label)
+        adds = list(adds.values())
+        names = {}
+        for index in adds:
+            n = names[index.name] = names.get(index.name, 0) + 1
+            if n > 1:
+                index.name = f"{index.name[:60]}_{n}"
+                index.definition = index.default_definition()
+
+        mode = "hypopg" if hypopg_available(cur) else "build" if args.try_build else None
+        kept = []
+        for index in adds:
+            if mode:
+                index.gain = cost_candidate(cur, index, workload, mode)
+                floor = -MAX_LOSS if index.replaces else MIN_GAIN
+                if index.gain is None or index.gain < floor:
+                    continue
+            kept.append(index)
+
+        since = stats_since(cur)
+        drops = drop_candidates(indexes, catalog, kept, since, used)
+        costs = write_cost(cur, catalog, indexes, kept, drops)
+        conn.rollback()
+
+    print(f"--- ADD ({len(kept)}) ---", flush=True)
+    if not mode:
+        print("  (not costed: install hypopg or pass --try-build)", flush=True)
+    for index in kept:
+        gain = f"{index.gain:.0%} cheaper" if index.gain is not None else "not costed"
+        if index.replaces:
+            gain += f", replaces {index.replaces}"
+        print(f"  {index.definition}\n      {gain}: {'; '.join(index.queries)}", flush=True)
+    print(f"--- DROP ({len(drops)}) ---", flush=True)
+    if (datetime.now(since.tzinfo) - since).days < MIN_STATS_DAYS:
+        print(f"  (statistics only go back to {since:%Y-%m-%d %H:%M}: unused indexes are not judged "
+              f"before {MIN_STATS_DAYS} days)", flush=True)
+    for index in drops:
+        print(f"  {index.name} on {index.table} ({index.size / 1e6:,.1f} MB, {index.scans:,} scans): "
+              f"{index.reason}", flush=True)
+    print("--- WRITE COST ---", flush=True)
+    for table, (rows_before, rows_after, bytes_before, bytes_after) in costs.items():
+        print(f"  {table}: {rows_before:.2f} -> {rows_after:.2f} index entries per written row, "
+              f"{bytes_before / 1e6:,.1f} -> {bytes_after / 1e6:,.1f} MB/day of index growth", flush=True)
+
+    if args.sql:
+        write_sql(args.sql, kept, drops)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Keyset-paginated log and access pages for the log viewers (14_keyset_pagination.sql).
+Each helper returns (rows, cursor): the rows as dicts, newest first, and the cursor to
+pass as `before` for the next, older page (None when there are no more rows). A page
+is one index range scan whatever its depth - there is no OFFSET to walk through.
+
+    with get_conn() as conn:
+        rows, cursor = recent_errors(conn, server_id=server)
+        while cursor:
+            rows, cursor = recent_errors(conn, server_id=server, before=cursor)
+
+`before` may also be a datetime alone, to start at the rows older than it.
+
+nano log_pages.py
+python3 log_pages.py errors --level CRITICAL --pages 3
+python3 log_pages.py access --server <server_id> --type READ --type EXECUTE
+python3 log_pages.py sensitive --before 2025-03-01T00:00:00+00:00
+python3 log_pages.py errors --before "2025-03-01T12:00:00+00:00,<log_id>"   (resume from a printed cursor)
+"""
+
+import argparse
+import os
+from datetime import datetime
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "postgres",
+    "user": "postgres",
+    "password": os.getenv("TELE_POSTGRES_PASS"),
+}
+
+PAGE_SIZE = 100
+ERROR_LEVELS = ("ERROR", "CRITICAL")
+
+
+def get_conn():
+    return psycopg2.connect(**DB_CONFIG)
+
+def split_cursor(before):
+    """(timestamp, id) from a cursor, a bare datetime, or None."""
+    if before is None or isinstance(before, datetime):
+        return before, None
+    return before
+
+def fetch_page(conn, sql, params, time_column, id_column, page_size):
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    cursor = (rows[-1][time_column], rows[-1][id_column]) if len(rows) == page_size else None
+    return rows, cursor
+
+def recent_errors(conn, before=None, levels=ERROR_LEVELS, server_id=None, page_size=PAGE_SIZE):
+    """Application logs at `levels` (None: every level), optionally of one server."""
+    before_ts, before_id = split_cursor(before)
+    return fetch_page(conn, """
+        SELECT * FROM public.recent_errors_page(%s, %s, %s::log_level_enum[], %s, %s)
+    """, (before_ts, before_id, list(levels) if levels else None, server_id, page_size),
+        "log_timestamp", "log_id", page_size)
+
+def recent_accesses(conn, before=None, access_types=None, server_id=None, page_size=PAGE_SIZE):
+    """User accesses of `access_types` (None: every type), optionally on one server."""
+    before_ts, before_id = split_cursor(before)
+    return fetch_page(conn, """
+        SELECT * FROM public.recent_access_page(%s, %s, %s::access_type_enum[], %s, %s)
+    """, (before_ts, before_id, list(access_types) if access_types else None, server_id, page_size),
+        "timestamp", "access_id", page_size)
+
+def security_sensitive_accesses(conn, before=None, server_id=None, page_size=PAGE_SIZE):
+    """WRITE and DELETE accesses, optionally on one server."""
+    before_ts, before_id = split_cursor(before)
+    return fetch_page(conn, """
+        SELECT * FROM public.security_sensitive_page(%s, %s, %s, %s)
+    """, (before_ts, before_id, server_id, page_size), "timestamp", "access_id", page_size)
+
+
+def parse_cursor(text):
+    ts, _, row_id = text.partition(",")
+    ts = datetime.fromisoformat(ts)
+    return (ts, row_id) if row_id else ts
+
+def main():
+    parser = argparse.ArgumentParser(description="Page through recent errors and user accesses, newest first.")
+    parser.add_argument("kind", choices=("errors", "access", "sensitive"))
+    parser.add_argument("--server", help="only this server_id")
+    parser.add_argument("--level", action="append", help="log level (errors; repeatable, default ERROR and CRITICAL)")
+    parser.add_argument("--type", action="append", help="access type (access; repeatable, default all)")
+    parser.add_argument("--before", type=parse_cursor, metavar="TIMESTAMP[,ID]",
+                        help="start below this cursor (as printed after each page)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--pages", type=int, default=1)
+    args = parser.parse_args()
+
+    cursor = args.before
+    with get_conn() as conn:
+        for _ in range(args.pages):
+            if args.kind == "errors":
+                rows, cursor = recent_errors(conn, cursor, args.level or ERROR_LEVELS, args.server, args.page_size)
+                lines = [f"{r['log_timestamp']}  {r['log_level']:<8} {r['server_id']}  {r['log_source']}" for r in rows]
+            elif args.kind == "access":
+                rows, cursor = recent_accesses(conn, cursor, args.type, args.server, args.page_size)
+                lines = [f"{r['timestamp']}  {r['access_type']:<7} {r['server_id']}  {r['user_id']}  {r['access_ip']}" for r in rows]
+            else:
+                rows, cursor = security_sensitive_accesses(conn, cursor, args.server, args.page_size)
+                lines = [f"{r['timestamp']}  {r['access_type']:<7} {r['server_id']}  {r['user_id']}  {r['access_ip']}" for r in rows]
+            print("\n".join(lines), flush=True)
+            if not cursor:
+                print("(no older rows)", flush=True)
+                break
+            print(f"--- next page: --before \"{cursor[0].isoformat()},{cursor[1]}\"", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Load-then-index mode for bulk profiles (--defer-indexes).
+Every row COPYed into the monitoring tables normally pays for each secondary index
+from 04_indexes.sql and each trigger (07_triggers.sql and later). In this mode
+the run instead:
+
+  1. drops the secondary indexes (PK/unique/FK constraints stay) of the tables it
+     loads and disables their INSERT triggers (ALTER TABLE ... DISABLE TRIGGER),
+     recording both in public.mock_data_deferred_index / _trigger in the same
+     transaction, so an interrupted run gets them back on the next --defer-indexes
+     run. Foreign keys are still checked row by row, so no orphan is ever committed.
+     The triggers are off for every session while the load runs, not just the
+     loading ones;
+  2. loads the rows;
+  3. rebuilds the indexes in parallel;
+  4. runs each INSERT trigger's logic once, as set-based SQL over the loaded
+     time window (DEFERRED_TRIGGERS);
+  5. enables the triggers again and ANALYZEs the tables.
+
+A loaded table with an INSERT trigger that has no set-based version here is
+refused, rather than silently skipping its logic.
+
+nano mock_deferred.py
+python3 mock_engine.py --profile bulk-90-days --workers 4 --defer-indexes
+"""
+
+import time
+
+from mock_engine import DayTimestamp, get_conn
+from mock_fixtures import capture_ddl, execute_each
+
+DEFERRED_TABLE = "public.mock_data_deferred_index"
+DEFERRED_DDL = f"""
+CREATE TABLE IF NOT EXISTS {DEFERRED_TABLE} (
+    index_name TEXT        PRIMARY KEY,
+    table_name TEXT        NOT NULL,
+    definition TEXT        NOT NULL,
+    profile    TEXT        NOT NULL,
+    dropped_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+DEFERRED_TRIGGER_TABLE = "public.mock_data_deferred_trigger"
+DEFERRED_TRIGGER_DDL = f"""
+CREATE TABLE IF NOT EXISTS {DEFERRED_TRIGGER_TABLE} (
+    table_name   TEXT        NOT NULL,
+    trigger_name TEXT        NOT NULL,
+    profile      TEXT        NOT NULL,
+    disabled_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (table_name, trigger_name)
+)
+"""
+# pg_trigger.tgtype bit for INSERT triggers
+TRIGGER_TYPE_INSERT = 1 << 2
+
+# trigger name -> (table, set-based SQL over the load window, report).
+# {ts} is the table's day timestamp column; the window is %(first)s..%(last)s.
+# "count" reports what the trigger would have notified about (16_alert_notify.sql; a bulk load of
+# history sends no alerts), "rows" what it changed.
+DEFERRED_TRIGGERS = {
+    "high_cpu_notify_insert": ("server_metrics", "count", """
+        SELECT count(*) FROM public.server_metrics
+        WHERE cpu_usage > 90 AND {ts} BETWEEN %(first)s AND %(last)s
+    """, "high_cpu: {n:,} rows not notified"),
+    # Rows loaded behind the rollup watermark (11_rollup_aggregated_metrics.sql) queue their hour.
+    "rollup_late_data": ("server_metrics", "rows", """
+        INSERT INTO public.rollup_late_bucket (source_table, server_id, bucket)
+        SELECT DISTINCT 'server_metrics', m.server_id, date_trunc('hour', m.{ts})
+        FROM public.server_metrics m
+        JOIN public.rollup_watermark w ON w.source_table = 'server_metrics' AND m.{ts} < w.rolled_up_to
+        WHERE m.{ts} BETWEEN %(first)s AND %(last)s
+        ON CONFLICT DO NOTHING
+    """, "{n:,} late rollup buckets queued"),
+    "high_error_rate_notify_insert": ("aggregated_metrics", "count", """
+        SELECT count(*) FROM public.aggregated_metrics
+        WHERE error_rate > 5.00 AND {ts} BETWEEN %(first)s AND %(last)s
+    """, "high_error_rate: {n:,} rows not notified"),
+    "critical_alert_notify_insert": ("alert_history", "count", """
+        SELECT count(*) FROM public.alert_history
+        WHERE alert_severity = 'CRITICAL' AND {ts} BETWEEN %(first)s AND %(last)s
+    """, "critical_alert: {n:,} rows not notified"),
+    "trigger_security_alert": ("application_logs", "rows", """
+        INSERT INTO public.security_alerts (log_id, server_id, log_timestamp, description)
+        SELECT l.log_id, l.server_id, l.log_timestamp, 'Critical security log detected'
+        FROM public.application_logs l
+        WHERE l.log_source = 'SECURITY' AND l.log_level = 'CRITICAL' AND l.{ts} BETWEEN %(first)s AND %(last)s
+          AND NOT EXISTS (SELECT 1 FROM public.security_alerts s WHERE s.log_id = l.log_id)
+    """, "{n:,} security alerts logged"),
+    "cost_adjustment_trigger": ("cost_data", "rows", """
+        UPDATE public.cost_data SET cost_adjustment = cost_per_hour * 24 * 30 - total_monthly_cost
+        WHERE {ts} BETWEEN %(first)s AND %(last)s
+          AND cost_adjustment IS DISTINCT FROM cost_per_hour * 24 * 30 - total_monthly_cost
+    """, "cost_adjustment set on {n:,} rows"),
+    # The row trigger rejects these inserts; here they are removed after the fact
+    # (internal networks: public.internal_networks, 17_compact_types.sql).
+    "enforce_internal_deletes": ("user_access_logs", "rows", """
+        DELETE FROM public.user_access_logs
+        WHERE access_type = 'DELETE' AND NOT public.is_internal_ip(access_ip) AND {ts} BETWEEN %(first)s AND %(last)s
+    """, "{n:,} external DELETE accesses rejected"),
+}
+# Summary totals (15_summary_totals.sql) are rebuilt from their whole table instead.
+SUMMARY_TOTALS = {
+    "cost_data": "cost_totals",
+    "downtime_logs": "downtime_totals",
+    "resource_allocation": "server_resource_cost_totals",
+    "error_logs": "error_resolution_totals",
+    "incident_response_logs": "resolution_time_totals",
+}
+DEFERRED_TRIGGERS.update({
+    f"{totals}_insert": (table, "count", f"SELECT public.rebuild_summary_totals('{totals}')",
+                         f"{totals} rebuilt: {{n:,}} groups")
+    for table, totals in SUMMARY_TOTALS.items()
+})
+
+
+def day_column(spec):
+    return next(name for name, col in spec.columns.items() if isinstance(col, DayTimestamp))
+
+def bare_name(table):
+    return table.split(".")[-1].strip('"')
+
+def insert_triggers(cur, tables):
+    cur.execute("""
+        SELECT t.tgname, c.relname FROM pg_trigger t JOIN pg_class c ON c.oid = t.tgrelid
+        WHERE NOT t.tgisinternal AND t.tgenabled <> 'D' AND c.relnamespace = 'public'::regnamespace
+          AND c.relname = ANY(%s) AND t.tgtype & %s <> 0
+        ORDER BY 2, 1
+    """, (list(tables), TRIGGER_TYPE_INSERT))
+    return cur.fetchall()
+
+def rebuild_indexes(rows, workers):
+    """Recreate recorded indexes, then forget them."""
+    execute_each([definition for _, definition in rows], workers, "Rebuilt indexes", skip_existing=True)
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(f"DELETE FROM {DEFERRED_TABLE} WHERE index_name = ANY(%s)", ([name for name, _ in rows],))
+        conn.commit()
+
+def enable_triggers(rows):
+    """Enable recorded triggers again, then forget them."""
+    with get_conn() as conn, conn.cursor() as cur:
+        for table, name in rows:
+            cur.execute(f'ALTER TABLE public."{table}" ENABLE TRIGGER "{name}"')
+            cur.execute(f"DELETE FROM {DEFERRED_TRIGGER_TABLE} WHERE table_name = %s AND trigger_name = %s",
+                        (table, name))
+        conn.commit()
+    if rows:
+        print(f"Enabled {len(rows)} triggers", flush=True)
+
+def prepare_deferred(profile, workers):
+    """Drop the loaded tables' secondary indexes; returns the INSERT triggers to replay."""
+    tables = sorted({bare_name(spec.table) for spec in profile.tables})
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(DEFERRED_DDL)
+        cur.execute(DEFERRED_TRIGGER_DDL)
+        conn.commit()
+        cur.execute(f"SELECT index_name, definition FROM {DEFERRED_TABLE}")
+        leftover = cur.fetchall()
+        cur.execute(f"SELECT table_name, trigger_name FROM {DEFERRED_TRIGGER_TABLE}")
+        disabled = cur.fetchall()
+    if leftover:
+        print(f"Rebuilding {len(leftover)} indexes left dropped by an interrupted run", flush=True)
+        rebuild_indexes(leftover, workers)
+    if disabled:
+        print(f"Enabling {len(disabled)} triggers left disabled by an interrupted run", flush=True)
+        enable_triggers(disabled)
+
+    with get_conn() as conn, conn.cursor() as cur:
+        triggers = insert_triggers(cur, tables)
+        unknown = [f"{table}.{name}" for name, table in triggers if name not in DEFERRED_TRIGGERS]
+        if unknown:
+            raise SystemExit(f"No set-based version of INSERT trigger(s) {', '.join(unknown)}; "
+                             "add them to DEFERRED_TRIGGERS or run without --defer-indexes")
+        indexes = capture_ddl(cur, tables)["indexes"]
+        for index in indexes:
+            cur.execute(f"INSERT INTO {DEFERRED_TABLE} (index_name, table_name, definition, profile) "
+                        "VALUES (%s, %s, %s, %s)", (index["name"], index["table"], index["definition"], profile.name))
+            cur.execute(f'DROP INDEX public."{index["name"]}"')
+        for name, table in triggers:
+            cur.execute(f"INSERT INTO {DEFERRED_TRIGGER_TABLE} (table_name, trigger_name, profile) "
+                        "VALUES (%s, %s, %s)", (table, name, profile.name))
+            cur.execute(f'ALTER TABLE public."{table}" DISABLE TRIGGER "{name}"')
+        conn.commit()
+    print(f"Deferred {len(indexes)} indexes and {len(triggers)} triggers on {len(tables)} tables", flush=True)
+    return [name for name, _ in triggers]
+
+def replay_triggers(profile, triggers, window):
+    # The INSERT triggers are still disabled, so the set-based UPDATE/DELETE doesn't fire them;
+    # foreign keys act on it as on any other statement.
+    columns = {bare_name(spec.table): day_column(spec) for spec in profile.tables}
+    with get_conn() as conn, conn.cursor() as cur:
+        for name in triggers:
+            table, kind, sql, report = DEFERRED_TRIGGERS[name]
+            cur.execute(sql.format(ts=f'"{columns[table]}"'), window)
+            n = cur.fetchone()[0] if kind == "count" else cur.rowcount
+            print(f"{name}: {report.format(n=n)}", flush=True)
+        conn.commit()
+
+def finish_deferred(profile, triggers, window, workers):
+    started = time.monotonic()
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(f"SELECT index_name, definition FROM {DEFERRED_TABLE} WHERE profile = %s", (profile.name,))
+        rows = cur.fetchall()
+        cur.execute(f"SELECT table_name, trigger_name FROM {DEFERRED_TRIGGER_TABLE} WHERE profile = %s",
+                    (profile.name,))
+        disabled = cur.fetchall()
+    rebuild_indexes(rows, workers)
+    replay_triggers(profile, triggers, window)
+    enable_triggers(disabled)
+    tables = sorted({spec.table for spec in profile.tables})
+    execute_each([f"ANALYZE {t}" for t in tables], workers, "Analyzed")
+    print(f"Deferred work finished in {time.monotonic() - started:.1f}s", flush=True)
@@ -0,0 +1,985 @@
+"""
+Table-spec-driven mock data engine.
+Every table's generator is declared once in mock_specs.py (columns, distributions,
+FK sources and rows per day); workload profiles pick which tables run and for how
+long. This module is the single execution core behind all of the mock scripts:
+it generates each table a whole day at a time with numpy, buffers rows, and flushes
+them with COPY in FK-safe order. Bulk profiles can split their days across worker
+processes, each with its own connection, and commit per day (or per N rows) while
+recording finished days in public.mock_data_checkpoint so reruns resume.
+
+nano mock_engine.py
+python3 mock_engine.py --profile bulk-90-days
+python3 mock_engine.py --profile bulk-90-days --workers 4
+python3 mock_engine.py --profile bulk-90-days --commit-every 200000   (rerun after a failure to resume)
+python3 mock_engine.py --profile continuous
+python3 mock_engine.py --profile slow-changing-only --dry-run
+python3 mock_engine.py --profile bulk-90-days --output /data/cimd-90d   (Parquet files, no database; see mock_export.py)
+python3 mock_engine.py --profile bulk-90-days --workers 4 --defer-indexes   (load, then index; see mock_deferred.py)
+"""
+
+import argparse
+import io
+import math
+import os
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from multiprocessing import Pool
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+
+from mock_stream import Progress, format_copy_text
+from text_pools import column_text
+
+SEED = 42
+BATCH_ROWS = 50_000
+GMT_PLUS_4 = timezone(timedelta(hours=4))
+TZ_SUFFIX = "+04:00"
+
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "postgres",
+    "user": "postgres",
+    "password": os.getenv("TELE_POSTGRES_PASS"),
+}
+
+
+def get_conn():
+    return psycopg2.connect(**DB_CONFIG)
+
+def uuid4_array(rng, n):
+    raw = rng.integers(0, 256, (n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    h = raw.tobytes().hex()
+    return np.array([f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+                     for i in range(0, 32 * n, 32)])
+
+# --- COLUMN DISTRIBUTIONS ---
+# Each column returns a numpy array of n values. Columns are evaluated in
+# declaration order and can read earlier columns of the same row batch.
+
+class Column:
+    def generate(self, ctx, batch):
+        raise NotImplementedError
+
+class Uniform(Column):
+    def __init__(self, low, high, decimals=2):
+        self.low, self.high, self.decimals = low, high, decimals
+
+    def generate(self, ctx, batch):
+        return ctx.rng.uniform(self.low, self.high, batch.n).round(self.decimals)
+
+class IntRange(Column):
+    """Integers in [low, high], inclusive like random.randint."""
+
+    def __init__(self, low, high):
+        self.low, self.high = low, high
+
+    def generate(self, ctx, batch):
+        return ctx.rng.integers(self.low, self.high + 1, batch.n)
+
+class Choice(Column):
+    def __init__(self, values):
+        self.values = np.array(values, dtype=object)
+
+    def generate(self, ctx, batch):
+        return self.values[ctx.rng.integers(0, len(self.values), batch.n)]
+
+class Bool(Column):
+    def __init__(self, p=0.5):
+        self.p = p
+
+    def generate(self, ctx, batch):
+        return ctx.rng.random(batch.n) < self.p
+
+class Uuid4(Column):
+    def generate(self, ctx, batch):
+        return uuid4_array(ctx.id_rng, batch.n)
+
+class Hex(Column):
+    def __init__(self, nbytes, unique=False):
+        self.nbytes = nbytes
+        self.unique = unique
+
+    def generate(self, ctx, batch):
+        rng = ctx.id_rng if self.unique else ctx.rng
+        h = rng.integers(0, 256, batch.n * self.nbytes, dtype=np.uint8).tobytes().hex()
+        step = 2 * self.nbytes
+        return np.array([h[i:i + step] for i in range(0, len(h), step)])
+
+class Text(Column):
+    """Free text drawn from the cached pools in text_pools.py."""
+
+    def __init__(self, column=None):
+        self.column = column
+
+    def generate(self, ctx, batch):
+        return column_text(self.column or batch.column, batch.n, ctx.rng)
+
+class Source(Column):
+    """Random ids from a reference source (servers, apps, teams, users, incidents...)."""
+
+    def __init__(self, name, nullable=True):
+        self.name, self.nullable = name, nullable
+
+    def generate(self, ctx, batch):
+        values = ctx.sources.get(self.name)
+        if values is None or len(values) == 0:
+            if not self.nullable:
+                raise RuntimeError(f"No rows available for source '{self.name}'")
+            return np.full(batch.n, None, dtype=object)
+        return values[ctx.rng.integers(0, len(values), batch.n)]
+
+class Key(Column):
+    """The row's key from the table's cardinality (e.g. one row per server)."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def generate(self, ctx, batch):
+        return batch.keys[self.name]
+
+class Lookup(Column):
+    """Map an earlier column through a lookup (e.g. server_id -> location_id)."""
+
+    def __init__(self, column, lookup):
+        self.column, self.lookup = column, lookup
+
+    def generate(self, ctx, batch):
+        mapping = ctx.lookups[self.lookup]
+        return np.array([mapping[k] for k in batch.row[self.column]], dtype=object)
+
+class Parent(Column):
+    """Column copied from the parent table's rows generated for the same day."""
+
+    def __init__(self, table, column):
+        self.table, self.column = table, column
+
+    def generate(self, ctx, batch):
+        return ctx.generated[self.table][self.column]
+
+class DayTimestamp(Column):
+    """The unit's timestamp, optionally pushed forward by a random number of hours."""
+
+    def __init__(self, max_hours=0, min_hours=0):
+        self.min_hours, self.max_hours = min_hours, max_hours
+
+    def generate(self, ctx, batch):
+        ts = np.full(batch.n, np.datetime64(ctx.timestamp.replace(tzinfo=None), "us"))
+        if self.max_hours:
+            ts = ts + ctx.rng.integers(self.min_hours, self.max_hours + 1, batch.n).astype("timedelta64[h]")
+        return ts
+
+class OffsetFrom(Column):
+    """Timestamp column plus a random number of minutes (or `unit`); NULL where `present` is False."""
+
+    def __init__(self, column, low, high, present=None, unit="m"):
+        self.column = column
+        self.low, self.high = low, high
+        self.present = present
+        self.unit = unit
+
+    def generate(self, ctx, batch):
+        base = batch.row[self.column]
+        ts = base + ctx.rng.integers(self.low, self.high + 1, batch.n).astype(f"timedelta64[{self.unit}]")
+        if self.present is None:
+            return ts
+        mask = self.present(ctx, batch)
+        return np.where(mask, ts, np.datetime64("NaT"))
+
+class Derived(Column):
+    """Computed from earlier columns: fn(ctx, batch) -> array."""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def generate(self, ctx, batch):
+        return self.fn(ctx, batch)
+
+def fold_into(x, low, high):
+    """Reflect values back into [low, high], like a walk bouncing off both walls."""
+    span = high - low
+    period = np.where(span > 0, 2 * span, 1)
+    m = np.mod(x - low, period)
+    return np.where(span > 0, low + np.where(m > span, period - m, m), low)
+
+def bounded_walk(rng, low, high, tolerance, steps):
+    """(steps, n) walk: uniform start inside each band, steps of at most +/-tolerance."""
+    start = rng.uniform(low, high)
+    deltas = rng.uniform(-tolerance, tolerance, (steps - 1, len(low)))
+    path = np.vstack([start, start + np.cumsum(deltas, axis=0)])
+    return fold_into(path, low, high)
+
+def seasonality(timestamp, diurnal=0.0, weekly=0.0, peak_hour=14):
+    """Multiplier for a timestamp: daily cosine peaking at peak_hour, dip on weekends."""
+    hour = timestamp.hour + timestamp.minute / 60
+    factor = 1 + diurnal * math.cos(2 * math.pi * (hour - peak_hour) / 24)
+    return factor - weekly * (timestamp.weekday() >= 5)
+
+def shift_in_band(values, low, high, factor):
+    """Push values toward high (factor > 1) or low (factor < 1) without leaving [low, high]:
+    the position in the band is raised to 1/factor, so the ends stay fixed and nothing clips."""
+    span = high - low
+    position = np.divide(values - low, span, out=np.zeros_like(values), where=span > 0)
+    return low + span * np.clip(position, 0, 1) ** (1 / factor)
+
+class BoundedWalk(Column):
+    """Random walk per row key inside a per-app [low, high] band, across all units.
+
+    The whole path is built once per run with a cumulative sum and folded into
+    each band, then every unit reads its own step - so days can be generated in
+    any order, on any worker. `weekly` lowers weekend values and `diurnal` follows
+    the time of day, both inside the band (shift_in_band). Daily units are all
+    stamped at the same hour, so the diurnal term only applies to sub-daily ones.
+    """
+
+    def __init__(self, resource, tolerance, integer=False, decimals=2, diurnal=0.0, weekly=0.0):
+        self.resource = resource
+        self.tolerance = tolerance
+        self.integer = integer
+        self.decimals = decimals
+        self.diurnal = diurnal
+        self.weekly = weekly
+
+    def generate(self, ctx, batch):
+        bands = ctx.usage_bands(self.resource)[batch.index["apps"]]
+        low, high = bands[:, 0].astype(float), bands[:, 1].astype(float)
+        key = f"{batch.spec.name}.{batch.column}"
+        path = ctx.walk(key, lambda rng, steps: bounded_walk(rng, low, high, self.tolerance, steps))
+        diurnal = 0.0 if ctx.daily_units else self.diurnal
+        values = shift_in_band(path[ctx.unit], low, high, seasonality(ctx.timestamp, diurnal, self.weekly))
+        if self.integer:
+            return np.rint(values).astype(np.int64)
+        return values.round(self.decimals)
+
+# --- ROWS PER UNIT (DAY) ---
+
+class PerSource:
+    """k rows for every id in a source; the id is available as Key(name)."""
+
+    def __init__(self, name, k=1):
+        self.name, self.k = name, k
+
+    def plan(self, ctx):
+        ids = ctx.sources[self.name]
+        return {self.name: np.repeat(ids, self.k)}, {self.name: np.repeat(np.arange(len(ids)), self.k)}
+
+class Product:
+    """One row for every combination of two sources (e.g. server x app)."""
+
+    def __init__(self, outer, inner):
+        self.outer, self.inner = outer, inner
+
+    def plan(self, ctx):
+        a, b = ctx.sources[self.outer], ctx.sources[self.inner]
+        ia = np.repeat(np.arange(len(a)), len(b))
+        ib = np.tile(np.arange(len(b)), len(a))
+        return {self.outer: a[ia], self.inner: b[ib]}, {self.outer: ia, self.inner: ib}
+
+class RandomSubset:
+    """A random subset of a source, between low and high ids per unit."""
+
+    def __init__(self, name, low, high):
+        self.name, self.low, self.high = name, low, high
+
+    def plan(self, ctx):
+        ids = ctx.sources[self.name]
+        k = int(ctx.rng.integers(min(self.low, len(ids)), min(self.high, len(ids)) + 1))
+        idx = np.sort(ctx.rng.choice(len(ids), size=k, replace=False))
+        return {self.name: ids[idx]}, {self.name: idx}
+
+class RandomCount:
+    def __init__(self, low, high):
+        self.low, self.high = low, high
+
+    def plan(self, ctx):
+        return {"_n": int(ctx.rng.integers(self.low, self.high + 1))}, {}
+
+class Fixed:
+    def __init__(self, n):
+        self.n = n
+
+    def plan(self, ctx):
+        return {"_n": self.n}, {}
+
+class SameAs:
+    """One row per row of another table generated in the same unit."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def plan(self, ctx):
+        return {"_n": ctx.generated[self.table]["_n"]}, {}
+
+# --- TABLE SPECS ---
+
+class TableSpec:
+    def __init__(self, name, columns, rows, table=None, publishes=None, requires=()):
+        self.name = name
+        self.table = table or f"public.{name}"
+        self.columns = columns
+        self.rows = rows
+        # {source name: column} - ids made available to later units
+        self.publishes = publishes or {}
+        # sources that must be non-empty, otherwise the table is skipped
+        self.requires = requires
+
+    @property
+    def column_names(self):
+        return [c for c in self.columns if not c.startswith("_")]
+
+    def parents(self):
+        """Tables whose same-day rows this table copies (row counts or ids)."""
+        deps = {self.rows.table} if isinstance(self.rows, SameAs) else set()
+        deps.update(col.table for col in self.columns.values() if isinstance(col, Parent))
+        deps.discard(self.name)
+        return deps
+
+    def depends_on(self, specs):
+        deps = self.parents()
+        for col in self.columns.values():
+            if isinstance(col, Source):
+                deps.update(s.name for s in specs if col.name in s.publishes)
+        deps.discard(self.name)
+        return deps
+
+class Batch:
+    def __init__(self, spec, n, keys, index):
+        self.spec = spec
+        self.n = n
+        self.keys = keys
+        self.index = index
+        self.row = {}
+        self.column = None
+
+def generate_table(ctx, spec):
+    if any(len(ctx.sources.get(name, ())) == 0 for name in spec.requires):
+        return {"_n": 0}
+    keys, index = spec.rows.plan(ctx)
+    n = keys.pop("_n") if "_n" in keys else len(next(iter(keys.values())))
+    batch = Batch(spec, n, keys, index)
+    for name, col in spec.columns.items():
+        batch.column = name
+        batch.row[name] = np.asarray(col.generate(ctx, batch)) if n else np.array([])
+    batch.row["_n"] = n
+    return batch.row
+
+# --- PROFILES ---
+
+class Profile:
+    """Which tables a workload generates, over how many daily units."""
+
+    def __init__(self, name, tables, days=None, hour=12, sleep_seconds=None, replace_range=(), description=""):
+        self.name = name
+        self.tables = tables
+        self.days = days
+        # hour of day for each unit's timestamp; None uses the current time
+        self.hour = hour
+        self.sleep_seconds = sleep_seconds
+        # tables whose days are regenerated into staging and swapped in (see swap_staging)
+        self.replace_range = replace_range
+        self.description = description
+
+    @property
+    def continuous(self):
+        return self.days is None
+
+# --- EXECUTION CORE ---
+
+class Context:
+    def __init__(self, sources, lookups, seed, units=1, daily_units=False):
+        self.sources = {k: np.asarray(v, dtype=object) for k, v in sources.items()}
+        self.lookups = lookups
+        self.seed = seed
+        self.units = units
+        # bulk units are whole days; continuous units are a moment of the day
+        self.daily_units = daily_units
+        self.unit = 0
+        self.generated = {}
+        self.timestamp = None
+        self.rng = np.random.default_rng(seed)
+        # ids and unique suffixes are never seeded, so reruns don't collide with earlier rows
+        self.id_rng = np.random.default_rng()
+        self._bands = {}
+        self._walks = {}
+
+    def start_unit(self, unit_index, timestamp):
+        # Seeding per unit keeps output identical however days are split across workers.
+        self.rng = np.random.default_rng([self.seed, unit_index])
+        self.unit = unit_index
+        self.timestamp = timestamp
+        self.generated = {}
+
+    def publish(self, spec, rows):
+        for source, column in spec.publishes.items():
+            if rows["_n"]:
+                self.sources[source] = np.concatenate([self.sources.get(source, np.array([], dtype=object)),
+                                                       np.asarray(rows[column], dtype=object)])
+
+    def usage_bands(self, resource):
+        """Per-app [low, high] usage bands, fixed for the whole run."""
+        if not self._bands:
+            rng = np.random.default_rng([self.seed, 0xBA17D])
+            n = len(self.sources["apps"])
+            self._bands = {
+                "cpu": np.sort(np.column_stack([rng.uniform(0.5, 8, n), rng.uniform(8, 64, n)]), axis=1),
+                "mem": np.sort(np.column_stack([rng.integers(1024, 8193, n), rng.integers(8192, 65537, n)]), axis=1),
+                "disk": np.sort(np.column_stack([rng.integers(10, 101, n), rng.integers(100, 1001, n)]), axis=1),
+            }
+        return self._bands[resource]
+
+    def walk(self, key, build):
+        """Path for every unit of the run, built once from a seed tied to `key`."""
+        if key not in self._walks:
+            rng = np.random.default_rng([self.seed, zlib.crc32(key.encode())])
+            self._walks[key] = build(rng, max(self.units, self.unit + 1))
+        return self._walks[key]
+
+def flush_order(specs):
+    """Specs ordered so that every table is written after the tables it references."""
+    by_name = {s.name: s for s in specs}
+    ordered, seen = [], set()
+
+    def visit(spec):
+        if spec.name in seen:
+            return
+        seen.add(spec.name)
+        for dep in sorted(spec.depends_on(specs)):
+            if dep in by_name:
+                visit(by_name[dep])
+        ordered.append(spec)
+
+    for spec in specs:
+        visit(spec)
+    return ordered
+
+class CopySink:
+    """Buffers generated rows per table and COPYs them in FK-safe order."""
+
+    def __init__(self, conn, specs, batch_rows=BATCH_ROWS, redirect=None):
+        self.conn = conn
+        self.specs = flush_order(specs)
+        self.batch_rows = batch_rows
+        # {target table: staging table} for tables loaded off to the side and swapped in later
+        self.redirect = redirect or {}
+        self.buffers = {s.name: [] for s in specs}
+        self.buffered = 0
+
+    def add(self, spec, rows):
+        if rows["_n"]:
+            self.buffers[spec.name].append(rows)
+            self.buffered += rows["_n"]
+
+    def start_unit(self, day):
+        # Rows all go to the same tables whatever the day; FileSink splits its output here.
+        pass
+
+    def should_flush(self):
+        return self.buffered >= self.batch_rows
+
+    def flush(self):
+        nbytes = 0
+        for spec in self.specs:
+            chunks = self.buffers[spec.name]
+            if not chunks:
+                continue
+            merged = {c: np.concatenate([chunk[c] for chunk in chunks]) for c in spec.column_names}
+            payload = format_copy_text(merged, spec.column_names, TZ_SUFFIX)
+            nbytes += len(payload)
+            if self.conn is not None:
+                quoted = ", ".join(f'"{c}"' for c in spec.column_names)
+                with self.conn.cursor() as cur:
+                    table = self.redirect.get(spec.table, spec.table)
+                    cur.copy_expert(f"COPY {table} ({quoted}) FROM STDIN", io.StringIO(payload))
+            self.buffers[spec.name] = []
+        self.buffered = 0
+        return nbytes
+
+    def commit(self):
+        if self.conn is not None:
+            self.conn.commit()
+
+def unit_timestamp(profile, day, days, anchor=None):
+    """Timestamp of unit `day` of `days`; the last unit falls on `anchor` (default: today, GMT+4)."""
+    now = datetime.now(GMT_PLUS_4)
+    if profile.hour is None:
+        return now - timedelta(days=(days - day - 1))
+    d = (anchor or now.date()) - timedelta(days=(days - day - 1))
+    return datetime(d.year, d.month, d.day, profile.hour, tzinfo=GMT_PLUS_4)
+
+# --- CHECKPOINTS ---
+# Bulk profiles commit per day (or per N rows) and record every committed
+# (profile, day, table) unit in the same transaction, so a rerun skips them.
+# Each unit also records the run's anchor (the date of its last day), so a run
+# resumed on a later date regenerates the same days instead of a shifted window.
+
+CHECKPOINT_TABLE = "public.mock_data_checkpoint"
+CHECKPOINT_DDL = f"""
+CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+    profile      TEXT        NOT NULL,
+    day          DATE        NOT NULL,
+    table_name   TEXT        NOT NULL,
+    row_count    BIGINT      NOT NULL,
+    completed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    anchor       DATE        NULL,
+    PRIMARY KEY (profile, day, table_name)
+)
+"""
+
+class Checkpoint:
+    def __init__(self, conn, profile, anchor=None):
+        self.conn = conn
+        self.profile = profile
+        self.anchor = anchor
+
+    def ensure(self):
+        with self.conn.cursor() as cur:
+            cur.execute(CHECKPOINT_DDL)
+            # Tables created before anchors were recorded
+            cur.execute(f"ALTER TABLE {CHECKPOINT_TABLE} ADD COLUMN IF NOT EXISTS anchor DATE NULL")
+        self.conn.commit()
+
+    def stored_anchor(self):
+        """Anchor of the profile's latest checkpointed run, or None."""
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT max(anchor) FROM {CHECKPOINT_TABLE} WHERE profile = %s", (self.profile,))
+            return cur.fetchone()[0]
+
+    def resume_anchor(self, days, tables):
+        """The last run's anchor while any of its units is missing, otherwise today: a new run,
+        which still skips the days already done."""
+        today = datetime.now(GMT_PLUS_4).date()
+        anchor = self.stored_anchor()
+        if anchor is None or anchor == today:
+            return today
+        done = self.completed()
+        if all(set(tables) <= done.get(anchor - timedelta(days=d), set()) for d in range(days)):
+            return today
+        print(f"Resuming the run of {days} days ending {anchor}", flush=True)
+        return anchor
+
+    def completed(self):
+        """{day: {spec name, ...}} for every committed unit of the profile."""
+        done = {}
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT day, table_name FROM {CHECKPOINT_TABLE} WHERE profile = %s", (self.profile,))
+            for day, table in cur.fetchall():
+                done.setdefault(day, set()).add(table)
+        return done
+
+    def mark(self, units):
+        if not units:
+            return
+        with self.conn.cursor() as cur:
+            execute_values(cur, f"""
+                INSERT INTO {CHECKPOINT_TABLE} (profile, day, table_name, row_count, anchor) VALUES %s
+                ON CONFLICT (profile, day, table_name) DO UPDATE SET
+                    row_count = EXCLUDED.row_count, completed_at = now(), anchor = EXCLUDED.anchor
+            """, [(self.profile, day, table, rows, self.anchor) for day, table, rows in units])
+
+    def reset(self):
+        with self.conn.cursor() as cur:
+            cur.execute(f"DELETE FROM {CHECKPOINT_TABLE} WHERE profile = %s", (self.profile,))
+            print(f"Cleared {cur.rowcount:,} checkpoints for {self.profile}", flush=True)
+        self.conn.commit()
+
+def parse_commit_every(value):
+    """'day' (default), 'run' (one transaction) or a row count."""
+    if value in ("day", "run"):
+        return value
+    try:
+        rows = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected 'day', 'run' or a number of rows")
+    if rows <= 0:
+        raise argparse.ArgumentTypeError("row count must be positive")
+    return rows
+
+def commit_due(commit_every, uncommitted_rows):
+    if commit_every == "day":
+        return True
+    if commit_every == "run":
+        return False
+    return uncommitted_rows >= commit_every
+
+def check_resumable(specs, finished, day):
+    """A table can't be redone on its own if it copies ids from a table already committed that day."""
+    for spec in specs:
+        if spec.name in finished:
+            continue
+        done_parents = spec.parents() & finished
+        if done_parents:
+            raise RuntimeError(
+                f"{day}: {spec.name} is pending but its parent {', '.join(sorted(done_parents))} is already "
+                "committed; rerun with --reset-checkpoints after clearing that day"
+            )
+
+# --- RANGE REPLACEMENT ---
+# replace_range tables are regenerated into an UNLOGGED staging table with the same
+# columns (no indexes or constraints), then swapped into the real table in one short
+# transaction at the end. Generation never holds locks on the real table, and a
+# failed run leaves it untouched. The only replace_range table, resource_allocation,
+# isn't partitioned, so the swap still deletes the regenerated days row by row.
+
+def staging_table(profile, table):
+    return f"{table}_stage_{profile.name.replace('-', '_')}"
+
+def partition_window(profile, days, anchor=None):
+    """[first, last) of the run's days as GMT+4 wall times, which is how timestamps are stored."""
+    first = unit_timestamp(profile, 0, days, anchor).replace(tzinfo=None)
+    last = unit_timestamp(profile, days - 1, days, anchor).replace(tzinfo=None) + timedelta(days=1)
+    return first, last
+
+def prepare_staging(conn, profile):
+    """Fresh, empty staging tables for the profile's replace_range tables."""
+    stages = {table: staging_table(profile, table) for table in profile.replace_range}
+    with conn.cursor() as cur:
+        for table, stage in stages.items():
+            cur.execute(f"DROP TABLE IF EXISTS {stage}")
+            cur.execute(f"CREATE UNLOGGED TABLE {stage} (LIKE {table} INCLUDING DEFAULTS)")
+    conn.commit()
+    return stages
+
+def prepare_partitions(conn, profile, days, anchor=None):
+    """Create the time partitions (09_partition_server_metrics.sql) this run's days land in,
+    so its rows don't pile up in a DEFAULT partition."""
+    from partition_manager import ensure_partitions, partitioned_tables
+
+    with conn.cursor() as cur:
+        tables = set(partitioned_tables(cur)) & {spec.table.split(".")[-1] for spec in profile.tables}
+        first, last = partition_window(profile, days, anchor)
+        for table in sorted(tables):
+            created = ensure_partitions(cur, table, first, last)
+            if created:
+                print(f"Created {len(created)} partitions of {table}", flush=True)
+    conn.commit()
+
+def day_ranges(dates):
+    """Contiguous [start, end) timestamp ranges (GMT+4 midnights) covering the given dates."""
+    ranges = []
+    for d in sorted(dates):
+        start = datetime(d.year, d.month, d.day, tzinfo=GMT_PLUS_4)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = start + timedelta(days=1)
+        else:
+            ranges.append([start, start + timedelta(days=1)])
+    return ranges
+
+def replace_rows(cur, table, stage, ranges, columns):
+    """Delete the staged days from a plain table and copy the staged rows in.
+    Returns (summary, whether the table was left with dead tuples)."""
+    outside = " AND ".join(['NOT ("timestamp" >= %s AND "timestamp" < %s)'] * len(ranges))
+    cur.execute(f"SELECT EXISTS (SELECT 1 FROM {table} WHERE {outside})", [t for r in ranges for t in r])
+    dirty = cur.fetchone()[0]
+    if dirty:
+        deleted = 0
+        for lo, hi in ranges:
+            cur.execute(f'DELETE FROM {table} WHERE "timestamp" >= %s AND "timestamp" < %s', (lo, hi))
+            deleted += cur.rowcount
+        how = f"deleted {deleted:,}"
+    else:
+        cur.execute(f"TRUNCATE {table}")
+        how = "truncated"
+    cur.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {stage}")
+    return f"{how}, inserted {cur.rowcount:,}", dirty
+
+def swap_staging(conn, stages, units, checkpoint=None):
+    """Replace the staged days in each real table with the staging rows, in one transaction.
+
+    When the real table has no rows outside the staged days it is truncated instead,
+    which leaves no dead tuples at all; otherwise the old rows go in one set-based
+    DELETE per contiguous range. Returns the tables that need a VACUUM afterwards.
+    """
+    from mock_fixtures import table_columns
+
+    if not units:
+        for stage in stages.values():
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {stage}")
+        conn.commit()
+        return []
+    ranges = day_ranges({day for day, _, _ in units})
+    vacuum = []
+    started = time.monotonic()
+    with conn.cursor() as cur:
+        for table, stage in stages.items():
+            # By name: the staging table's column order needn't match (17_compact_types.sql reorders).
+            columns = ", ".join(f'"{c}"' for c, _ in table_columns(cur, table.split(".")[-1]))
+            how, dirty = replace_rows(cur, table, stage, ranges, columns)
+            if dirty:
+                vacuum.append(table)
+            cur.execute(f"DROP TABLE {stage}")
+            print(f"Swapped {table}: {how} from {stage}", flush=True)
+        if checkpoint:
+            checkpoint.mark(units)
+    conn.commit()
+    print(f"Swap transaction took {time.monotonic() - started:.1f}s", flush=True)
+    return vacuum
+
+def vacuum_tables(tables):
+    # VACUUM can't run in a transaction, and `with conn` always opens one, so use a plain connection.
+    conn = get_conn()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            for table in tables:
+                started = time.monotonic()
+                cur.execute(f"VACUUM (ANALYZE) {table}")
+                print(f"Vacuumed {table} in {time.monotonic() - started:.1f}s", flush=True)
+    finally:
+        conn.close()
+
+def rolls_up(profile):
+    """Whether the profile loads server_metrics; aggregated_metrics is its hourly rollup, never generated."""
+    return any(spec.table == "public.server_metrics" for spec in profile.tables)
+
+def roll_up(conn):
+    """Roll the loaded server_metrics up into aggregated_metrics (11_rollup_aggregated_metrics.sql).
+    Rows behind the watermark were queued as late buckets on insert, so this recomputes exactly those."""
+    from rollup_metrics import run_rollup
+
+    run_rollup(conn)
+
+def run_units(profile, specs, sources, lookups, sink, day_range, days, seed, progress,
+              commit_every="day", checkpoint=None, anchor=None):
+    """Generate and write the given days; returns the (day, table, rows) units loaded into staging."""
+    ctx = Context(sources, lookups, seed, units=days, daily_units=True)
+    done = checkpoint.completed() if checkpoint else {}
+    pending, staged, uncommitted, skipped = [], [], 0, 0
+
+    def commit():
+        nbytes = sink.flush()
+        if checkpoint:
+            checkpoint.mark(pending)
+        sink.commit()
+        pending.clear()
+        return nbytes
+
+    for day in day_range:
+        timestamp = unit_timestamp(profile, day, days, anchor)
+        finished = done.get(timestamp.date(), set())
+        if all(spec.name in finished for spec in specs):
+            skipped += 1
+            continue
+        check_resumable(specs, finished, timestamp.date())
+        ctx.start_unit(day, timestamp)
+        sink.start_unit(timestamp.date())
+        rows = 0
+        for spec in specs:
+            # Finished tables are still generated so the day's random stream and parent ids line up,
+            # but they are neither written nor published to later tables.
+            generated = generate_table(ctx, spec)
+            ctx.generated[spec.name] = generated
+            if spec.name in finished:
+                continue
+            ctx.publish(spec, generated)
+            sink.add(spec, generated)
+            # Staged tables only count as done once they are swapped in.
+            unit = (timestamp.date(), spec.name, generated["_n"])
+            (staged if spec.table in sink.redirect else pending).append(unit)
+            rows += generated["_n"]
+        uncommitted += rows
+        nbytes = 0
+        if commit_due(commit_every, uncommitted):
+            nbytes = commit()
+            uncommitted = 0
+        elif sink.should_flush():
+            nbytes = sink.flush()
+        progress.update(rows, nbytes)
+        print(f"Generated {rows:,} rows for {timestamp.date()}", flush=True)
+    commit()
+    if skipped:
+        print(f"Skipped {skipped} day(s) already completed", flush=True)
+    return staged
+
+# --- SOURCES ---
+
+def load_sources(cur, queries):
+    sources, lookups = {}, {}
+    for name, sql in queries.items():
+        cur.execute(sql)
+        rows = cur.fetchall()
+        sources[name] = [str(r[0]) for r in rows]
+        if rows and len(rows[0]) > 1:
+            lookups[f"{name}_{cur.description[1].name}"] = {str(r[0]): str(r[1]) for r in rows}
+    return sources, lookups
+
+def _worker(job):
+    from mock_specs import FALLBACK_LOOKUPS, FALLBACK_SOURCES, PROFILES, SOURCE_QUERIES
+
+    profile = PROFILES[job["profile"]]
+    specs = profile.tables
+    progress = Progress(None)
+    args = (job["day_range"], job["days"], job["seed"], progress, job["commit_every"])
+    if job["output"]:
+        from mock_export import FileSink
+
+        sink = FileSink(job["output"], specs, job["format"], job["batch_rows"])
+        run_units(profile, specs, FALLBACK_SOURCES, FALLBACK_LOOKUPS, sink, *args, anchor=job["anchor"])
+        return progress.rows, []
+    if job["dry_run"]:
+        run_units(profile, specs, FALLBACK_SOURCES, FALLBACK_LOOKUPS, CopySink(None, specs, job["batch_rows"]), *args,
+                  anchor=job["anchor"])
+        return progress.rows, []
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            sources, lookups = load_sources(cur, SOURCE_QUERIES)
+        checkpoint = Checkpoint(conn, profile.name, job["anchor"]) if job["checkpoint"] else None
+        sink = CopySink(conn, specs, job["batch_rows"], redirect=job["stages"])
+        staged = run_units(profile, specs, sources, lookups, sink, *args, checkpoint, job["anchor"])
+    return progress.rows, staged
+
+def run_bulk(profile, days=None, seed=SEED, workers=1, batch_rows=BATCH_ROWS, dry_run=False,
+             commit_every="day", reset_checkpoints=False, output=None, fmt="parquet", defer_indexes=False):
+    days = days or profile.days
+    workers = max(1, min(workers, days))
+    slices = [range(days * w // workers, days * (w + 1) // workers) for w in range(workers)]
+    # File exports never touch the database, like a dry run.
+    offline = dry_run or output is not None
+    # Profiles stamped with the current time are one-shot runs; there is nothing to resume.
+    use_checkpoint = profile.hour is not None and not offline
+    stages = {}
+    # Every unit's date is counted back from the anchor, taken once for the whole run.
+    anchor = datetime.now(GMT_PLUS_4).date()
+    if not offline:
+        with get_conn() as conn:
+            if use_checkpoint:
+                checkpoint = Checkpoint(conn, profile.name)
+                checkpoint.ensure()
+                if reset_checkpoints:
+                    checkpoint.reset()
+                anchor = checkpoint.resume_anchor(days, [spec.name for spec in profile.tables])
+            prepare_partitions(conn, profile, days, anchor)
+            stages = prepare_staging(conn, profile)
+    started = time.monotonic()
+    deferred = None
+    if defer_indexes and not offline:
+        from mock_deferred import prepare_deferred
+
+        # The replay window is fixed before the load, so a load that runs past midnight still
+        # replays the days it loaded. Profiles stamped with the current time load up to "now".
+        window = {"first": unit_timestamp(profile, 0, days, anchor).isoformat(),
+                  "last": unit_timestamp(profile, days - 1, days, anchor).isoformat() if profile.hour is not None
+                  else "infinity"}
+        deferred = prepare_deferred(profile, workers)
+    jobs = [{
+        "profile": profile.name, "day_range": r, "days": days, "seed": seed, "batch_rows": batch_rows,
+        "dry_run": dry_run, "commit_every": commit_every, "checkpoint": use_checkpoint, "stages": stages,
+        "output": output, "format": fmt, "anchor": anchor,
+    } for r in slices]
+    if workers <= 1:
+        results = [_worker(jobs[0])]
+    else:
+        with Pool(workers) as pool:
+            results = pool.map(_worker, jobs)
+    total = sum(rows for rows, _ in results)
+    if stages:
+        with get_conn() as conn:
+            vacuum = swap_staging(conn, stages, [unit for _, staged in results for unit in staged],
+                                  Checkpoint(conn, profile.name, anchor) if use_checkpoint else None)
+        vacuum_tables(vacuum)
+    if deferred is not None:
+        from mock_deferred import finish_deferred
+
+        finish_deferred(profile, deferred, window, workers)
+    if rolls_up(profile) and not offline:
+        with get_conn() as conn:
+            roll_up(conn)
+    if output is not None:
+        from mock_export import write_manifest
+
+        print(f"Wrote {write_manifest(output, profile, days, seed, fmt, total, anchor)}", flush=True)
+    elapsed = time.monotonic() - started
+    print(f"Bulk insert complete! {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)",
+          flush=True)
+
+def run_continuous(profile, seed=None, batch_rows=BATCH_ROWS, sleep_seconds=None):
+    from mock_specs import SOURCE_QUERIES
+
+    specs = profile.tables
+    sleep_seconds = profile.sleep_seconds if sleep_seconds is None else sleep_seconds
+    unit = 0
+    while True:
+        try:
+            with get_conn() as conn:
+                print("DB connected", flush=True)
+                with conn.cursor() as cur:
+                    sources, lookups = load_sources(cur, SOURCE_QUERIES)
+                ctx = Context(sources, lookups, seed if seed is not None else time.time_ns())
+                ctx.start_unit(unit, datetime.now(GMT_PLUS_4))
+                sink = CopySink(conn, specs, batch_rows)
+                for spec in specs:
+                    generated = generate_table(ctx, spec)
+                    ctx.generated[spec.name] = generated
+                    sink.add(spec, generated)
+                sink.flush()
+                sink.commit()
+                print(f"Inserted rows at {datetime.now()}", flush=True)
+                if rolls_up(profile):
+                    roll_up(conn)
+        except Exception as e:
+            print("ERROR:", e, flush=True)
+        unit += 1
+        if not sleep_seconds:
+            return
+        time.sleep(sleep_seconds)
+
+def parse_args(default_profile=None):
+    from mock_specs import PROFILES
+
+    parser = argparse.ArgumentParser(description="Generate mock monitoring data from table specs.")
+    parser.add_argument("--profile", default=default_profile, required=default_profile is None,
+                        choices=sorted(PROFILES))
+    parser.add_argument("--days", type=int, help="override the profile's number of days")
+    parser.add_argument("--seed", type=int, help=f"random seed (bulk default {SEED})")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for bulk profiles")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS, help="rows buffered before each COPY")
+    parser.add_argument("--commit-every", type=parse_commit_every, default="day",
+                        help="bulk profiles: commit per 'day' (default), once per 'run', or after N rows")
+    parser.add_argument("--reset-checkpoints", action="store_true",
+                        help="forget completed days for this profile and generate them again")
+    parser.add_argument("--once", action="store_true", help="continuous profiles: run one unit and exit")
+    parser.add_argument("--load-test", action="store_true",
+                        help="continuous profiles: concurrent writers at a target rate, with latency reports")
+    parser.add_argument("--writers", type=int, default=4, help="load test: concurrent writer connections")
+    parser.add_argument("--rows-per-second", type=float, default=1000,
+                        help="load test: target rows/s for each per-server table (0 = unthrottled)")
+    parser.add_argument("--duration", type=float, help="load test: seconds to run (default: until Ctrl+C)")
+    parser.add_argument("--report-csv", help="load test: also write each report interval to this CSV")
+    parser.add_argument("--dry-run", action="store_true", help="generate without a database (fallback ids)")
+    parser.add_argument("--output", help="bulk profiles: write partitioned files to this directory instead "
+                                         "of the database (fallback ids, no connection)")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet", help="--output file format")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="bulk profiles: drop secondary indexes and disable INSERT triggers during the load, then "
+                             "rebuild and run the trigger logic set-based (see mock_deferred.py)")
+    return parser.parse_args()
+
+def main(default_profile=None):
+    from mock_specs import PROFILES
+
+    args = parse_args(default_profile)
+    profile = PROFILES[args.profile]
+    print(f"Profile {profile.name}: {profile.description}", flush=True)
+    if profile.continuous and args.output:
+        raise SystemExit("--output needs a bulk profile (one with a fixed number of days)")
+    if profile.continuous and args.load_test:
+        from mock_load import run_load_test
+
+        run_load_test(profile, args.writers, args.rows_per_second, args.duration, args.seed, args.batch_rows,
+                      report_csv=args.report_csv)
+    elif profile.continuous:
+        run_continuous(profile, args.seed, args.batch_rows, sleep_seconds=0 if args.once else None)
+    else:
+        # Backfills are reproducible by default; profiles stamped "now" draw fresh values each run.
+        seed = args.seed if args.seed is not None else SEED if profile.hour is not None else time.time_ns()
+        run_bulk(profile, args.days, seed, args.workers, args.batch_rows, args.dry_run,
+                 args.commit_every, args.reset_checkpoints, args.output, args.format, args.defer_indexes)
+
+if __name__ == "__main__":
+    main()
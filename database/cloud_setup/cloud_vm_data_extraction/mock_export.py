@@ -0,0 +1,132 @@
+"""
+Offline columnar export for the mock engine.
+FileSink takes the place of CopySink: instead of COPYing into Postgres it writes
+every table to <output>/<table>/date=YYYY-MM-DD/part-0.parquet (or .csv), one row
+group per flush, so memory stays at one batch however many days are generated.
+The layout is Hive-style, which Power BI, DuckDB, Spark and pyarrow.dataset all
+read as a partitioned table. A _dataset.json next to the tables records the
+profile, seed and day range the files were generated with.
+
+Needs pyarrow (pip install pyarrow); no database connection is used.
+
+nano mock_export.py
+python3 mock_engine.py --profile bulk-90-days --output /data/cimd-90d
+python3 mock_engine.py --profile bulk-90-days --output /data/cimd-90d-csv --format csv --workers 4
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from mock_engine import BATCH_ROWS, GMT_PLUS_4, flush_order, unit_timestamp
+
+# Timestamps are generated as GMT+4 wall times (the engine COPYs them with a +04:00 suffix).
+TZ_NAME = "+04:00"
+UTC_OFFSET = np.timedelta64(4, "h")
+MANIFEST = "_dataset.json"
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.csv
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("File export needs pyarrow: pip install pyarrow")
+    return pa
+
+def to_arrow(pa, values):
+    """numpy column -> Arrow array with a fixed type per dtype (object columns are nullable text)."""
+    if np.issubdtype(values.dtype, np.datetime64):
+        return pa.array(values - UTC_OFFSET, type=pa.timestamp("us", tz=TZ_NAME))
+    if values.dtype == object:
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+    return pa.array(values)
+
+def partition_path(output, table, day, fmt):
+    return Path(output) / table / f"date={day.isoformat()}" / f"part-0.{fmt}"
+
+class FileSink:
+    """Buffers generated rows per table and appends them as row groups to per-day files."""
+
+    def __init__(self, output, specs, fmt="parquet", batch_rows=BATCH_ROWS):
+        self.pa = _pyarrow()
+        self.output = Path(output)
+        self.specs = flush_order(specs)
+        self.format = fmt
+        self.batch_rows = batch_rows
+        # CopySink compatibility: nothing is staged when writing files
+        self.redirect = {}
+        self.buffers = {s.name: [] for s in specs}
+        self.buffered = 0
+        self.day = None
+        self.writers = {}
+
+    def start_unit(self, day):
+        if day != self.day:
+            self.close()
+        self.day = day
+
+    def add(self, spec, rows):
+        if rows["_n"]:
+            self.buffers[spec.name].append(rows)
+            self.buffered += rows["_n"]
+
+    def should_flush(self):
+        return self.buffered >= self.batch_rows
+
+    def _writer(self, spec, schema):
+        if spec.name not in self.writers:
+            path = partition_path(self.output, spec.name, self.day, self.format)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if self.format == "parquet":
+                writer = self.pa.parquet.ParquetWriter(path, schema, compression="zstd")
+            else:
+                writer = self.pa.csv.CSVWriter(path, schema)
+            self.writers[spec.name] = writer
+        return self.writers[spec.name]
+
+    def flush(self):
+        nbytes = 0
+        for spec in self.specs:
+            chunks = self.buffers[spec.name]
+            if not chunks:
+                continue
+            arrays = [to_arrow(self.pa, np.concatenate([chunk[c] for chunk in chunks])) for c in spec.column_names]
+            batch = self.pa.record_batch(arrays, names=spec.column_names)
+            self._writer(spec, batch.schema).write(self.pa.Table.from_batches([batch]))
+            nbytes += batch.nbytes
+            self.buffers[spec.name] = []
+        self.buffered = 0
+        return nbytes
+
+    def close(self):
+        self.flush()
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+    def commit(self):
+        self.close()
+
+def write_manifest(output, profile, days, seed, fmt, rows, anchor=None):
+    first = unit_timestamp(profile, 0, days, anchor).date()
+    last = unit_timestamp(profile, days - 1, days, anchor).date()
+    manifest = {
+        "profile": profile.name,
+        "seed": seed,
+        "days": days,
+        "first_day": first.isoformat(),
+        "last_day": last.isoformat(),
+        "format": fmt,
+        "tables": [spec.name for spec in profile.tables],
+        "rows": rows,
+        "timezone": TZ_NAME,
+        "generated_at": datetime.now(GMT_PLUS_4).isoformat(),
+    }
+    path = Path(output) / MANIFEST
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2) + "\n")
+    return path
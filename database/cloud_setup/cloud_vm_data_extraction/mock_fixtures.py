@@ -0,0 +1,376 @@
+"""
+Binary-COPY fixture snapshots of a populated database.
+`create` generates a named dataset once (reference tables + a bulk profile for a
+given seed and number of days) and saves every public table as a PostgreSQL
+binary COPY file, dumped in parallel from one exported snapshot, with a manifest
+of columns, row counts and sha256 checksums.
+`restore` checks the checksums, drops the tables' indexes and PK/unique/FK
+constraints, truncates them, loads every file with parallel binary COPY
+(triggers off - the data already went through them), then rebuilds indexes and
+constraints in parallel and ANALYZEs. The dropped definitions are written to
+pending_ddl.json first, so an interrupted restore puts them back on the next run.
+
+Fixtures live in .fixtures/<name>/ (override with CIMD_FIXTURE_DIR). Binary COPY
+needs the same column types on restore, so restore into the schema the fixture
+was created from.
+
+nano mock_fixtures.py
+python3 mock_fixtures.py create bulk-30d --profile bulk-90-days --days 30 --seed 42 --workers 4
+python3 mock_fixtures.py create current --no-generate   (snapshot the database as it is)
+python3 mock_fixtures.py restore bulk-30d --workers 8
+python3 mock_fixtures.py verify bulk-30d
+python3 mock_fixtures.py list
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from psycopg2 import errors
+
+from mock_engine import CHECKPOINT_TABLE, GMT_PLUS_4, SEED, Checkpoint, get_conn, run_bulk, unit_timestamp
+
+FIXTURE_DIR = Path(os.getenv("CIMD_FIXTURE_DIR", Path(__file__).resolve().parent / ".fixtures"))
+MANIFEST = "manifest.json"
+PENDING_DDL = "pending_ddl.json"
+# bookkeeping tables that don't belong in a dataset
+SKIP_TABLES = {"mock_data_checkpoint", "mock_data_deferred_index", "mock_data_deferred_trigger"}
+READ_BYTES = 1 << 20
+
+
+def fixture_path(name, fixture_dir=FIXTURE_DIR):
+    return Path(fixture_dir) / name
+
+def load_manifest(name, fixture_dir=FIXTURE_DIR):
+    path = fixture_path(name, fixture_dir) / MANIFEST
+    if not path.exists():
+        raise SystemExit(f"No fixture named {name} in {fixture_dir}")
+    return json.loads(path.read_text())
+
+def run_parallel(fn, items, workers):
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(fn, items))
+
+# --- CATALOG ---
+
+def list_tables(cur):
+    """Public tables (partitioned parents, not their partitions) in FK order."""
+    cur.execute("""
+        SELECT c.relname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p') AND NOT c.relispartition
+          AND c.relpersistence = 'p'
+        ORDER BY c.relname
+    """)
+    tables = [r[0] for r in cur.fetchall() if r[0] not in SKIP_TABLES]
+    cur.execute("""
+        SELECT c.conrelid::regclass::text, c.confrelid::regclass::text FROM pg_constraint c
+        WHERE c.contype = 'f' AND c.connamespace = 'public'::regnamespace
+    """)
+    parents = {t: set() for t in tables}
+    for child, parent in cur.fetchall():
+        child, parent = child.split(".")[-1].strip('"'), parent.split(".")[-1].strip('"')
+        if child in parents and parent in parents and parent != child:
+            parents[child].add(parent)
+    ordered, seen = [], set()
+
+    def visit(table):
+        if table not in seen:
+            seen.add(table)
+            for parent in sorted(parents[table]):
+                visit(parent)
+            ordered.append(table)
+
+    for table in tables:
+        visit(table)
+    return ordered
+
+def table_columns(cur, table):
+    """[(column, type)] that COPY can write (generated columns are skipped)."""
+    cur.execute("""
+        SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+        ORDER BY attnum
+    """, (f"public.{table}",))
+    return [list(r) for r in cur.fetchall()]
+
+def capture_ddl(cur, tables):
+    """Index and PK/unique/exclusion/FK definitions for the given tables."""
+    qualified = [f"public.{t}" for t in tables]
+    cur.execute("""
+        SELECT conrelid::regclass::text, conname, contype, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = ANY(%s::regclass[]) AND contype IN ('p', 'u', 'x', 'f') AND conparentid = 0
+        ORDER BY conrelid::regclass::text, conname
+    """, (qualified,))
+    constraints = [{"table": t, "name": n, "type": c, "definition": d} for t, n, c, d in cur.fetchall()]
+    cur.execute("""
+        SELECT i.indrelid::regclass::text, ic.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i
+        JOIN pg_class ic ON ic.oid = i.indexrelid
+        WHERE i.indrelid = ANY(%s::regclass[]) AND NOT ic.relispartition
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+        ORDER BY 1, 2
+    """, (qualified,))
+    # A partitioned table's index is printed as CREATE INDEX ... ON ONLY parent, which would
+    # recreate it without its per-partition indexes (and INVALID); drop ONLY so it cascades.
+    indexes = [{"table": t, "name": n, "definition": d.replace(" ON ONLY ", " ON ", 1)}
+               for t, n, d in cur.fetchall()]
+    return {"constraints": constraints, "indexes": indexes}
+
+def rebuild_statements(ddl):
+    """(keys and indexes, foreign keys): FKs need the referenced keys back first."""
+    def add(c):
+        return f'ALTER TABLE {c["table"]} ADD CONSTRAINT "{c["name"]}" {c["definition"]}'
+
+    keys = [add(c) for c in ddl["constraints"] if c["type"] != "f"]
+    keys += [i["definition"] for i in ddl["indexes"]]
+    return keys, [add(c) for c in ddl["constraints"] if c["type"] == "f"]
+
+# --- SNAPSHOT ---
+
+class HashingFile:
+    """File wrapper for COPY TO: counts and sha256-hashes everything written."""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.bytes += len(data)
+        return self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+def dump_table(snapshot, table, columns, path):
+    cols = ", ".join(f'"{c}"' for c, _ in columns)
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        cur.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+        out = HashingFile(path)
+        try:
+            cur.copy_expert(f"COPY (SELECT {cols} FROM public.{table}) TO STDOUT (FORMAT binary)", out)
+        finally:
+            out.close()
+        rows = cur.rowcount
+    return {"table": table, "columns": columns, "rows": rows, "file": path.name,
+            "bytes": out.bytes, "sha256": out.sha256.hexdigest()}
+
+def snapshot_tables(target, workers):
+    """Dump every public table into `target`, all from the same transaction snapshot."""
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        cur.execute("SELECT pg_export_snapshot(), current_setting('server_version')")
+        snapshot, version = cur.fetchone()
+        tables = list_tables(cur)
+        jobs = [(t, table_columns(cur, t)) for t in tables]
+        # The exporting transaction must stay open until every worker has imported the snapshot.
+        entries = run_parallel(lambda job: dump_table(snapshot, job[0], job[1], target / f"{job[0]}.bin"),
+                               jobs, workers)
+    return entries, version
+
+def create_fixture(name, profile_name=None, days=None, seed=SEED, workers=4, generate=True, force=False,
+                   fixture_dir=FIXTURE_DIR):
+    from mock_specs import PROFILES
+
+    path = fixture_path(name, fixture_dir)
+    if path.exists() and not force:
+        raise SystemExit(f"Fixture {name} already exists (use --force to replace it)")
+    profile = PROFILES[profile_name] if profile_name else None
+    days = days or (profile.days if profile else None)
+    if generate and profile:
+        from seed_reference_data import seed as seed_reference
+
+        seed_reference(seed=seed, workers=workers)
+        # From scratch: a checkpoint left by an earlier create would make the run skip every day.
+        run_bulk(profile, days, seed, workers, reset_checkpoints=True)
+
+    anchor = None
+    if profile and profile.hour is not None:
+        # The days the data actually covers: the run is anchored where its checkpoint says.
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", (CHECKPOINT_TABLE,))
+            if cur.fetchone()[0]:
+                anchor = Checkpoint(conn, profile.name).stored_anchor()
+
+    started = time.monotonic()
+    tmp = path.with_name(f"{name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    entries, version = snapshot_tables(tmp, workers)
+    manifest = {
+        "name": name,
+        "profile": profile.name if profile else None,
+        "seed": seed if profile else None,
+        "days": days if profile else None,
+        "first_day": unit_timestamp(profile, 0, days, anchor).date().isoformat() if profile else None,
+        "last_day": unit_timestamp(profile, days - 1, days, anchor).date().isoformat() if profile else None,
+        "server_version": version,
+        "created_at": datetime.now(GMT_PLUS_4).isoformat(),
+        "tables": entries,
+    }
+    (tmp / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n")
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    rows = sum(e["rows"] for e in entries)
+    size = sum(e["bytes"] for e in entries)
+    print(f"Fixture {name}: {len(entries)} tables, {rows:,} rows, {size / 1e6:,.1f} MB "
+          f"in {time.monotonic() - started:.1f}s -> {path}", flush=True)
+
+# --- RESTORE ---
+
+def file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BYTES), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+def verify_fixture(name, workers=4, fixture_dir=FIXTURE_DIR):
+    manifest = load_manifest(name, fixture_dir)
+    path = fixture_path(name, fixture_dir)
+    entries = manifest["tables"]
+    actual = run_parallel(lambda e: file_sha256(path / e["file"]), entries, workers)
+    bad = [e["table"] for e, digest in zip(entries, actual) if digest != e["sha256"]]
+    if bad:
+        raise SystemExit(f"Fixture {name}: checksum mismatch for {', '.join(bad)}")
+    print(f"Fixture {name}: {len(entries)} files OK", flush=True)
+    return manifest
+
+def check_schema(cur, entries):
+    for entry in entries:
+        cur.execute("SELECT to_regclass(%s)", (f"public.{entry['table']}",))
+        if cur.fetchone()[0] is None:
+            raise SystemExit(f"Table public.{entry['table']} does not exist; create the schema first")
+        if table_columns(cur, entry["table"]) != entry["columns"]:
+            raise SystemExit(f"public.{entry['table']} columns differ from the fixture; binary COPY needs "
+                             "the schema the fixture was created from")
+
+def execute_each(statements, workers, label, skip_existing=False):
+    def run(sql):
+        with get_conn() as conn, conn.cursor() as cur:
+            try:
+                cur.execute(sql)
+            except (errors.DuplicateTable, errors.DuplicateObject, errors.InvalidTableDefinition):
+                # Recovering an interrupted restore: part of the rebuild may already have run.
+                if not skip_existing:
+                    raise
+                conn.rollback()
+            conn.commit()
+
+    started = time.monotonic()
+    run_parallel(run, statements, workers)
+    print(f"{label}: {len(statements)} statements in {time.monotonic() - started:.1f}s", flush=True)
+
+def rebuild(ddl, workers, skip_existing=False):
+    keys, foreign_keys = rebuild_statements(ddl)
+    execute_each(keys, workers, "Rebuilt keys and indexes", skip_existing)
+    execute_each(foreign_keys, workers, "Rebuilt foreign keys", skip_existing)
+
+def load_table(path, entry):
+    cols = ", ".join(f'"{c}"' for c, _ in entry["columns"])
+    with get_conn() as conn, conn.cursor() as cur:
+        # Replica mode skips triggers (and FK checks); the rows already passed them when generated.
+        cur.execute("SET session_replication_role = replica")
+        with open(path / entry["file"], "rb") as f:
+            cur.copy_expert(f"COPY public.{entry['table']} ({cols}) FROM STDIN (FORMAT binary)", f, READ_BYTES)
+        conn.commit()
+
+def restore_fixture(name, workers=4, fixture_dir=FIXTURE_DIR):
+    manifest = verify_fixture(name, workers, fixture_dir)
+    path = fixture_path(name, fixture_dir)
+    entries = manifest["tables"]
+    tables = [e["table"] for e in entries]
+    pending = path / PENDING_DDL
+    started = time.monotonic()
+
+    if pending.exists():
+        print("Previous restore was interrupted; putting its indexes and constraints back first", flush=True)
+        rebuild(json.loads(pending.read_text()), workers, skip_existing=True)
+        pending.unlink()
+
+    with get_conn() as conn, conn.cursor() as cur:
+        check_schema(cur, entries)
+        ddl = capture_ddl(cur, tables)
+        pending.write_text(json.dumps(ddl, indent=2) + "\n")
+        try:
+            for c in ddl["constraints"]:
+                if c["type"] == "f":
+                    cur.execute(f'ALTER TABLE {c["table"]} DROP CONSTRAINT "{c["name"]}"')
+            for i in ddl["indexes"]:
+                cur.execute(f'DROP INDEX public."{i["name"]}"')
+            for c in ddl["constraints"]:
+                if c["type"] != "f":
+                    cur.execute(f'ALTER TABLE {c["table"]} DROP CONSTRAINT "{c["name"]}"')
+            cur.execute(f"TRUNCATE {', '.join(f'public.{t}' for t in tables)}")
+            conn.commit()
+        except Exception:
+            # Nothing was dropped, so there is nothing to put back.
+            conn.rollback()
+            pending.unlink()
+            raise
+    print(f"Dropped {len(ddl['indexes'])} indexes and {len(ddl['constraints'])} constraints, "
+          f"truncated {len(tables)} tables", flush=True)
+
+    # Biggest files first so one large table doesn't start last.
+    load_started = time.monotonic()
+    run_parallel(lambda e: load_table(path, e), sorted(entries, key=lambda e: -e["bytes"]), workers)
+    rows = sum(e["rows"] for e in entries)
+    print(f"Loaded {rows:,} rows in {time.monotonic() - load_started:.1f}s", flush=True)
+
+    rebuild(ddl, workers)
+    pending.unlink()
+    execute_each([f"ANALYZE public.{t}" for t in tables], workers, "Analyzed")
+    print(f"Restored fixture {name} in {time.monotonic() - started:.1f}s", flush=True)
+
+def list_fixtures(fixture_dir=FIXTURE_DIR):
+    for path in sorted(Path(fixture_dir).glob(f"*/{MANIFEST}")):
+        m = json.loads(path.read_text())
+        rows = sum(e["rows"] for e in m["tables"])
+        size = sum(e["bytes"] for e in m["tables"])
+        span = f"{m['first_day']}..{m['last_day']}" if m["profile"] else "snapshot"
+        print(f"{m['name']}: {m['profile'] or '-'} seed={m['seed']} {span} "
+              f"{rows:,} rows {size / 1e6:,.1f} MB (created {m['created_at']})")
+
+def main():
+    from mock_specs import PROFILES
+
+    parser = argparse.ArgumentParser(description="Create and restore binary-COPY database fixtures.")
+    parser.add_argument("--dir", default=FIXTURE_DIR, type=Path, help="fixture directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    create = sub.add_parser("create", help="generate a dataset and snapshot it")
+    create.add_argument("name")
+    create.add_argument("--profile", choices=sorted(p for p, v in PROFILES.items() if not v.continuous))
+    create.add_argument("--days", type=int, help="override the profile's number of days")
+    create.add_argument("--seed", type=int, default=SEED)
+    create.add_argument("--workers", type=int, default=4)
+    create.add_argument("--no-generate", action="store_true", help="snapshot the database as it is")
+    create.add_argument("--force", action="store_true", help="replace an existing fixture")
+    restore = sub.add_parser("restore", help="load a fixture, replacing the tables' contents")
+    restore.add_argument("name")
+    restore.add_argument("--workers", type=int, default=4)
+    verify = sub.add_parser("verify", help="check a fixture's checksums")
+    verify.add_argument("name")
+    sub.add_parser("list", help="list fixtures")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        if not args.profile and not args.no_generate:
+            parser.error("create needs --profile (or --no-generate)")
+        create_fixture(args.name, args.profile, args.days, args.seed, args.workers, not args.no_generate,
+                       args.force, args.dir)
+    elif args.command == "restore":
+        restore_fixture(args.name, args.workers, args.dir)
+    elif args.command == "verify":
+        verify_fixture(args.name, fixture_dir=args.dir)
+    else:
+        list_fixtures(args.dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Write-load test for the continuous mock profile.
+Runs N writer threads, each with its own connection, that keep generating the
+continuous profile's tables (one row per server per table, plus incidents) and
+COPY + commit them at a paced target rate. Every report interval prints achieved
+rows/s per table, transactions/s, p50/p95/p99 transaction and commit latency and
+errors, so you can push the rate up until Postgres (with its current triggers and
+indexes) stops keeping up.
+
+nano mock_load.py
+python3 08.mock_data.py --load-test --writers 8 --rows-per-second 5000 --duration 300
+python3 08.mock_data.py --load-test --writers 16 --rows-per-second 0 --report-csv load.csv   (0 = as fast as possible)
+"""
+
+import csv
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from mock_engine import GMT_PLUS_4, Context, CopySink, generate_table, get_conn, load_sources
+
+REPORT_EVERY_SECONDS = 10
+RECONNECT_SECONDS = 1
+
+class LoadStats:
+    """Per-interval counters shared by all writers."""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.lock = threading.Lock()
+        self.total_rows = dict.fromkeys(tables, 0)
+        self.total_commits = 0
+        self.total_errors = 0
+        self.all_latencies = []
+        self._reset()
+
+    def _reset(self):
+        self.rows = dict.fromkeys(self.tables, 0)
+        self.latencies = []
+        self.errors = {}
+
+    def record_commit(self, rows_by_table, txn_seconds, commit_seconds):
+        with self.lock:
+            for table, n in rows_by_table.items():
+                self.rows[table] += n
+                self.total_rows[table] += n
+            self.latencies.append((txn_seconds, commit_seconds))
+            self.all_latencies.append((txn_seconds, commit_seconds))
+            self.total_commits += 1
+
+    def record_error(self, error):
+        name = type(error).__name__
+        with self.lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            self.total_errors += 1
+
+    def take(self):
+        with self.lock:
+            snapshot = (self.rows, self.latencies, self.errors)
+            self._reset()
+        return snapshot
+
+def percentiles_ms(latencies):
+    """p50/p95/p99 in ms for (transaction, commit) latency pairs, as two lists."""
+    if not latencies:
+        return [0.0] * 3, [0.0] * 3
+    values = np.percentile(np.array(latencies) * 1000, [50, 95, 99], axis=0)
+    return list(values[:, 0]), list(values[:, 1])
+
+def writer_loop(index, profile, sources, lookups, stats, stop, interval, seed, batch_rows):
+    """One writer: own connection, one profile unit per transaction, paced to `interval` seconds."""
+    ctx = Context(sources, lookups, seed + index)
+    unit = 0
+    next_at = time.monotonic()
+    conn = None
+    while not stop.is_set():
+        if interval:
+            delay = next_at - time.monotonic()
+            if delay > 0 and stop.wait(delay):
+                break
+            # Behind schedule: write immediately, but don't try to catch up with a burst.
+            next_at = max(next_at + interval, time.monotonic() - interval)
+        try:
+            if conn is None or conn.closed:
+                conn = get_conn()
+            ctx.start_unit(unit, datetime.now(GMT_PLUS_4))
+            unit += 1
+            sink = CopySink(conn, profile.tables, batch_rows)
+            rows_by_table = {}
+            for spec in profile.tables:
+                generated = generate_table(ctx, spec)
+                ctx.generated[spec.name] = generated
+                sink.add(spec, generated)
+                rows_by_table[spec.name] = generated["_n"]
+            started = time.monotonic()
+            sink.flush()
+            committing = time.monotonic()
+            sink.commit()
+            done = time.monotonic()
+            stats.record_commit(rows_by_table, done - started, done - committing)
+        except Exception as e:
+            stats.record_error(e)
+            try:
+                conn.rollback()
+            except Exception:
+                conn = None
+                stop.wait(RECONNECT_SECONDS)
+    if conn is not None and not conn.closed:
+        conn.close()
+
+def report(stats, elapsed, interval_seconds, snapshot, csv_writer=None):
+    rows, latencies, errors = snapshot
+    txn, commit = percentiles_ms(latencies)
+    commits = len(latencies)
+    error_count = sum(errors.values())
+    error_rate = 100.0 * error_count / (commits + error_count) if commits + error_count else 0.0
+    per_table = " ".join(f"{t}={n / interval_seconds:,.0f}" for t, n in rows.items() if n)
+    print(f"[{elapsed:6.0f}s] {sum(rows.values()) / interval_seconds:,.0f} rows/s "
+          f"{commits / interval_seconds:,.1f} txn/s | txn p50/p95/p99 {format_ms(txn)} | "
+          f"commit {format_ms(commit)} | errors {error_count} ({error_rate:.1f}%) {errors or ''}", flush=True)
+    print(f"         rows/s by table: {per_table}", flush=True)
+    if csv_writer:
+        csv_writer.writerow([round(elapsed, 1), commits] + [round(v, 2) for v in txn + commit]
+                            + [error_count] + [rows[t] for t in stats.tables])
+
+def format_ms(values):
+    return "/".join(f"{v:.1f}" for v in values) + "ms"
+
+def run_load_test(profile, writers=4, rows_per_second=1000, duration=None, seed=None,
+                  batch_rows=50_000, report_every=REPORT_EVERY_SECONDS, report_csv=None):
+    from mock_specs import SOURCE_QUERIES
+
+    with get_conn() as conn, conn.cursor() as cur:
+        sources, lookups = load_sources(cur, SOURCE_QUERIES)
+    # rows_per_second targets each per-server table, which gets one row per server per unit.
+    rows_per_unit = max(len(sources["servers"]), 1)
+    interval = writers * rows_per_unit / rows_per_second if rows_per_second else 0
+    seed = seed if seed is not None else time.time_ns()
+    print(f"Load test: {writers} writers, target {rows_per_second or 'max'} rows/s per table "
+          f"({rows_per_unit} rows per table per transaction)", flush=True)
+
+    stats = LoadStats([spec.name for spec in profile.tables])
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=writer_loop, daemon=True,
+                         args=(i, profile, sources, lookups, stats, stop, interval, seed, batch_rows))
+        for i in range(writers)
+    ]
+    csv_file = open(report_csv, "w", newline="") if report_csv else None
+    csv_writer = csv.writer(csv_file) if csv_file else None
+    if csv_writer:
+        csv_writer.writerow(["elapsed_s", "commits", "txn_p50_ms", "txn_p95_ms", "txn_p99_ms",
+                             "commit_p50_ms", "commit_p95_ms", "commit_p99_ms", "errors"] + stats.tables)
+
+    started = last = time.monotonic()
+    for t in threads:
+        t.start()
+    try:
+        while not duration or time.monotonic() - started < duration:
+            remaining = duration - (time.monotonic() - started) if duration else report_every
+            time.sleep(min(report_every, max(remaining, 0.1)))
+            now = time.monotonic()
+            report(stats, now - started, now - last, stats.take(), csv_writer)
+            last = now
+    except KeyboardInterrupt:
+        print("Stopping writers...", flush=True)
+    stop.set()
+    for t in threads:
+        t.join()
+    now = time.monotonic()
+    snapshot = stats.take()
+    if snapshot[1] or snapshot[2]:
+        report(stats, now - started, max(now - last, 1e-9), snapshot, csv_writer)
+    if csv_file:
+        csv_file.close()
+
+    elapsed = now - started
+    txn, commit = percentiles_ms(stats.all_latencies)
+    total = sum(stats.total_rows.values())
+    print(f"Load test complete! {total:,} rows, {stats.total_commits:,} commits, {stats.total_errors:,} errors "
+          f"in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s) | txn p50/p95/p99 {format_ms(txn)} | "
+          f"commit {format_ms(commit)}", flush=True)
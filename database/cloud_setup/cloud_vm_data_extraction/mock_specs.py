@@ -0,0 +1,376 @@
+"""
+Table specs and workload profiles for mock_engine.py.
+Each table is declared once here: its columns and their distributions, where its
+foreign keys come from, and how many rows it gets per day. Profiles list which
+tables a workload generates; the old mock scripts are now thin wrappers that run
+one of these profiles.
+
+nano mock_specs.py
+"""
+
+import numpy as np
+
+from mock_engine import (
+    Bool, BoundedWalk, Choice, DayTimestamp, Derived, Fixed, Hex, IntRange, Key, Lookup,
+    OffsetFrom, Parent, PerSource, Product, Profile, RandomCount, RandomSubset, SameAs,
+    Source, TableSpec, Text, Uniform, Uuid4,
+)
+from text_pools import column_text
+
+# --- REFERENCE DATA ---
+# Ids come from the database; these lists are the fallback for --dry-run.
+SERVER_TO_LOCATION = {
+    "550e8400-e29b-41d4-a716-446655440001": "11111111-1111-1111-1111-111111111111",
+    "b1e2d3c4-5f67-4a89-b012-3456789abcde": "22222222-2222-2222-2222-222222222222",
+    "c2f3e4d5-6a78-4b90-c123-456789abcdef": "33333333-3333-3333-3333-333333333333",
+    "d3a4b5c6-7b89-4c01-d234-56789abcdef0": "44444444-4444-4444-4444-444444444444",
+    "e4b5c6d7-8c90-4d12-e345-6789abcdef01": "55555555-5555-5555-5555-555555555555",
+    "f5c6d7e8-9d01-4e23-f456-789abcdef012": "66666666-6666-6666-6666-666666666666",
+    "a6d7e8f9-0e12-4f34-a567-89abcdef0123": "77777777-7777-7777-7777-777777777777",
+    "b7e8f9a0-1f23-4056-b678-9abcdef01234": "88888888-8888-8888-8888-888888888888",
+    "c8f9a0b1-2a34-4067-c789-abcdef012345": "99999999-9999-9999-9999-999999999999",
+    "d9a0b1c2-3b45-4078-d890-bcdef0123456": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
+}
+
+TEAM_IDS = [
+    "4ce8654e-40a7-46e1-b6e4-d56de831723c",
+    "a0f3be1d-b97b-4618-a300-47b061a39f45",
+    "7ebf8290-7019-47cb-a579-55c9178068a4",
+    "23c9fefc-821a-4b57-9a22-c08192941da2",
+    "35173260-a13e-426a-989f-712bb11a4e27",
+    "64300493-0ef8-43bf-a645-2eea83354b28",
+    "58acc84d-2339-4e2b-bb43-c450d255d9d6",
+    "b44aee22-ed35-43f2-9dd3-c4dada0849b2",
+    "9e97dafc-c68c-41e7-9132-cb6276b73229",
+    "f7cb1040-d6e8-4ec3-b020-08143ac40224",
+    "6322eeae-34af-42e8-bd68-ec637a3a240a",
+    "7c557c00-2ccc-4cdd-9764-261d7f76778d",
+    "e5c329a0-8fb3-4538-8bdf-4e28fc686235",
+    "7a27e6e9-1c2d-44ec-87cc-34d4f7bdd34e",
+    "2747e9a1-575c-4fa3-973b-116e692dca0e",
+    "a2680d1a-aeaf-4068-898e-d54f62b15701",
+    "0fdcf004-cb51-41d4-ac1a-6dcd99af3a38",
+    "0121e9ce-5132-49c1-a934-567f60ad101c",
+    "b3f3e564-883d-4761-a7be-33a153a83cc6",
+    "0441e939-30b9-4f1d-9c6c-7ca86b30cd2e",
+    "f9b76396-74c0-40e0-92b1-c9da8a0853bc",
+    "122f08d9-d140-4f6a-9b83-8d1fdb16d489",
+    "aa1b5f9c-f52d-40ab-a91f-b209416671ec",
+    "c7c0a721-38da-47f6-bff3-e43697d4f40b",
+    "1937a92a-6738-41db-b858-5ff8c5394f44",
+    "15ef2d87-df1b-49a9-9fac-d317623fd800",
+    "6680064a-19ea-44f9-aa51-48b41d34d662",
+    "7070a109-3733-4815-aae6-677ad03f35b8",
+    "1daad880-3501-4c2b-85c9-54bb756532c5",
+    "8147fa57-4f08-423f-98ea-544c55702dd2",
+    "0f85996d-4e4e-488c-b365-17c3702508d9",
+    "c6c292cf-8b32-4360-9cde-efdab4081edf",
+    "c5e04a6a-5575-4660-af5f-99ebab81b65d",
+    "dcf3ea98-ff89-4ab5-be2b-d6109f8391df",
+    "0050bd28-dcd5-499b-8eef-2a7e5d060257",
+    "64c06e2e-17a4-4c3c-9645-ea90b159b8fd",
+    "60bec96e-0e18-4fb4-8d96-45dbb7d19121",
+    "d1901175-c118-4989-88a9-da30775a4f22",
+    "680b38db-fa5f-451b-99f5-120465d2d767",
+    "87be4895-4362-4151-ba1b-9cef46dec44e"
+]
+
+APP_IDS = [
+    "0f88076d-ce65-4be4-86a1-9caba60c9a7c",
+    "b0dd3363-5806-4752-98ea-34870ba3a70f",
+    "4cdfa4e8-bc8b-4832-9bc8-3c4d33319347",
+    "a76318ab-9c3e-4c79-b32c-b5f813170764",
+    "9b349997-6c3a-46fd-a01e-4b80ec407c41",
+    "f0e08019-3527-4b65-b35b-87e2c3aa8acf",
+    "76a97d50-3d39-4868-b6e9-7b00d1a570e4",
+    "2157d7f6-9de2-40bd-bb38-7c0dea779047",
+    "2688b956-c22c-46f9-9819-92d6fe7a8bd9",
+    "14a613b9-eba1-4fd4-a5d5-902b10ccba01",
+    "08cd62d4-e0ad-4cfe-ad21-f3c45754ef4b",
+    "2476e9c3-946d-42ac-a6d7-7d5883cf5a11",
+    "5b974b78-a961-45f4-8f2b-fb5e5ab0f9ce",
+    "e89e66dd-6613-487b-9e93-9cb1cc43a226",
+    "48bb85b8-ef9f-4429-b512-afb3c49efea9",
+    "4155f5e5-5949-44b5-9877-fd5ab76f0d3a",
+    "25c8a99a-2c24-4a44-9dbf-3b568b2b66a1",
+    "03800471-39cf-4293-b7ef-beca6f13c448",
+    "7cd91651-f513-4d81-9ce6-2f6952aac818",
+    "07c85a94-4f2d-427d-a6e1-ae1f07775c53",
+    "cc79f84d-0999-4d33-817b-10390a0386e6",
+    "ec8a6629-9e2f-4955-8a26-ef2c14adc5be",
+    "87490c0a-59a8-45ab-a95f-9c84c3ef4f50",
+    "3a7e4521-6f4b-45bc-b4ec-ee75d28c4273",
+    "b5adc66a-e15c-44ef-8b10-90169f239314",
+    "ab892203-542d-47dd-a9fe-8767af263ff7",
+    "c9498bb1-3ec2-41c8-b28d-6014915303d1",
+    "f0e847ea-eef5-40d4-88d1-c42f3ec1650e",
+    "6c77ea9d-dc7e-4303-90dd-927acf66423c",
+    "8095f8f9-2ded-46f8-b8e2-de8c375fc154",
+    "c3d78c1d-0fde-4aee-b031-ecbe8571f658",
+    "f12655d9-cb2a-4e53-8b16-45d71051110f",
+    "46b65d7d-84f1-4b3c-8327-f498c016dfa3",
+    "1cf9da55-bd7f-45b1-b28f-dd079c5e13fb",
+    "47a60be5-c39b-4fcb-883a-f479fb6c7fa7",
+    "e6ab0c74-2f0d-4716-8691-3e975706ff09",
+    "93d4af35-c724-4b01-83b8-ea57f787e91f",
+    "b67ff998-7b7e-456f-90e5-03a07f94a33b",
+    "8cf8407d-60a7-4097-b977-bcedf7d37f12",
+    "78f91594-bcc0-45a3-8b0f-6dce0880a1bd",
+    "e259168f-1577-4f20-ac3b-ef719f36b580",
+    "70e003b9-0211-4134-9485-59481f0edd41",
+    "6ce478c9-e59c-4dd5-9119-ea04538cbf14",
+    "d6d6a5c5-b00b-4586-b2da-30196dc3d030",
+    "baa931bb-4052-4566-8969-ebcff9ea8d69"
+]
+
+FALLBACK_SOURCES = {
+    "servers": list(SERVER_TO_LOCATION),
+    "apps": APP_IDS,
+    "teams": TEAM_IDS,
+    "users": [],
+    "first_user": [],
+    "devops_members": [],
+    "locations": sorted(set(SERVER_TO_LOCATION.values())),
+    "incidents": [],
+}
+FALLBACK_LOOKUPS = {"servers_location_id": SERVER_TO_LOCATION}
+
+SOURCE_QUERIES = {
+    "servers": "SELECT server_id, location_id FROM public.server ORDER BY server_id",
+    "apps": "SELECT app_id FROM public.applications ORDER BY app_id",
+    "teams": "SELECT team_id FROM public.team_management ORDER BY team_id",
+    "users": "SELECT user_id FROM public.users ORDER BY user_id",
+    "first_user": "SELECT user_id FROM public.users LIMIT 1",
+    "devops_members": "SELECT member_id FROM public.team_members WHERE LOWER(role) = 'devops' ORDER BY member_id",
+    "locations": "SELECT location_id FROM public.location ORDER BY location_id",
+    "incidents": "SELECT incident_id FROM public.incident_response_logs ORDER BY random() LIMIT 1000",
+}
+
+# --- ENUMS ---
+LOG_LEVEL_ENUM = ["DEBUG", "INFO", "WARN", "ERROR", "CRITICAL"]
+LOG_SOURCE_ENUM = ["APP", "DATABASE", "SECURITY", "SYSTEM"]
+
+def coin(ctx, batch):
+    return ctx.rng.random(batch.n) < 0.5
+
+def plus_random(column, low, high, decimals=None):
+    """Earlier column plus a random amount (ints, or floats rounded to decimals)."""
+    def fn(ctx, batch):
+        if decimals is None:
+            return batch.row[column] + ctx.rng.integers(low, high + 1, batch.n)
+        return (batch.row[column] + ctx.rng.uniform(low, high, batch.n).round(decimals)).round(decimals)
+    return Derived(fn)
+
+def up_to(column, decimals=None):
+    """Random value between 0 and an earlier column (inclusive for ints)."""
+    def fn(ctx, batch):
+        if decimals is None:
+            return ctx.rng.integers(0, batch.row[column] + 1)
+        return ctx.rng.uniform(0, batch.row[column]).round(decimals)
+    return Derived(fn)
+
+def times(column, factor):
+    return Derived(lambda ctx, batch: (batch.row[column] * factor).round(2))
+
+def error_code(ctx, batch):
+    return ctx.rng.integers(1000, 10000, batch.n).astype(str)
+
+def unique_suffix(ctx, batch):
+    return Hex(4, unique=True).generate(ctx, batch)
+
+def username(ctx, batch):
+    return np.array([f"{u}_{s}" for u, s in zip(column_text("username", batch.n, ctx.rng), unique_suffix(ctx, batch))])
+
+def email(ctx, batch):
+    first = column_text("first_name", batch.n, ctx.rng)
+    last = column_text("last_name", batch.n, ctx.rng)
+    suffix = unique_suffix(ctx, batch)
+    return np.array([f"{f.lower()}.{l.lower()}.{s}@usercimd.com" for f, l, s in zip(first, last, suffix)])
+
+# --- TABLE SPECS ---
+
+SERVER_METRICS = TableSpec("server_metrics", rows=PerSource("servers"), columns={
+    "server_id": Key("servers"),
+    "location_id": Lookup("server_id", "servers_location_id"),
+    "timestamp": DayTimestamp(),
+    "cpu_usage": Uniform(5, 80),
+    "memory_usage": Uniform(5, 80),
+    "disk_read_ops_per_sec": IntRange(5, 200),
+    "disk_write_ops_per_sec": IntRange(5, 200),
+    "network_in_bytes": IntRange(100, 2000),
+    "network_out_bytes": IntRange(100, 2000),
+    "uptime_in_mins": IntRange(1000, 5000),
+    "latency_in_ms": Uniform(0.5, 3, 3),
+    "disk_usage_percent": Uniform(5, 80),
+    "error_count": IntRange(2, 10),
+    "disk_read_throughput": IntRange(10000, 800000),
+    "disk_write_throughput": IntRange(10000, 800000),
+})
+
+def application_logs_spec(name, rows, user_source):
+    return TableSpec(name, table="public.application_logs", rows=rows, columns={
+        "log_id": Uuid4(),
+        "server_id": Key("servers"),
+        "log_level": Choice(LOG_LEVEL_ENUM),
+        "log_timestamp": DayTimestamp(),
+        "trace_id": Uuid4(),
+        "span_id": Uuid4(),
+        "source_ip": Text(),
+        "user_id": Source(user_source),
+        "log_source": Choice(LOG_SOURCE_ENUM),
+        "app_id": Source("apps"),
+        "timestamp": DayTimestamp(),
+    })
+
+def error_logs_spec(name, parent, with_incident=True):
+    columns = {
+        "error_id": Uuid4(),
+        "server_id": Parent(parent, "server_id"),
+        "timestamp": DayTimestamp(),
+        "error_severity": Choice(["INFO", "WARNING", "CRITICAL"]),
+        "error_message": Text(),
+        "resolved": Bool(),
+        "resolved_at": OffsetFrom("timestamp", 1, 60, present=lambda ctx, batch: batch.row["resolved"]),
+        "error_source": Choice(["APP", "SYSTEM", "SECURITY", "NETWORK"]),
+        "error_code": Derived(error_code),
+        "recovery_action": Text(),
+        "log_id": Parent(parent, "log_id"),
+    }
+    if with_incident:
+        columns["incident_id"] = Source("incidents")
+    return TableSpec(name, table="public.error_logs", rows=SameAs(parent), columns=columns)
+
+def user_access_logs_spec(name, user_source, requires=()):
+    return TableSpec(name, table="public.user_access_logs", rows=PerSource("servers"), requires=requires, columns={
+        "access_id": Uuid4(),
+        "user_id": Source(user_source),
+        "server_id": Key("servers"),
+        "access_type": Choice(["READ", "WRITE", "DELETE", "EXECUTE"]),
+        "timestamp": DayTimestamp(),
+        "access_ip": Text(),
+        "user_agent": Text(),
+    })
+
+APPLICATION_LOGS = application_logs_spec("application_logs", PerSource("servers"), "first_user")
+USER_ACCESS_LOGS = user_access_logs_spec("user_access_logs", "first_user")
+ERROR_LOGS = error_logs_spec("error_logs", "application_logs")
+
+INCIDENT_RESPONSE_LOGS = TableSpec("incident_response_logs", rows=Fixed(1), publishes={"incidents": "incident_id"},
+                                   columns={
+    "incident_id": Uuid4(),
+    "server_id": Source("servers", nullable=False),
+    "timestamp": DayTimestamp(),
+    "response_team_id": Source("teams"),
+    "incident_summary": Text(),
+    "resolution_time_minutes": IntRange(1, 240),
+    "status": Choice(["Open", "In Progress", "Resolved", "Escalated"]),
+    "priority_level": Choice(["Low", "Medium", "High", "Critical"]),
+    "incident_type": Choice(["hardware", "software", "network", "security"]),
+    "root_cause": Text(),
+    "escalation_flag": Bool(),
+})
+
+DOWNTIME_LOGS = TableSpec("downtime_logs", rows=SameAs("incident_response_logs"), columns={
+    "downtime_id": Uuid4(),
+    "server_id": Parent("incident_response_logs", "server_id"),
+    "start_time": DayTimestamp(),
+    "end_time": OffsetFrom("start_time", 1, 120, present=coin),
+    "downtime_cause": Text(),
+    "sla_tracking": Bool(),
+    "incident_id": Parent("incident_response_logs", "incident_id"),
+    "is_planned": Bool(),
+    "recovery_action": Text(),
+    "timestamp": DayTimestamp(),
+})
+
+USERS = TableSpec("users", rows=RandomCount(3, 7), publishes={"users": "user_id"}, columns={
+    "user_id": Uuid4(),
+    "username": Derived(username),
+    "email": Derived(email),
+    "password_hash": Hex(32),
+    "full_name": Text(),
+    "date_joined": DayTimestamp(),
+    "last_login": OffsetFrom("date_joined", 1, 23, unit="h"),
+    "location_id": Source("locations"),
+})
+
+COST_DATA = TableSpec("cost_data", rows=Product("teams", "servers"), columns={
+    "server_id": Key("servers"),
+    "timestamp": DayTimestamp(),
+    "cost_per_hour": Uniform(0.01, 10),
+    "total_monthly_cost": times("cost_per_hour", 24 * 30),
+    "team_allocation": Key("teams"),
+    "cost_per_day": times("cost_per_hour", 24),
+    "cost_type": Choice(["compute", "storage", "network"]),
+    "cost_adjustment": Uniform(-5, 5),
+    "cost_adjustment_reason": Text(),
+    "cost_basis": Choice(["on-demand", "reserved", "spot"]),
+})
+
+def resource_allocation_spec(name, actual_usage):
+    columns = {
+        "server_id": Key("servers"),
+        "app_id": Key("apps"),
+        "workload_type": Choice(["batch", "realtime", "interactive"]),
+        "allocated_memory": IntRange(512, 65536),
+        "allocated_cpu": Uniform(0.1, 64),
+        "allocated_disk_space": IntRange(10, 1000),
+        "resource_tag": Text(),
+        "timestamp": DayTimestamp(),
+        "utilization_percentage": Uniform(0, 100),
+        "autoscaling_enabled": Bool(),
+        "max_allocated_memory": plus_random("allocated_memory", 0, 1024),
+        "max_allocated_cpu": plus_random("allocated_cpu", 0, 8, decimals=2),
+        "max_allocated_disk_space": plus_random("allocated_disk_space", 0, 100),
+        "cost_per_hour": Uniform(0.01, 10, 4),
+        "allocation_status": Choice(["active", "pending", "deallocated"]),
+    }
+    columns.update(actual_usage)
+    return TableSpec(name, table="public.resource_allocation", rows=Product("servers", "apps"), columns=columns)
+
+# Actual usage independent of the previous day, bounded by the allocation.
+RESOURCE_ALLOCATION = resource_allocation_spec("resource_allocation", {
+    "actual_memory_usage": up_to("allocated_memory"),
+    "actual_cpu_usage": up_to("allocated_cpu", decimals=2),
+    "actual_disk_usage": up_to("allocated_disk_space"),
+})
+
+# Actual usage drifts day to day inside a per-app usage band; CPU and memory dip at
+# weekends (and follow the time of day when units are shorter than a day), disk only
+# grows and shrinks slowly.
+RESOURCE_ALLOCATION_WALK = resource_allocation_spec("resource_allocation_walk", {
+    "actual_cpu_usage": BoundedWalk("cpu", tolerance=2, diurnal=0.15, weekly=0.2),
+    "actual_memory_usage": BoundedWalk("mem", tolerance=512, integer=True, diurnal=0.05, weekly=0.1),
+    "actual_disk_usage": BoundedWalk("disk", tolerance=20, integer=True),
+})
+
+SAMPLED_APPLICATION_LOGS = application_logs_spec("sampled_application_logs", RandomSubset("servers", 3, 10), "users")
+SAMPLED_ERROR_LOGS = error_logs_spec("sampled_error_logs", "sampled_application_logs", with_incident=False)
+DEVOPS_ACCESS_LOGS = user_access_logs_spec("devops_access_logs", "devops_members", requires=("devops_members",))
+
+# --- PROFILES ---
+
+# aggregated_metrics isn't generated: it is the hourly rollup of server_metrics
+# (11_rollup_aggregated_metrics.sql), which mock_engine runs after loading it.
+# Neither is alert_history: the scripts defined insert_alert_history() but never called it.
+MAIN_TABLES = [
+    SERVER_METRICS, APPLICATION_LOGS, USER_ACCESS_LOGS, ERROR_LOGS, INCIDENT_RESPONSE_LOGS, DOWNTIME_LOGS,
+]
+SLOW_TABLES = [USERS, RESOURCE_ALLOCATION, COST_DATA]
+
+PROFILES = {p.name: p for p in [
+    Profile("continuous", MAIN_TABLES, sleep_seconds=60,
+            description="one row per server every minute, forever (08.mock_data.py)"),
+    Profile("bulk-main-90-days", MAIN_TABLES, days=90,
+            description="90 days of metrics and logs at 12:00 (mock_data_bulk.py)"),
+    Profile("slow-changing-only", SLOW_TABLES, days=90,
+            description="90 days of users, resource allocation and cost data (mock_data_bulk_slow.py)"),
+    Profile("bulk-90-days", SLOW_TABLES + MAIN_TABLES, days=90,
+            description="90 days of every table (mock_data_bulk_combined.py)"),
+    Profile("slow-changing-once", SLOW_TABLES, days=1, hour=None,
+            description="one run of the slow-changing tables at the current time (mockdataslow.py)"),
+    Profile("specific-90-days", [SAMPLED_APPLICATION_LOGS, SAMPLED_ERROR_LOGS, RESOURCE_ALLOCATION_WALK,
+                                 DEVOPS_ACCESS_LOGS], days=90, replace_range=["public.resource_allocation"],
+            description="90 days of sampled error logs, drifting resource usage and DevOps access "
+                        "(specific_mock_data_bulk_combined.py)"),
+]}
@@ -0,0 +1,318 @@
+"""
+Streaming, constant-memory generator for fleet-scale server_metrics.
+Rows are generated in fixed-size numpy chunks (time-major: every server for one
+block of minutes) and each chunk is COPY'd straight into Postgres before the next
+one is built, so memory stays flat no matter how many rows are produced.
+
+Size is driven by a scale factor, like TPC scale factors:
+    SF 1    = 1,000 servers x 30 days of per-minute metrics (~43M rows)
+    SF 0.01 = 10 servers (same shape as the old bulk scripts, but per minute)
+
+nano mock_stream.py
+python3 mock_stream.py --sf 1 --days 30
+python3 mock_stream.py --sf 0.1 --days 7 --dry-run   (generate only, no DB)
+python3 mock_stream.py --sf 5 --locations 200   (spread the fleet over 200 real cities)
+"""
+
+import argparse
+import io
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+
+from geo_cache import sample_cities
+
+# --- CONFIGURABLE PARAMETERS ---
+SERVERS_PER_SF = 1000
+DEFAULT_DAYS = 30
+INTERVAL_SECONDS = 60
+CHUNK_ROWS = 100_000
+PROGRESS_EVERY_SECONDS = 5
+SEED = 42
+
+# Servers generated for a fleet get stable ids, so reruns at the same scale
+# factor hit the same server rows.
+FLEET_NAMESPACE = uuid.UUID("6f1c2d1e-9a57-4c3e-8d44-0c1f3b0e5a10")
+
+# Locations seeded by seed_locations_and_servers.py
+LOCATION_IDS = [
+    "11111111-1111-1111-1111-111111111111",
+    "22222222-2222-2222-2222-222222222222",
+    "33333333-3333-3333-3333-333333333333",
+    "44444444-4444-4444-4444-444444444444",
+    "55555555-5555-5555-5555-555555555555",
+    "66666666-6666-6666-6666-666666666666",
+    "77777777-7777-7777-7777-777777777777",
+    "88888888-8888-8888-8888-888888888888",
+    "99999999-9999-9999-9999-999999999999",
+    "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
+]
+
+SERVER_METRICS_COLUMNS = [
+    "server_id", "location_id", "timestamp", "cpu_usage", "memory_usage", "disk_read_ops_per_sec",
+    "disk_write_ops_per_sec", "network_in_bytes", "network_out_bytes", "uptime_in_mins", "latency_in_ms",
+    "disk_usage_percent", "error_count", "disk_read_throughput", "disk_write_throughput"
+]
+
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "postgres",
+    "user": "postgres",
+    "password": os.getenv("TELE_POSTGRES_PASS"),
+}
+
+GMT_PLUS_4 = timezone(timedelta(hours=4))
+
+
+def get_conn():
+    return psycopg2.connect(**DB_CONFIG)
+
+# --- FLEET PLANNING ---
+
+def fleet_plan(scale_factor, days=DEFAULT_DAYS, interval_seconds=INTERVAL_SECONDS):
+    n_servers = max(1, int(round(scale_factor * SERVERS_PER_SF)))
+    steps = int(days * 86400 // interval_seconds)
+    return {
+        "servers": n_servers,
+        "steps": steps,
+        "interval_seconds": interval_seconds,
+        "rows": n_servers * steps,
+    }
+
+def fleet_server_ids(n_servers):
+    return [str(uuid.uuid5(FLEET_NAMESPACE, f"server-{i}")) for i in range(n_servers)]
+
+def fleet_location_ids(n_servers, location_ids=LOCATION_IDS):
+    return [location_ids[i % len(location_ids)] for i in range(n_servers)]
+
+def fleet_locations(n_locations, seed=SEED):
+    """Location rows for n cities from the geo cache (only loaded when asked for)."""
+    cities = sample_cities(np.random.default_rng(seed), n_locations)
+    return [
+        (str(uuid.uuid5(FLEET_NAMESPACE, f"location-{i}")),
+         f"SRID=4326;POINT({cities['lng'][i]} {cities['lat'][i]})",
+         "United States", str(cities["state"][i]), str(cities["name"][i]))
+        for i in range(n_locations)
+    ]
+
+def ensure_fleet_locations(cur, location_rows, page_size=5000):
+    execute_values(cur, """
+        INSERT INTO public.location (location_id, location_geom, country, region, location_name)
+        VALUES %s
+        ON CONFLICT (location_id) DO NOTHING
+    """, location_rows, template="(%s, ST_GeogFromText(%s), %s, %s, %s)", page_size=page_size)
+
+def ensure_fleet_servers(cur, server_ids, location_ids, page_size=5000):
+    execute_values(cur, """
+        INSERT INTO public.server (server_id, location_id)
+        VALUES %s
+        ON CONFLICT (server_id) DO NOTHING
+    """, list(zip(server_ids, location_ids)), page_size=page_size)
+
+# --- CHUNK GENERATION ---
+
+def _server_metrics_values(rng, n):
+    return {
+        "cpu_usage": rng.uniform(5, 80, n).round(2),
+        "memory_usage": rng.uniform(5, 80, n).round(2),
+        "disk_read_ops_per_sec": rng.integers(5, 201, n),
+        "disk_write_ops_per_sec": rng.integers(5, 201, n),
+        "network_in_bytes": rng.integers(100, 2001, n),
+        "network_out_bytes": rng.integers(100, 2001, n),
+        "uptime_in_mins": rng.integers(1000, 5001, n),
+        "latency_in_ms": rng.uniform(0.5, 3, n).round(3),
+        "disk_usage_percent": rng.uniform(5, 80, n).round(2),
+        "error_count": rng.integers(2, 11, n),
+        "disk_read_throughput": rng.integers(10000, 800001, n),
+        "disk_write_throughput": rng.integers(10000, 800001, n),
+    }
+
+def iter_server_metrics_chunks(server_ids, location_ids, start, steps,
+                               interval_seconds=INTERVAL_SECONDS, chunk_rows=CHUNK_ROWS, seed=SEED):
+    """Yield column dicts of at most chunk_rows rows, ordered by time then server."""
+    rng = np.random.default_rng(seed)
+    servers = np.asarray(server_ids)
+    locations = np.asarray(location_ids)
+    n_servers = len(servers)
+    start64 = np.datetime64(start.replace(tzinfo=None), "s")
+    interval = np.timedelta64(interval_seconds, "s")
+
+    # Either several minutes of the whole fleet fit in a chunk, or a single
+    # minute is split into server slices.
+    steps_per_chunk = max(1, chunk_rows // n_servers)
+    servers_per_chunk = min(n_servers, chunk_rows)
+
+    for step0 in range(0, steps, steps_per_chunk):
+        n_steps = min(steps_per_chunk, steps - step0)
+        for s0 in range(0, n_servers, servers_per_chunk):
+            s1 = min(n_servers, s0 + servers_per_chunk)
+            width = s1 - s0
+            n = width * n_steps
+            offsets = np.repeat(np.arange(step0, step0 + n_steps), width)
+            chunk = {
+                "server_id": np.tile(servers[s0:s1], n_steps),
+                "location_id": np.tile(locations[s0:s1], n_steps),
+                "timestamp": start64 + offsets * interval,
+            }
+            chunk.update(_server_metrics_values(rng, n))
+            yield chunk
+
+# --- WRITERS ---
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    text = str(value)
+    if "\\" in text or "\t" in text or "\n" in text or "\r" in text:
+        text = text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return text
+
+def _column_strings(values, tz_suffix=""):
+    if np.issubdtype(values.dtype, np.datetime64):
+        text = np.datetime_as_string(values)
+        if tz_suffix:
+            text = np.char.add(text, tz_suffix)
+        return np.where(np.isnat(values), "\\N", text)
+    if values.dtype == np.bool_:
+        return np.where(values, "t", "f")
+    if values.dtype == object:
+        return [_copy_value(v) for v in values]
+    return values.astype(str)
+
+def format_copy_text(chunk, columns, tz_suffix=""):
+    """Render a column dict as COPY text format (tab separated, one row per line).
+
+    Object columns may hold None (written as NULL) and free text, which is escaped;
+    NaT timestamps are written as NULL.
+    """
+    cols = [_column_strings(np.asarray(chunk[c]), tz_suffix) for c in columns]
+    lines = ["\t".join(row) for row in zip(*cols)]
+    lines.append("")
+    return "\n".join(lines)
+
+class PostgresCopyWriter:
+    """Writes each chunk with one COPY ... FROM STDIN and commits it."""
+
+    def __init__(self, conn, table, columns):
+        self.conn = conn
+        self.columns = columns
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        self.sql = f"COPY {table} ({quoted}) FROM STDIN"
+
+    def write(self, chunk):
+        payload = format_copy_text(chunk, self.columns)
+        with self.conn.cursor() as cur:
+            cur.copy_expert(self.sql, io.StringIO(payload))
+        self.conn.commit()
+        return len(payload)
+
+    def close(self):
+        pass
+
+class NullWriter:
+    """Formats chunks but discards them; measures generator throughput only."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def write(self, chunk):
+        return len(format_copy_text(chunk, self.columns))
+
+    def close(self):
+        pass
+
+# --- PROGRESS ---
+
+class Progress:
+    def __init__(self, total_rows, every_seconds=PROGRESS_EVERY_SECONDS):
+        self.total_rows = total_rows
+        self.every_seconds = every_seconds
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self.last_report = self.started
+
+    def update(self, rows, nbytes):
+        self.rows += rows
+        self.bytes += nbytes
+        now = time.monotonic()
+        if now - self.last_report >= self.every_seconds:
+            self.last_report = now
+            self.report(now)
+
+    def report(self, now=None):
+        elapsed = max((now or time.monotonic()) - self.started, 1e-9)
+        rate = self.rows / elapsed
+        throughput = f"{rate:,.0f} rows/s | {self.bytes / elapsed / 1e6:.1f} MB/s | elapsed {elapsed:.0f}s"
+        if not self.total_rows:
+            print(f"{self.rows:,} rows | {throughput}", flush=True)
+            return
+        pct = 100.0 * self.rows / self.total_rows
+        eta = (self.total_rows - self.rows) / rate if rate else 0
+        print(f"{self.rows:,}/{self.total_rows:,} rows ({pct:.1f}%) | {throughput} | ETA {eta:.0f}s", flush=True)
+
+    def finish(self):
+        self.report()
+        elapsed = time.monotonic() - self.started
+        print(f"Done: {self.rows:,} rows in {elapsed:.1f}s", flush=True)
+
+# --- PIPELINE ---
+
+def stream(chunks, writer, progress):
+    for chunk in chunks:
+        nbytes = writer.write(chunk)
+        progress.update(len(chunk["timestamp"]), nbytes)
+    writer.close()
+    progress.finish()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stream fleet-scale server_metrics into Postgres.")
+    parser.add_argument("--sf", type=float, default=1.0, help="scale factor (1 = 1,000 servers)")
+    parser.add_argument("--days", type=float, default=DEFAULT_DAYS, help="days of history ending now")
+    parser.add_argument("--interval", type=int, default=INTERVAL_SECONDS, help="seconds between samples")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows generated per chunk")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--locations", type=int, default=0,
+                        help="seed this many city locations for the fleet (default: the 10 seeded locations)")
+    parser.add_argument("--dry-run", action="store_true", help="generate and format only, do not connect")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    plan = fleet_plan(args.sf, args.days, args.interval)
+    end = datetime.now(GMT_PLUS_4).replace(second=0, microsecond=0)
+    start = end - timedelta(seconds=plan["steps"] * plan["interval_seconds"])
+    server_ids = fleet_server_ids(plan["servers"])
+    location_rows = fleet_locations(args.locations, args.seed) if args.locations else []
+    if location_rows:
+        location_ids = fleet_location_ids(plan["servers"], [row[0] for row in location_rows])
+    else:
+        location_ids = fleet_location_ids(plan["servers"])
+    print(f"SF {args.sf}: {plan['servers']:,} servers x {plan['steps']:,} samples "
+          f"= {plan['rows']:,} rows from {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}", flush=True)
+
+    chunks = iter_server_metrics_chunks(server_ids, location_ids, start, plan["steps"],
+                                        plan["interval_seconds"], args.chunk_rows, args.seed)
+    progress = Progress(plan["rows"])
+    if args.dry_run:
+        stream(chunks, NullWriter(SERVER_METRICS_COLUMNS), progress)
+        return
+
+    with get_conn() as conn:
+        print("DB connected", flush=True)
+        with conn.cursor() as cur:
+            if location_rows:
+                ensure_fleet_locations(cur, location_rows)
+            ensure_fleet_servers(cur, server_ids, location_ids)
+        conn.commit()
+        writer = PostgresCopyWriter(conn, "public.server_metrics", SERVER_METRICS_COLUMNS)
+        stream(chunks, writer, progress)
+
+if __name__ == "__main__":
+    main()
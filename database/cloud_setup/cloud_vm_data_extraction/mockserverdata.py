@@ -1,16 +1,6 @@
 # nano mockserverdata.py
 # python3 mockserverdata.py
-
-import psycopg2
-import os
-
-DB_CONFIG = {
-    "host": "localhost",
-    "port": 5432,
-    "database": "postgres",
-    "user": "postgres",
-    "password": os.getenv("TELE_POSTGRES_PASS"),
-}
+# Loading goes through seed_reference_data.py (location first, then server).
 
 SERVER_IDS = [
     "550e8400-e29b-41d4-a716-446655440001",
@@ -26,7 +16,7 @@ SERVER_IDS = [
 ]
 
 SERVER_TO_LOCATION = {
-    "550e8400-e29b-41d4-a716-446655440000": "11111111-1111-1111-1111-111111111111",
+    "550e8400-e29b-41d4-a716-446655440001": "11111111-1111-1111-1111-111111111111",
     "b1e2d3c4-5f67-4a89-b012-3456789abcde": "22222222-2222-2222-2222-222222222222",
     "c2f3e4d5-6a78-4b90-c123-456789abcdef": "33333333-3333-3333-3333-333333333333",
     "d3a4b5c6-7b89-4c01-d234-56789abcdef0": "44444444-4444-4444-4444-444444444444",
@@ -38,20 +28,6 @@ SERVER_TO_LOCATION = {
     "d9a0b1c2-3b45-4078-d890-bcdef0123456": "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
 }
 
-def insert_servers():
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
-    for server_id in SERVER_IDS:
-        location_id = SERVER_TO_LOCATION[server_id]
-        cur.execute("""
-            INSERT INTO public.server (server_id, location_id)
-            VALUES (%s, %s)
-            ON CONFLICT (server_id) DO NOTHING
-        """, (server_id, location_id))
-    conn.commit()
-    cur.close()
-    conn.close()
-    print("Inserted all servers into the server table.")
-
 if __name__ == "__main__":
-    insert_servers()
\ No newline at end of file
+    from seed_reference_data import main
+    main(["server"])
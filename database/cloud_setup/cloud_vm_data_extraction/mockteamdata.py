@@ -1,17 +1,6 @@
 # nano mockteamdata.py
 # python3 mockteamdata.py
-
-import psycopg2
-import os
-import random
-
-DB_CONFIG = {
-    "host": "localhost",
-    "port": 5432,
-    "database": "postgres",
-    "user": "postgres",
-    "password": os.getenv("TELE_POSTGRES_PASS"),
-}
+# Loading goes through seed_reference_data.py (location first, then teams).
 
 DEPARTMENTS_AND_TEAMS = {
     "Engineering": [
@@ -89,31 +78,12 @@ TEAM_DESCRIPTIONS = {
     "Accounting Team": "Handles bookkeeping and financial reporting."
 }
 
-def get_conn():
-    return psycopg2.connect(**DB_CONFIG)
-
-def get_random_location_id(cur):
-    cur.execute("SELECT location_id FROM public.location")
-    locations = [row[0] for row in cur.fetchall()]
-    return random.choice(locations) if locations else None
-
-def insert_teams(cur):
-    for department, teams in DEPARTMENTS_AND_TEAMS.items():
-        for team in teams:
-            description = TEAM_DESCRIPTIONS.get(team, "No description available.")
-            location_id = get_random_location_id(cur)
-            # Remove 'Team' from team name, lowercase, remove spaces
-            team_email_name = team.replace("Team", "").replace(" ", "").lower()
-            department_email = department.lower().replace(" ", "")
-            team_contact_email = f"{team_email_name}@{department_email}cimd.com"
-            cur.execute("""
-                INSERT INTO public.team_management (team_name, department, team_description, team_office_location_id, team_contact_email)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (team_name) DO NOTHING
-            """, (team, department, description, location_id, team_contact_email))
+def team_contact_email(team, department):
+    # Remove 'Team' from team name, lowercase, remove spaces
+    team_email_name = team.replace("Team", "").replace(" ", "").lower()
+    department_email = department.lower().replace(" ", "")
+    return f"{team_email_name}@{department_email}cimd.com"
 
 if __name__ == "__main__":
-    with get_conn() as conn, conn.cursor() as cur:
-        insert_teams(cur)
-        conn.commit()
-    print("Seeded teams table.")
\ No newline at end of file
+    from seed_reference_data import main
+    main(["team_management"])
@@ -0,0 +1,146 @@
+"""
+Partition maintenance for the time-partitioned tables (09_partition_server_metrics.sql).
+Every table listed in public.partition_config gets its next `premake` day/week
+partitions created ahead of time (with their indexes, inherited from the parent),
+and partitions older than its retention dropped whole - no DELETE, no VACUUM.
+Raw server_metrics is downsampled into server_metrics_1m first, and waits for the
+hourly rollup (12_retention_downsampling.sql). Each partition is expired in its own
+transaction and logged in retention_log, so an interrupted run just resumes.
+The work itself is done in the database; this script runs it, prints what changed
+and the space reclaimed, and can list or backfill partitions.
+
+Run it from cron at least daily, e.g.
+    15 * * * * cd /home/cimd/cloud_vm_data_extraction && python3 partition_manager.py
+
+nano partition_manager.py
+python3 partition_manager.py
+python3 partition_manager.py --list
+python3 partition_manager.py --dry-run                             (what retention would expire)
+python3 partition_manager.py --ensure 2025-01-01 2025-04-01        (backfill before a bulk load)
+"""
+
+import argparse
+import os
+from datetime import date, datetime, timedelta
+
+import psycopg2
+
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "postgres",
+    "user": "postgres",
+    "password": os.getenv("TELE_POSTGRES_PASS"),
+}
+
+
+def get_conn():
+    return psycopg2.connect(**DB_CONFIG)
+
+def partitioned_tables(cur):
+    """Configured parents that are actually partitioned (empty before 09 is applied)."""
+    cur.execute("SELECT to_regclass('public.partition_config') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return []
+    cur.execute("""
+        SELECT c.parent_table FROM public.partition_config c
+        JOIN pg_partitioned_table pt ON pt.partrelid = to_regclass('public.' || quote_ident(c.parent_table))
+        ORDER BY 1
+    """)
+    return [r[0] for r in cur.fetchall()]
+
+def ensure_partitions(cur, table, first, last):
+    """Create the partitions covering [first, last); returns their names."""
+    cur.execute("SELECT public.ensure_time_partitions(%s, %s, %s)", (table, first, last))
+    return [r[0] for r in cur.fetchall()]
+
+def run_maintenance(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT table_name, action, partition_name FROM public.run_partition_maintenance()")
+        actions = cur.fetchall()
+    conn.commit()
+    for table, action, partition in actions:
+        print(f"{table}: {action} {partition}", flush=True)
+    if not actions:
+        print("Partitions already up to date", flush=True)
+    return actions
+
+def run_retention(conn, dry_run=False):
+    """Expire partitions past retention, one transaction each; returns the bytes reclaimed."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regproc('public.expired_partitions') IS NOT NULL")
+        if not cur.fetchone()[0]:
+            return 0
+        cur.execute("SELECT table_name, partition_name, bytes, blocked_by FROM public.expired_partitions()")
+        expired = cur.fetchall()
+    conn.commit()
+    reclaimed = 0
+    for table, partition, size, blocked_by in expired:
+        if blocked_by:
+            print(f"{table}: keeping {partition} for now, {blocked_by}", flush=True)
+            continue
+        if dry_run:
+            print(f"{table}: would expire {partition} ({size / 1e6:,.1f} MB)", flush=True)
+            continue
+        with conn.cursor() as cur:
+            cur.execute("SELECT approx_rows, downsampled_rows, bytes_dropped, bytes_added "
+                        "FROM public.expire_partition(%s, %s)", (table, partition))
+            row = cur.fetchone()
+        conn.commit()
+        if row is None:
+            continue
+        rows, downsampled, dropped, added = row
+        reclaimed += dropped - added
+        kept = f", {downsampled:,} rows downsampled ({added / 1e6:,.1f} MB)" if downsampled else ""
+        print(f"{table}: expired {partition}, ~{rows:,} rows, {dropped / 1e6:,.1f} MB{kept}", flush=True)
+    if reclaimed:
+        print(f"Retention reclaimed {reclaimed / 1e6:,.1f} MB", flush=True)
+    return reclaimed
+
+def list_partitions(conn, tables):
+    with conn.cursor() as cur:
+        for table in tables:
+            cur.execute("""
+                SELECT p.partition_name, p.range_start, p.range_end, c.reltuples::bigint,
+                       pg_total_relation_size(c.oid)
+                FROM public.time_partitions(%s) p JOIN pg_class c ON c.oid = ('public.' || quote_ident(p.partition_name))::regclass
+            """, (table,))
+            rows = cur.fetchall()
+            total = sum(r[4] for r in rows)
+            print(f"{table}: {len(rows)} partitions, {total / 1e6:,.1f} MB", flush=True)
+            for name, start, end, tuples, size in rows:
+                bounds = f"{start} .. {end}" if start else "DEFAULT"
+                print(f"  {name:<32} {bounds:<44} ~{max(tuples, 0):>12,} rows {size / 1e6:>10,.1f} MB", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming and drop expired time partitions.")
+    parser.add_argument("--list", action="store_true", help="show partitions, row estimates and sizes")
+    parser.add_argument("--ensure", nargs=2, metavar=("FROM", "TO"), type=date.fromisoformat,
+                        help="create the partitions for days FROM..TO (inclusive) instead")
+    parser.add_argument("--table", help="limit --ensure/--list to one table")
+    parser.add_argument("--dry-run", action="store_true", help="show what retention would expire, change nothing")
+    args = parser.parse_args()
+
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            tables = [args.table] if args.table else partitioned_tables(cur)
+        if not tables:
+            raise SystemExit("No partitioned tables configured; apply 09_partition_server_metrics.sql first")
+        if args.list:
+            list_partitions(conn, tables)
+        elif args.ensure:
+            first = datetime.combine(args.ensure[0], datetime.min.time())
+            last = datetime.combine(args.ensure[1], datetime.min.time()) + timedelta(days=1)
+            with conn.cursor() as cur:
+                for table in tables:
+                    created = ensure_partitions(cur, table, first, last)
+                    print(f"{table}: created {len(created)} partitions", flush=True)
+            conn.commit()
+        elif args.dry_run:
+            run_retention(conn, dry_run=True)
+        else:
+            run_maintenance(conn)
+            run_retention(conn)
+
+if __name__ == "__main__":
+    main()
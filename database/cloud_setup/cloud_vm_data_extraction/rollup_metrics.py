@@ -0,0 +1,98 @@
+"""
+Hourly rollup of server_metrics into aggregated_metrics (11_rollup_aggregated_metrics.sql).
+Each run_rollup() call recomputes the hours that received late rows, then aggregates
+the complete hours past the watermark (at most --max-span of them). This script
+calls it until the rollup has caught up, committing after every call, so a long
+backlog is worked off in short transactions.
+
+Run it from cron every hour, e.g.
+    5 * * * * cd /home/cimd/cloud_vm_data_extraction && python3 rollup_metrics.py
+
+nano rollup_metrics.py
+python3 rollup_metrics.py
+python3 rollup_metrics.py --status
+python3 rollup_metrics.py --backfill 2025-01-01 2025-04-01        (recompute days FROM..TO)
+"""
+
+import argparse
+import os
+from datetime import date, datetime, timedelta
+
+import psycopg2
+
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "postgres",
+    "user": "postgres",
+    "password": os.getenv("TELE_POSTGRES_PASS"),
+}
+
+
+def get_conn():
+    return psycopg2.connect(**DB_CONFIG)
+
+def run_rollup(conn, settle=timedelta(minutes=5), max_span=timedelta(hours=24)):
+    """Call run_rollup() until it has caught up; returns the (late, new) bucket totals."""
+    late_total = new_total = 0
+    while True:
+        with conn.cursor() as cur:
+            cur.execute("SELECT * FROM public.run_rollup(%s, %s)", (settle, max_span))
+            late, new, rolled_up_to, caught_up = cur.fetchone()
+        conn.commit()
+        late_total += late
+        new_total += new
+        if late or new:
+            print(f"server_metrics: rolled up to {rolled_up_to} ({new:,} new, {late:,} late buckets)", flush=True)
+        if caught_up:
+            break
+    if not late_total and not new_total:
+        print(f"Rollup already up to date ({rolled_up_to})", flush=True)
+    return late_total, new_total
+
+def backfill(conn, first, last):
+    """Recompute every bucket in [first, last), e.g. after correcting raw rows."""
+    day = timedelta(days=1)
+    total = 0
+    while first < last:
+        with conn.cursor() as cur:
+            cur.execute("SELECT public.rollup_hours(%s, %s)", (first, min(first + day, last)))
+            total += cur.fetchone()[0]
+        conn.commit()
+        first += day
+    print(f"server_metrics: rewrote {total:,} buckets", flush=True)
+
+def show_status(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT w.source_table, w.rolled_up_to, now()::TIMESTAMP - w.rolled_up_to, w.last_run_at,
+                   (SELECT count(*) FROM public.rollup_late_bucket q WHERE q.source_table = w.source_table)
+            FROM public.rollup_watermark w ORDER BY 1
+        """)
+        for table, rolled_up_to, lag, last_run, queued in cur.fetchall():
+            print(f"{table}: rolled up to {rolled_up_to} (lag {lag}), last run {last_run}, "
+                  f"{queued:,} late buckets queued", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll raw server_metrics up into hourly aggregated_metrics.")
+    parser.add_argument("--settle", type=int, default=5, metavar="MINUTES",
+                        help="wait this long after an hour ends before rolling it up")
+    parser.add_argument("--max-span", type=int, default=24, metavar="HOURS",
+                        help="new hours aggregated per transaction (inserts wait while one runs)")
+    parser.add_argument("--status", action="store_true", help="show the watermark and the late-bucket queue")
+    parser.add_argument("--backfill", nargs=2, metavar=("FROM", "TO"), type=date.fromisoformat,
+                        help="recompute the buckets of days FROM..TO (inclusive) instead")
+    args = parser.parse_args()
+
+    with get_conn() as conn:
+        if args.status:
+            show_status(conn)
+        elif args.backfill:
+            first = datetime.combine(args.backfill[0], datetime.min.time())
+            last = datetime.combine(args.backfill[1], datetime.min.time()) + timedelta(days=1)
+            backfill(conn, first, last)
+        else:
+            run_rollup(conn, timedelta(minutes=args.settle), timedelta(hours=args.max_span))
+
+if __name__ == "__main__":
+    main()
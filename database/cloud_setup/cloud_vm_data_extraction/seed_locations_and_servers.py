@@ -1,17 +1,7 @@
 # ALREADY RAN
-# nano seed_locations.py
-# python3 seed_locations.py (run once to insert all locations and servers)
-
-import psycopg2
-import os
-
-DB_CONFIG = {
-    "host": "localhost",
-    "port": 5432,
-    "database": "postgres",
-    "user": "postgres",
-    "password": os.getenv("TELE_POSTGRES_PASS"),
-}
+# nano seed_locations_and_servers.py
+# python3 seed_locations_and_servers.py (run once to insert all locations and servers)
+# Loading goes through seed_reference_data.py, which seeds every reference table in FK order.
 
 LOCATION_DATA = [
     {
@@ -96,25 +86,6 @@ LOCATION_DATA = [
     }
 ]
 
-def get_conn():
-    return psycopg2.connect(**DB_CONFIG)
-
-def insert_locations(cur):
-    for loc in LOCATION_DATA:
-        cur.execute("""
-            INSERT INTO public.location (location_id, location_geom, country, region, location_name)
-            VALUES (%s, ST_GeogFromText(%s), %s, %s, %s)
-            ON CONFLICT (location_id) DO NOTHING
-        """, (
-            loc["location_id"],
-            f"SRID=4326;POINT({loc['lng']} {loc['lat']})",
-            loc["country"],
-            loc["region"],
-            loc["city"]
-        ))
-
 if __name__ == "__main__":
-    with get_conn() as conn, conn.cursor() as cur:
-        insert_locations(cur)
-        conn.commit()
-    print("Seeded locations table.")
\ No newline at end of file
+    from seed_reference_data import main
+    main(["location", "server"])
@@ -0,0 +1,250 @@
+"""
+One command to seed every reference (dimension) table in FK order.
+Steps form a dependency graph:
+
+    location -> server ----------------------------+-> team_server_assignment
+             -> team_management -+-> team_members  +-> alert_configuration
+             -> members ---------+
+    applications (no dependencies)
+
+Each step runs on its own connection as soon as its dependencies are done, so
+independent branches load in parallel. Rows go in with batched
+INSERT ... ON CONFLICT DO NOTHING, and generated ids are deterministic (uuid5),
+so rerunning the command is a no-op.
+
+The data itself stays in the old per-table scripts (seed_locations_and_servers.py,
+mockserverdata.py, mockappdata.py, mockteamdata.py, mockfixeddata.py), which now
+just run their own steps through here.
+
+nano seed_reference_data.py
+python3 seed_reference_data.py
+python3 seed_reference_data.py --only members team_members   (plus their dependencies)
+"""
+
+import argparse
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+
+from text_pools import column_text
+
+SEED = 42
+MEMBERS = 200
+BATCH_ROWS = 1000
+SEED_NAMESPACE = uuid.UUID("5b0c1d2e-3f40-4a51-8b62-7c83d94ea5f6")
+
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "postgres",
+    "user": "postgres",
+    "password": os.getenv("TELE_POSTGRES_PASS"),
+}
+
+
+def get_conn():
+    return psycopg2.connect(**DB_CONFIG)
+
+def seeded_id(*parts):
+    return str(uuid.uuid5(SEED_NAMESPACE, "/".join(str(p) for p in parts)))
+
+def upsert(cur, table, columns, rows, conflict=None, template=None):
+    """Batched INSERT ... ON CONFLICT DO NOTHING; returns the number of new rows.
+    Without a conflict target any unique violation skips the row."""
+    if not rows:
+        return 0
+    target = f"({conflict}) " if conflict else ""
+    inserted = 0
+    for i in range(0, len(rows), BATCH_ROWS):
+        execute_values(cur, f"""
+            INSERT INTO {table} ({", ".join(columns)}) VALUES %s
+            ON CONFLICT {target}DO NOTHING
+        """, rows[i:i + BATCH_ROWS], template=template, page_size=BATCH_ROWS)
+        inserted += cur.rowcount
+    return inserted
+
+# --- STEPS ---
+# Each step gets a cursor and the run options, and returns how many rows it added.
+
+def seed_location(cur, opts):
+    from seed_locations_and_servers import LOCATION_DATA
+
+    rows = [(loc["location_id"], f"SRID=4326;POINT({loc['lng']} {loc['lat']})", loc["country"], loc["region"],
+             loc["city"]) for loc in LOCATION_DATA]
+    return upsert(cur, "public.location", ["location_id", "location_geom", "country", "region", "location_name"],
+                  rows, "location_id", template="(%s, ST_GeogFromText(%s), %s, %s, %s)")
+
+def seed_server(cur, opts):
+    from mockserverdata import SERVER_TO_LOCATION
+
+    return upsert(cur, "public.server", ["server_id", "location_id"], list(SERVER_TO_LOCATION.items()), "server_id")
+
+def seed_applications(cur, opts):
+    from mockappdata import APPLICATIONS
+
+    return upsert(cur, "public.applications", ["app_id", "app_name", "app_type", "hosting_environment"],
+                  APPLICATIONS, "app_id")
+
+def seed_team_management(cur, opts):
+    from mockteamdata import DEPARTMENTS_AND_TEAMS, TEAM_DESCRIPTIONS, team_contact_email
+    from seed_locations_and_servers import LOCATION_DATA
+
+    rng = np.random.default_rng([opts.seed, 1])
+    location_ids = [loc["location_id"] for loc in LOCATION_DATA]
+    rows = []
+    for department, teams in DEPARTMENTS_AND_TEAMS.items():
+        for team in teams:
+            rows.append((team, department, TEAM_DESCRIPTIONS.get(team, "No description available."),
+                         location_ids[rng.integers(len(location_ids))], team_contact_email(team, department)))
+    return upsert(cur, "public.team_management",
+                  ["team_name", "department", "team_description", "team_office_location_id", "team_contact_email"],
+                  rows, "team_name")
+
+def member_rows(opts):
+    """(member_id, full_name, name_part, location_id) for every seeded member, identical on every run."""
+    from seed_locations_and_servers import LOCATION_DATA
+
+    rng = np.random.default_rng([opts.seed, 2])
+    location_ids = [loc["location_id"] for loc in LOCATION_DATA]
+    first = column_text("first_name", opts.members, rng)
+    last = column_text("last_name", opts.members, rng)
+    locations = rng.integers(0, len(location_ids), opts.members)
+    rows, seen = [], {}
+    for i in range(opts.members):
+        name_part = f"{first[i].lower()}.{last[i].lower()}"
+        seen[name_part] = seen.get(name_part, 0) + 1
+        if seen[name_part] > 1:
+            name_part += str(seen[name_part])
+        rows.append((seeded_id("member", i), f"{first[i].lower()} {last[i].lower()}", name_part,
+                     location_ids[locations[i]]))
+    return rows
+
+def seed_members(cur, opts):
+    rows = [(member_id, full_name, f"{name_part}@membercimd.com", location_id)
+            for member_id, full_name, name_part, location_id in member_rows(opts)]
+    return upsert(cur, "public.members", ["member_id", "full_name", "personal_email", "location_id"],
+                  rows, "member_id")
+
+def seed_team_members(cur, opts):
+    from mockfixeddata import TEAM_ROLE_MAP
+
+    cur.execute("SELECT team_id, team_name FROM public.team_management ORDER BY team_name")
+    teams = cur.fetchall()
+    if not teams:
+        return 0
+    rng = np.random.default_rng([opts.seed, 3])
+    now = datetime.now()
+    rows = []
+    for member_id, _, name_part, _ in member_rows(opts):
+        team_id, team_name = teams[rng.integers(len(teams))]
+        roles = TEAM_ROLE_MAP.get(team_name, ["Team Member"])
+        email = f"{name_part}@{team_name.replace(' ', '').lower()}.com"
+        date_joined = now - timedelta(seconds=int(rng.integers(0, 5 * 365 * 86400)))
+        rows.append((member_id, team_id, roles[rng.integers(len(roles))], email, date_joined))
+    # team_members.email is unique too, so skip on any conflict rather than just member_id.
+    return upsert(cur, "public.team_members", ["member_id", "team_id", "role", "email", "date_joined"], rows)
+
+def seed_team_server_assignment(cur, opts):
+    now = datetime.now()
+    cur.execute("SELECT team_id FROM public.team_management ORDER BY team_id")
+    team_ids = [r[0] for r in cur.fetchall()]
+    cur.execute("SELECT server_id FROM public.server ORDER BY server_id")
+    server_ids = [r[0] for r in cur.fetchall()]
+    rows = [(team_id, server_id, now) for server_id in server_ids for team_id in team_ids]
+    return upsert(cur, "public.team_server_assignment", ["team_id", "server_id", '"timestamp"'],
+                  rows, "team_id, server_id")
+
+def seed_alert_configuration(cur, opts):
+    # team_contact_email is nullable but alert_configuration.contact_email is not.
+    cur.execute("SELECT team_contact_email FROM public.team_management WHERE team_contact_email IS NOT NULL "
+                "ORDER BY team_name")
+    emails = [r[0] for r in cur.fetchall()]
+    cur.execute("SELECT server_id FROM public.server ORDER BY server_id")
+    server_ids = [r[0] for r in cur.fetchall()]
+    if not emails:
+        return 0
+    rng = np.random.default_rng([opts.seed, 4])
+    now = datetime.now()
+    rows = []
+    for server_id in server_ids:
+        for k in range(int(rng.integers(1, 4))):
+            rows.append((
+                seeded_id("alert_configuration", server_id, k), server_id,
+                ["cpu_usage", "memory_usage", "disk_usage_percent", "network_in_bytes"][rng.integers(4)],
+                round(float(rng.uniform(50, 100)), 2), f"{int(rng.integers(1, 25))} hours",
+                emails[rng.integers(len(emails))], bool(rng.integers(2)),
+                ["EMAIL", "SMS", "WEBHOOK", "SLACK"][rng.integers(4)],
+                ["LOW", "MEDIUM", "HIGH", "CRITICAL"][rng.integers(4)], now,
+            ))
+    return upsert(cur, "public.alert_configuration", [
+        "alert_config_id", "server_id", "metric_name", "threshold_value", "alert_frequency", "contact_email",
+        "alert_enabled", "alert_type", "severity_level", '"timestamp"',
+    ], rows, "alert_config_id", template="(%s, %s, %s, %s, %s::interval, %s, %s, %s, %s, %s)")
+
+# name -> (dependencies, step)
+STEPS = {
+    "location": ((), seed_location),
+    "server": (("location",), seed_server),
+    "applications": ((), seed_applications),
+    "team_management": (("location",), seed_team_management),
+    "members": (("location",), seed_members),
+    "team_members": (("members", "team_management"), seed_team_members),
+    "team_server_assignment": (("team_management", "server"), seed_team_server_assignment),
+    "alert_configuration": (("team_management", "server"), seed_alert_configuration),
+}
+
+# --- PIPELINE ---
+
+def with_dependencies(names):
+    selected, stack = set(), list(names)
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected.add(name)
+            stack.extend(STEPS[name][0])
+    return selected
+
+def run_step(name, opts):
+    started = time.monotonic()
+    with get_conn() as conn, conn.cursor() as cur:
+        rows = STEPS[name][1](cur, opts)
+        conn.commit()
+    print(f"{name}: {rows:,} new rows in {time.monotonic() - started:.2f}s", flush=True)
+    return rows
+
+def seed(names=None, seed=SEED, members=MEMBERS, workers=4):
+    """Run the given steps (default: all) and their dependencies, in parallel where the graph allows."""
+    opts = argparse.Namespace(seed=seed, members=members)
+    todo = with_dependencies(names or STEPS)
+    done, running = set(), {}
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while todo or running:
+            for name in sorted(todo):
+                if set(STEPS[name][0]) <= done:
+                    running[pool.submit(run_step, name, opts)] = name
+                    todo.discard(name)
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                future.result()
+                done.add(running.pop(future))
+    print(f"Seeded {len(done)} tables in {time.monotonic() - started:.2f}s", flush=True)
+
+def main(names=None):
+    parser = argparse.ArgumentParser(description="Seed reference tables in FK order.")
+    parser.add_argument("--only", nargs="+", choices=list(STEPS), default=names,
+                        help="steps to run (their dependencies run too)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--members", type=int, default=MEMBERS)
+    parser.add_argument("--workers", type=int, default=4, help="steps loaded in parallel")
+    args = parser.parse_args()
+    seed(args.only, args.seed, args.members, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Consistency check for the summary totals behind cost_summary, downtime_summary,
+server_resource_cost, view_error_resolution_stats and view_avg_resolution_time
+(15_summary_totals.sql). Triggers keep the totals up to date; this compares every
+totals table against a full recompute of its source table and reports groups that
+are wrong, missing or left over. --repair rebuilds the ones that differ.
+
+Run it from cron daily, e.g.
+    30 3 * * * cd /home/cimd/cloud_vm_data_extraction && python3 summary_totals.py --repair
+
+nano summary_totals.py
+python3 summary_totals.py
+python3 summary_totals.py --repair
+python3 summary_totals.py --rebuild cost_totals          (after loading with triggers disabled)
+"""
+
+import argparse
+import os
+
+import psycopg2
+
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "postgres",
+    "user": "postgres",
+    "password": os.getenv("TELE_POSTGRES_PASS"),
+}
+
+
+def get_conn():
+    return psycopg2.connect(**DB_CONFIG)
+
+def check(conn):
+    """Totals tables that differ from their recompute."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT * FROM public.check_summary_totals()")
+        rows = cur.fetchall()
+    conn.commit()
+    differ = []
+    for totals, groups, wrong, extra in rows:
+        if wrong or extra:
+            differ.append(totals)
+            print(f"{totals}: {wrong:,} groups wrong or missing, {extra:,} extra (of {groups:,})", flush=True)
+        else:
+            print(f"{totals}: consistent ({groups:,} groups)", flush=True)
+    return differ
+
+def rebuild(conn, totals):
+    with conn.cursor() as cur:
+        cur.execute("SELECT public.rebuild_summary_totals(%s)", (totals,))
+        groups = cur.fetchone()[0]
+    conn.commit()
+    print(f"{totals}: rebuilt ({groups:,} groups)", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the summary totals against a full recompute.")
+    parser.add_argument("--repair", action="store_true", help="rebuild the totals that differ")
+    parser.add_argument("--rebuild", nargs="+", metavar="TOTALS", help="rebuild these totals tables instead")
+    args = parser.parse_args()
+
+    with get_conn() as conn:
+        if args.rebuild:
+            for totals in args.rebuild:
+                rebuild(conn, totals)
+            return
+        differ = check(conn)
+        if differ and args.repair:
+            for totals in differ:
+                rebuild(conn, totals)
+        elif differ:
+            raise SystemExit(f"{len(differ)} summary totals differ from a full recompute; run with --repair")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Checks for the mock data engine and the scripts around it; none needs a database.
+
+python3 -m pytest -q test_mock_data_bulk.py
+"""
+
+import io
+import json
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parents[2]
+sys.path[:0] = [str(HERE), str(REPO / "scripts"), str(REPO)]
+
+import alert_listener
+import db_mock_data_generator as csvgen
+from mock_engine import (GMT_PLUS_4, BoundedWalk, Checkpoint, Context, Key, PerSource, Profile, TableSpec,
+                         generate_table, unit_timestamp)
+
+# --- BoundedWalk ---
+
+WALK = TableSpec("walk", rows=PerSource("apps"), columns={
+    "app_id": Key("apps"),
+    "cpu": BoundedWalk("cpu", tolerance=2, diurnal=0.15, weekly=0.2),
+    "mem": BoundedWalk("mem", tolerance=512, integer=True, diurnal=0.05, weekly=0.1),
+})
+APPS = [f"app-{i}" for i in range(25)]
+DAYS = 60
+ANCHOR = date(2024, 3, 31)
+
+def walk_days(day_range, daily_units=True, profile=Profile("walk", [WALK], days=DAYS)):
+    """{day: generated rows} for the days one worker would get."""
+    ctx = Context({"apps": APPS}, {}, seed=7, units=DAYS, daily_units=daily_units)
+    out = {}
+    for day in day_range:
+        ctx.start_unit(day, unit_timestamp(profile, day, DAYS, ANCHOR))
+        out[day] = generate_table(ctx, WALK)
+    return out, ctx
+
+def test_bounded_walk_stays_in_band():
+    out, ctx = walk_days(range(DAYS))
+    for resource in ("cpu", "mem"):
+        bands = ctx.usage_bands(resource)
+        values = np.stack([out[d][resource] for d in range(DAYS)]).astype(float)
+        assert (values >= np.floor(bands[:, 0])).all() and (values <= np.ceil(bands[:, 1])).all()
+
+def test_bounded_walk_sub_daily_units_stay_in_band():
+    # Continuous units move through the day, so the diurnal term applies on top of the weekly one.
+    ctx = Context({"apps": APPS}, {}, seed=7, units=1)
+    bands = ctx.usage_bands("cpu")
+    start = datetime(2024, 3, 30, tzinfo=GMT_PLUS_4)  # a Saturday
+    for minute in range(0, 24 * 60, 37):
+        ctx.start_unit(0, start + timedelta(minutes=minute))
+        cpu = generate_table(ctx, WALK)["cpu"]
+        assert (cpu >= bands[:, 0] - 0.005).all() and (cpu <= bands[:, 1] + 0.005).all()
+
+def test_bounded_walk_same_across_workers():
+    whole, _ = walk_days(range(DAYS))
+    first, _ = walk_days(range(0, 25))
+    second, _ = walk_days(range(25, DAYS))
+    for day in range(DAYS):
+        part = first.get(day) or second[day]
+        for column in ("cpu", "mem"):
+            np.testing.assert_array_equal(whole[day][column], part[column])
+
+def test_bounded_walk_moves_by_small_steps():
+    out, _ = walk_days(range(DAYS))
+    cpu = np.stack([out[d]["cpu"] for d in range(DAYS)])
+    # the weekly dip moves values too, but only inside the band; day to day the walk is gradual
+    assert np.abs(np.diff(cpu, axis=0)).mean() < 4
+
+# --- Checkpoint anchor ---
+
+class FakeCursor:
+    def __init__(self, anchor, rows):
+        self.anchor, self.rows = anchor, rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return (self.anchor,)
+
+    def fetchall(self):
+        return self.rows
+
+class FakeConn:
+    """Answers Checkpoint's two reads: max(anchor) and the (day, table_name) rows."""
+
+    def __init__(self, anchor, rows=()):
+        self.anchor, self.rows = anchor, list(rows)
+
+    def cursor(self):
+        return FakeCursor(self.anchor, self.rows)
+
+def test_unit_timestamp_ends_on_anchor():
+    profile = Profile("p", [], days=90)
+    first = unit_timestamp(profile, 0, 90, ANCHOR)
+    last = unit_timestamp(profile, 89, 90, ANCHOR)
+    assert last == datetime(2024, 3, 31, 12, tzinfo=GMT_PLUS_4)
+    assert (last - first).days == 89
+
+def test_resume_anchor_keeps_unfinished_run():
+    days, tables = 3, ["a", "b"]
+    rows = [(ANCHOR - timedelta(days=d), t) for d in range(days) for t in tables][:-1]
+    assert Checkpoint(FakeConn(ANCHOR, rows), "p").resume_anchor(days, tables) == ANCHOR
+
+def test_resume_anchor_starts_new_run_when_finished():
+    days, tables = 3, ["a", "b"]
+    rows = [(ANCHOR - timedelta(days=d), t) for d in range(days) for t in tables]
+    today = datetime.now(GMT_PLUS_4).date()
+    assert Checkpoint(FakeConn(ANCHOR, rows), "p").resume_anchor(days, tables) == today
+    # checkpoints written before anchors were recorded
+    assert Checkpoint(FakeConn(None), "p").resume_anchor(days, tables) == today
+
+# --- db_mock_data_generator ---
+
+def test_plan_covers_every_id_once():
+    for rows, shards, chunk_rows in [(10, 3, 2), (100, 1, 7), (5, 4, 10), (1_000_003, 16, 65_536)]:
+        chunks = [c for shard in csvgen.plan(rows, shards, chunk_rows) for c in shard]
+        ids = [i for start, stop in chunks for i in range(start, stop)] if rows < 1000 else None
+        assert chunks[0][0] == 1 and chunks[-1][1] == rows + 1
+        assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+        assert all(stop - start <= chunk_rows for start, stop in chunks)
+        if ids is not None:
+            assert ids == list(range(1, rows + 1))
+
+def test_shard_paths():
+    assert csvgen.shard_paths("out/customers.csv.gz", 1) == [Path("out/customers.csv.gz")]
+    assert csvgen.shard_paths("out/customers.csv.gz", 3) == [
+        Path(f"out/customers-0000{i}-of-00003.csv.gz") for i in range(3)]
+
+def test_generate_same_file_for_any_worker_count(tmp_path):
+    one = csvgen.generate(1_000, tmp_path / "one.csv", seed=42, chunk_rows=128, workers=1)
+    three = csvgen.generate(1_000, tmp_path / "three.csv", seed=42, chunk_rows=128, workers=3)
+    assert one[0].read_bytes() == three[0].read_bytes()
+    lines = one[0].read_text().splitlines()
+    assert lines[0] == csvgen.HEADER.strip() and len(lines) == 1_001
+    assert [int(line.split(",")[0]) for line in lines[1:]] == list(range(1, 1_001))
+
+# --- pdftopng quality search ---
+
+def noise_image(size=256):
+    Image = pytest.importorskip("PIL.Image")
+    rng = np.random.default_rng(3)
+    smooth = np.linspace(0, 255, size, dtype=np.uint8)[None, :, None].repeat(size, 0).repeat(3, 2)
+    noise = rng.integers(0, 40, (size, size, 3), dtype=np.uint8)
+    return Image.fromarray(smooth // 2 + noise)
+
+def jpeg_size(img, quality):
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.tell()
+
+def test_quality_search_finds_highest_fitting_quality(tmp_path):
+    pdftopng = pytest.importorskip("pdftopng")
+    img = noise_image()
+    target = jpeg_size(img, 60) + 1
+    for start in (None, 10, 40, 60, 61, 90):
+        out = tmp_path / f"page-{start}.jpg"
+        quality, encodes = pdftopng.compress_image_to_target_size(img, out, target_size=target, start_quality=start)
+        assert quality == 60, start
+        assert out.stat().st_size <= target
+        # galloping then bisecting the bracket: about 2 * log2(quality range) encodes at worst
+        assert encodes <= 14
+    # starting on the answer, as the next page of a run usually does: the probe and one step up
+    assert pdftopng.compress_image_to_target_size(img, tmp_path / "again.jpg", target_size=target,
+                                                  start_quality=60) == (60, 2)
+
+def test_quality_search_falls_back_to_min_quality(tmp_path):
+    pdftopng = pytest.importorskip("pdftopng")
+    out = tmp_path / "page.jpg"
+    quality, _ = pdftopng.compress_image_to_target_size(noise_image(), out, target_size=500)
+    assert quality == pdftopng.MIN_QUALITY and out.exists()
+    assert not out.with_name(out.name + ".tmp").exists()
+
+# --- alert_listener ---
+
+def payload(**overrides):
+    batch = {"event": "high_cpu", "table": "server_metrics", "op": "INSERT", "at": "2024-03-31T12:00:00+04:00",
+             "rows": 10, "server_count": 2, "truncated": False, "servers": [
+                 {"server_id": "s1", "rows": 7, "peak": 97.5, "last_at": "2024-03-31T11:59:00", "ids": None},
+                 {"server_id": "s2", "rows": 3, "peak": 88.0, "last_at": "2024-03-31T11:58:00", "ids": ["a", "b"]},
+             ]}
+    batch.update(overrides)
+    return json.dumps(batch)
+
+def test_alert_events_one_per_server():
+    events = alert_listener.alert_events(payload())
+    assert [(e["server_id"], e["rows"], e["ids"]) for e in events] == [("s1", 7, []), ("s2", 3, ["a", "b"])]
+    assert all(e["event"] == "high_cpu" and e["notified_at"] == "2024-03-31T12:00:00+04:00" for e in events)
+    assert alert_listener.describe(events[1]) == \
+        "high_cpu: server s2, 3 rows, peak 88.0, last at 2024-03-31T11:58:00 (a, b)"
+
+def test_alert_events_truncated_payload():
+    events = alert_listener.alert_events(payload(rows=1_500, server_count=40, truncated=True))
+    rest = events[-1]
+    assert rest["server_id"] is None and rest["rows"] == 1_490 and rest["other_servers"] == 38
+    assert alert_listener.describe(rest) == "high_cpu: 1,490 more rows on 38 other servers"
+
+def test_alert_events_no_servers():
+    assert alert_listener.alert_events(payload(servers=None, rows=0, server_count=0)) == []
@@ -0,0 +1,136 @@
+"""
+Precomputed text pools for Faker-heavy columns.
+Faker is slow per call, so each kind of text (sentence, user agent, name, ip, word)
+is generated once from a fixed seed, cached to disk, and then sampled by index.
+Pools load lazily on first use; reruns with the same size/seed read the cache.
+
+`distinct` caps how many different values a column draws from, so columns keep
+a realistic cardinality for dictionary encoding and full-text search.
+
+nano text_pools.py
+python3 text_pools.py --size 20000   (prebuild every pool into the cache)
+"""
+
+import argparse
+import gzip
+import os
+import random
+import threading
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_POOL_SIZE = 10_000
+SEED = 42
+CACHE_DIR = Path(os.getenv("CIMD_TEXT_POOL_DIR", Path(__file__).resolve().parent / ".text_pools"))
+
+POOL_BUILDERS = {
+    "sentence": lambda fake: fake.sentence(),
+    "user_agent": lambda fake: fake.user_agent(),
+    "name": lambda fake: fake.name(),
+    "ipv4_public": lambda fake: fake.ipv4_public(),
+    "word": lambda fake: fake.word(),
+    "first_name": lambda fake: fake.first_name(),
+    "last_name": lambda fake: fake.last_name(),
+    "user_name": lambda fake: fake.user_name(),
+}
+
+# Which pool (and how many distinct values) each generated column draws from.
+COLUMN_POOLS = {
+    "downtime_cause": ("sentence", 500),
+    "recovery_action": ("sentence", 500),
+    "root_cause": ("sentence", 1000),
+    "error_message": ("sentence", 5000),
+    "incident_summary": ("sentence", 5000),
+    "cost_adjustment_reason": ("sentence", 200),
+    "user_agent": ("user_agent", 2000),
+    "full_name": ("name", None),
+    "first_name": ("first_name", None),
+    "last_name": ("last_name", None),
+    "username": ("user_name", None),
+    "source_ip": ("ipv4_public", None),
+    "access_ip": ("ipv4_public", None),
+    "resource_tag": ("word", 300),
+}
+
+_pools = {}
+_load_lock = threading.Lock()
+
+
+def _cache_path(kind, size, seed, cache_dir):
+    return Path(cache_dir) / f"{kind}-{size}-{seed}.txt.gz"
+
+def build_pool_values(kind, size, seed=SEED):
+    from faker import Faker
+
+    fake = Faker()
+    fake.seed_instance(seed)
+    builder = POOL_BUILDERS[kind]
+    return [builder(fake).replace("\n", " ") for _ in range(size)]
+
+def load_pool_values(kind, size, seed=SEED, cache_dir=CACHE_DIR):
+    path = _cache_path(kind, size, seed, cache_dir)
+    if path.exists():
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return f.read().split("\n")
+    values = build_pool_values(kind, size, seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        f.write("\n".join(values))
+    os.replace(tmp, path)
+    return values
+
+class TextPool:
+    def __init__(self, kind, size=DEFAULT_POOL_SIZE, seed=SEED, cache_dir=CACHE_DIR):
+        if kind not in POOL_BUILDERS:
+            raise ValueError(f"Unknown text pool: {kind}")
+        self.kind = kind
+        self.size = size
+        self.seed = seed
+        self.cache_dir = cache_dir
+        self._values = None
+
+    @property
+    def values(self):
+        if self._values is None:
+            # Writer threads share pools; only the first one builds or reads the cache.
+            with _load_lock:
+                if self._values is None:
+                    self._values = np.array(load_pool_values(self.kind, self.size, self.seed, self.cache_dir),
+                                            dtype=object)
+        return self._values
+
+    def _limit(self, distinct):
+        return len(self.values) if distinct is None else max(1, min(distinct, len(self.values)))
+
+    def choice(self, distinct=None):
+        """One value, drawn with the `random` module so seeded scripts stay reproducible."""
+        return self.values[random.randrange(self._limit(distinct))]
+
+    def sample(self, rng, n, distinct=None):
+        """n values as a numpy array, drawn with a numpy Generator."""
+        return self.values[rng.integers(0, self._limit(distinct), n)]
+
+def text_pool(kind, size=DEFAULT_POOL_SIZE, seed=SEED, cache_dir=CACHE_DIR):
+    key = (kind, size, seed, str(cache_dir))
+    if key not in _pools:
+        _pools[key] = TextPool(kind, size, seed, cache_dir)
+    return _pools[key]
+
+def column_text(column, n=None, rng=None, size=DEFAULT_POOL_SIZE, seed=SEED):
+    """Text for a known column: a single value, or n values when rng is given."""
+    kind, distinct = COLUMN_POOLS[column]
+    pool = text_pool(kind, size, seed)
+    if rng is None:
+        return pool.choice(distinct)
+    return pool.sample(rng, n, distinct)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prebuild cached text pools.")
+    parser.add_argument("--size", type=int, default=DEFAULT_POOL_SIZE)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+    for kind in POOL_BUILDERS:
+        pool = text_pool(kind, args.size, args.seed)
+        print(f"{kind}: {len(pool.values):,} values -> {_cache_path(kind, args.size, args.seed, CACHE_DIR)}", flush=True)
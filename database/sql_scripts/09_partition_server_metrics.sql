@@ -0,0 +1,277 @@
+-- 09_partition_server_metrics.sql - Range-partition server_metrics by time
+-- server_metrics grows by one row per server per sample, forever. As one heap every dashboard
+-- query (recent_server_metrics, the 08_queries.sql lookups) works against the whole history,
+-- and the only way to expire old rows is a huge DELETE. Here it becomes a table partitioned
+-- by RANGE ("timestamp") with one partition per day (or week, see partition_config):
+--   * queries bounded by time (WHERE timestamp >= NOW() - INTERVAL '1 day') only touch the
+--     partitions in range;
+--   * indexes are created on the parent, so every partition gets its own small copy;
+--   * expiring data is DROP TABLE on a whole partition - no dead rows, no VACUUM.
+--
+-- A partitioned table's primary key has to include the partition column, so the key becomes
+-- (server_id, "timestamp") and foreign keys can no longer point at server_metrics(server_id).
+-- They are re-pointed at the server dimension, public.server(server_id), which is what they
+-- meant all along.
+--
+-- Rows whose day has no partition yet land in server_metrics_default, so inserts never fail;
+-- ensure_time_partitions() moves them into their own partition when it creates it.
+-- partition_manager.py (cron) calls run_partition_maintenance() to keep partitions ahead of time.
+--
+-- The old heap is kept as server_metrics_unpartitioned. Drop it once the row counts match.
+
+BEGIN;
+
+-- Which tables are time-partitioned, and how. retention NULL keeps everything.
+CREATE TABLE IF NOT EXISTS partition_config (
+    parent_table TEXT PRIMARY KEY,
+    partition_interval INTERVAL NOT NULL DEFAULT INTERVAL '1 day'
+        CHECK (partition_interval IN (INTERVAL '1 day', INTERVAL '1 week')),
+    premake INTEGER NOT NULL DEFAULT 7 CHECK (premake >= 1),
+    retention INTERVAL NULL
+);
+
+
+-- Start of the day/week partition that holds ts
+CREATE OR REPLACE FUNCTION partition_start(ts TIMESTAMP, step INTERVAL) RETURNS TIMESTAMP AS $$
+    SELECT CASE WHEN step = INTERVAL '1 week' THEN date_trunc('week', ts) ELSE date_trunc('day', ts) END;
+$$ LANGUAGE sql IMMUTABLE;
+
+
+-- Column a partitioned table is partitioned by
+CREATE OR REPLACE FUNCTION partition_key(parent TEXT) RETURNS TEXT AS $$
+    SELECT a.attname::TEXT
+    FROM pg_partitioned_table pt
+    JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+    WHERE pt.partrelid = format('public.%I', parent)::regclass;
+$$ LANGUAGE sql STABLE;
+
+
+-- Partitions of a parent with their bounds (NULL bounds for the DEFAULT partition)
+CREATE OR REPLACE FUNCTION time_partitions(parent TEXT)
+RETURNS TABLE(partition_name TEXT, range_start TIMESTAMP, range_end TIMESTAMP, is_default BOOLEAN) AS $$
+    SELECT c.relname::TEXT,
+           (regexp_match(b.bound, $re$FROM \('([^']+)'\)$re$))[1]::TIMESTAMP,
+           (regexp_match(b.bound, $re$TO \('([^']+)'\)$re$))[1]::TIMESTAMP,
+           b.bound = 'DEFAULT'
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    CROSS JOIN LATERAL (SELECT pg_get_expr(c.relpartbound, c.oid) AS bound) b
+    WHERE i.inhparent = format('public.%I', parent)::regclass
+    ORDER BY 2 NULLS LAST;
+$$ LANGUAGE sql STABLE;
+
+
+-- Create the missing partitions covering [from_ts, to_ts); returns the ones created.
+-- Rows already sitting in the DEFAULT partition for a new range are moved into it.
+CREATE OR REPLACE FUNCTION ensure_time_partitions(parent TEXT, from_ts TIMESTAMP, to_ts TIMESTAMP)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    step INTERVAL := COALESCE((SELECT partition_interval FROM partition_config WHERE parent_table = parent),
+                              INTERVAL '1 day');
+    key TEXT := partition_key(parent);
+    default_part TEXT := (SELECT p.partition_name FROM time_partitions(parent) p WHERE p.is_default);
+    lo TIMESTAMP := partition_start(from_ts, step);
+    hi TIMESTAMP;
+    part TEXT;
+    stray BOOLEAN;
+BEGIN
+    IF key IS NULL THEN
+        RAISE EXCEPTION '% is not a partitioned table', parent;
+    END IF;
+    WHILE lo < to_ts LOOP
+        hi := lo + step;
+        part := format('%s_p%s', parent, to_char(lo, 'YYYYMMDD'));
+        IF NOT EXISTS (SELECT 1 FROM time_partitions(parent) p
+                       WHERE NOT p.is_default AND p.range_start < hi AND p.range_end > lo) THEN
+            stray := FALSE;
+            IF default_part IS NOT NULL THEN
+                EXECUTE format('SELECT EXISTS (SELECT 1 FROM public.%I WHERE %I >= $1 AND %I < $2)',
+                               default_part, key, key) INTO stray USING lo, hi;
+            END IF;
+            IF stray THEN
+                EXECUTE format('CREATE TABLE public.%I (LIKE public.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                               part, parent);
+                EXECUTE format('WITH moved AS (DELETE FROM public.%I WHERE %I >= $1 AND %I < $2 RETURNING *) '
+                               'INSERT INTO public.%I SELECT * FROM moved', default_part, key, key, part) USING lo, hi;
+                EXECUTE format('ALTER TABLE public.%I ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)',
+                               parent, part, lo, hi);
+            ELSE
+                EXECUTE format('CREATE TABLE public.%I PARTITION OF public.%I FOR VALUES FROM (%L) TO (%L)',
+                               part, parent, lo, hi);
+            END IF;
+            RETURN NEXT part;
+        END IF;
+        lo := hi;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Drop every partition that ends at or before cutoff; returns the ones dropped.
+-- Metadata only: nothing is deleted row by row and nothing is left to VACUUM.
+CREATE OR REPLACE FUNCTION drop_expired_partitions(parent TEXT, cutoff TIMESTAMP) RETURNS SETOF TEXT AS $$
+DECLARE
+    part TEXT;
+BEGIN
+    FOR part IN SELECT p.partition_name FROM time_partitions(parent) p
+                WHERE NOT p.is_default AND p.range_end <= cutoff ORDER BY p.range_start LOOP
+        EXECUTE format('DROP TABLE public.%I', part);
+        RETURN NEXT part;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- The maintenance job: for every configured table, pre-create the next `premake`
+-- partitions and drop the ones past retention.
+CREATE OR REPLACE FUNCTION run_partition_maintenance()
+RETURNS TABLE(table_name TEXT, action TEXT, partition_name TEXT) AS $$
+DECLARE
+    cfg partition_config;
+    today TIMESTAMP := date_trunc('day', now()::TIMESTAMP);
+BEGIN
+    FOR cfg IN SELECT * FROM partition_config ORDER BY parent_table LOOP
+        RETURN QUERY SELECT cfg.parent_table, 'created', p
+            FROM ensure_time_partitions(cfg.parent_table, today,
+                                        today + cfg.partition_interval * (cfg.premake + 1)) p;
+        IF cfg.retention IS NOT NULL THEN
+            RETURN QUERY SELECT cfg.parent_table, 'dropped', p
+                FROM drop_expired_partitions(cfg.parent_table, today - cfg.retention) p;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+
+INSERT INTO partition_config (parent_table, partition_interval, premake)
+VALUES ('server_metrics', INTERVAL '1 day', 7)
+ON CONFLICT (parent_table) DO NOTHING;
+
+
+-- One-time conversion. Views, triggers, grants and foreign keys that belong to the old heap
+-- are captured first and recreated on the partitioned table.
+DO $$
+DECLARE
+    old_table REGCLASS := 'public.server_metrics'::regclass;
+    r RECORD;
+    first_ts TIMESTAMP;
+    last_ts TIMESTAMP;
+    moved BIGINT;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = old_table) THEN
+        RAISE NOTICE 'server_metrics is already partitioned';
+        RETURN;
+    END IF;
+    IF to_regclass('public.server') IS NULL THEN
+        RAISE EXCEPTION 'public.server is missing; seed it first (seed_reference_data.py --only server)';
+    END IF;
+
+    CREATE TEMP TABLE sm_views ON COMMIT DROP AS
+        SELECT DISTINCT c.oid::regclass::TEXT AS name, c.relkind, pg_get_viewdef(c.oid) AS definition
+        FROM pg_depend d JOIN pg_rewrite rw ON rw.oid = d.objid JOIN pg_class c ON c.oid = rw.ev_class
+        WHERE d.classid = 'pg_rewrite'::regclass AND d.refobjid = old_table AND c.oid <> old_table;
+    CREATE TEMP TABLE sm_triggers ON COMMIT DROP AS
+        SELECT tgname, pg_get_triggerdef(oid) AS definition FROM pg_trigger WHERE tgrelid = old_table AND NOT tgisinternal;
+    CREATE TEMP TABLE sm_indexes ON COMMIT DROP AS
+        SELECT i.indexrelid::regclass::TEXT AS name, i.indisunique, pg_get_indexdef(i.indexrelid) AS definition
+        FROM pg_index i WHERE i.indrelid = old_table
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid);
+    CREATE TEMP TABLE sm_fkeys_out ON COMMIT DROP AS
+        SELECT conname, pg_get_constraintdef(oid) AS definition FROM pg_constraint WHERE conrelid = old_table AND contype = 'f';
+    CREATE TEMP TABLE sm_grants ON COMMIT DROP AS
+        SELECT CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END AS grantee,
+               a.privilege_type
+        FROM pg_class c CROSS JOIN LATERAL aclexplode(c.relacl) a
+        WHERE c.oid = old_table AND a.grantee <> c.relowner;
+
+    FOR r IN SELECT * FROM sm_views LOOP
+        EXECUTE format('DROP %s %s', CASE r.relkind WHEN 'm' THEN 'MATERIALIZED VIEW' ELSE 'VIEW' END, r.name);
+    END LOOP;
+
+    -- Foreign keys into server_metrics move to the server dimension. Each is rebuilt from its
+    -- columns as FOREIGN KEY (<its server_id column>) REFERENCES public.server(server_id), with its
+    -- ON DELETE action: Scripts/ALTER.sql left composite (server_id, timestamp) keys, which can't
+    -- simply be pointed at server(server_id).
+    FOR r IN SELECT c.conrelid, c.conrelid::regclass::TEXT AS child, c.conname, k.server_column,
+                    CASE c.confdeltype WHEN 'c' THEN 'CASCADE' WHEN 'n' THEN 'SET NULL' WHEN 'd' THEN 'SET DEFAULT'
+                                       WHEN 'r' THEN 'RESTRICT' ELSE 'NO ACTION' END AS on_delete
+             FROM pg_constraint c
+             LEFT JOIN LATERAL (
+                 SELECT ca.attname AS server_column
+                 FROM unnest(c.conkey, c.confkey) u(child_att, parent_att)
+                 JOIN pg_attribute pa ON pa.attrelid = c.confrelid AND pa.attnum = u.parent_att
+                 JOIN pg_attribute ca ON ca.attrelid = c.conrelid AND ca.attnum = u.child_att
+                 WHERE pa.attname = 'server_id'
+             ) k ON TRUE
+             WHERE c.confrelid = old_table AND c.contype = 'f' LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', r.child, r.conname);
+        IF r.server_column IS NULL THEN
+            RAISE NOTICE 'Dropped %.%, which does not include server_id', r.child, r.conname;
+        ELSIF EXISTS (SELECT 1 FROM pg_constraint f WHERE f.conrelid = r.conrelid AND f.contype = 'f'
+                      AND f.confrelid = 'public.server'::regclass) THEN
+            RAISE NOTICE 'Dropped %.%; the table already references public.server', r.child, r.conname;
+        ELSE
+            EXECUTE format('ALTER TABLE %s ADD CONSTRAINT %I FOREIGN KEY (%I) REFERENCES public.server(server_id) ON DELETE %s',
+                           r.child, (SELECT relname FROM pg_class WHERE oid = r.conrelid) || '_' || r.server_column || '_fkey',
+                           r.server_column, r.on_delete);
+            RAISE NOTICE 'Re-pointed %.% at public.server (%)', r.child, r.conname, r.server_column;
+        END IF;
+    END LOOP;
+
+    -- Free the index and constraint names for the new table; the old heap is only a backup now.
+    FOR r IN SELECT * FROM sm_indexes LOOP
+        EXECUTE format('DROP INDEX %s', r.name);
+    END LOOP;
+    EXECUTE 'ALTER TABLE public.server_metrics DROP CONSTRAINT IF EXISTS server_metrics_pkey';
+    FOR r IN SELECT * FROM sm_triggers LOOP
+        EXECUTE format('DROP TRIGGER %I ON public.server_metrics', r.tgname);
+    END LOOP;
+    ALTER TABLE public.server_metrics RENAME TO server_metrics_unpartitioned;
+
+    CREATE TABLE public.server_metrics (LIKE public.server_metrics_unpartitioned INCLUDING ALL EXCLUDING INDEXES)
+        PARTITION BY RANGE ("timestamp");
+    ALTER TABLE public.server_metrics ADD CONSTRAINT server_metrics_pkey PRIMARY KEY (server_id, "timestamp");
+    CREATE TABLE public.server_metrics_default PARTITION OF public.server_metrics DEFAULT;
+
+    FOR r IN SELECT * FROM sm_fkeys_out LOOP
+        EXECUTE format('ALTER TABLE public.server_metrics ADD CONSTRAINT %I %s', r.conname, r.definition);
+    END LOOP;
+    -- Created on the parent, these become one index per partition, present and future.
+    FOR r IN SELECT * FROM sm_indexes LOOP
+        IF r.indisunique THEN
+            RAISE NOTICE 'Skipped unique index % (unique indexes must include "timestamp")', r.name;
+        ELSE
+            EXECUTE r.definition;
+        END IF;
+    END LOOP;
+
+    SELECT min("timestamp"), max("timestamp") INTO first_ts, last_ts FROM public.server_metrics_unpartitioned;
+    IF first_ts IS NOT NULL THEN
+        PERFORM ensure_time_partitions('server_metrics', first_ts, last_ts + INTERVAL '1 microsecond');
+    END IF;
+    INSERT INTO public.server_metrics SELECT * FROM public.server_metrics_unpartitioned;
+    GET DIAGNOSTICS moved = ROW_COUNT;
+    RAISE NOTICE 'Copied % rows into % partitions', moved,
+        (SELECT count(*) FROM time_partitions('server_metrics') WHERE NOT is_default);
+
+    -- Triggers after the copy, so the existing rows don't fire them again.
+    FOR r IN SELECT * FROM sm_triggers LOOP
+        EXECUTE r.definition;
+    END LOOP;
+    FOR r IN SELECT * FROM sm_views LOOP
+        EXECUTE format('CREATE %s %s AS %s', CASE r.relkind WHEN 'm' THEN 'MATERIALIZED VIEW' ELSE 'VIEW' END,
+                       r.name, r.definition);
+    END LOOP;
+    FOR r IN SELECT * FROM sm_grants LOOP
+        EXECUTE format('GRANT %s ON public.server_metrics TO %s', r.privilege_type, r.grantee);
+    END LOOP;
+END;
+$$;
+
+-- Partitions for today and the next week
+SELECT * FROM run_partition_maintenance();
+
+COMMIT;
+
+-- After checking SELECT count(*) on both tables:
+-- DROP TABLE server_metrics_unpartitioned;
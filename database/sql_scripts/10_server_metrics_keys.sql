@@ -0,0 +1,78 @@
+-- 10_server_metrics_keys.sql - Time-series keys for server_metrics
+-- 01_create_tables.sql keyed server_metrics by server_id alone; Scripts/ALTER.sql already
+-- changed that to PRIMARY KEY (server_id, timestamp), but left every other table's foreign key
+-- pointing at server_metrics - most as composite (server_id, timestamp) keys, so a log row or
+-- alert could only exist for an instant that has a sample - instead of at the server dimension,
+-- and server_metrics.server_id itself referenced nothing. This finishes the time series:
+--   * foreign keys into server_metrics are rebuilt as FOREIGN KEY (server_id) REFERENCES
+--     public.server(server_id), keeping their ON DELETE action
+--     (09_partition_server_metrics.sql already does this when it has been applied);
+--   * server_metrics.server_id itself now references public.server;
+--   * the (server_id, "timestamp") key carries the dashboard columns (INCLUDE), so "latest N samples of a server"
+--     (ORDER BY "timestamp" DESC LIMIT N, a backward scan of the key) is index-only, with no
+--     second (server_id, timestamp DESC) b-tree to maintain on every insert;
+--   * a BRIN index on "timestamp" serves fleet-wide time-range scans. Samples arrive in time
+--     order, so each block range covers a narrow slice of time and the index stays tiny.
+-- Safe to run more than once.
+
+BEGIN;
+
+DO $$
+DECLARE
+    r RECORD;
+    key_def TEXT := 'PRIMARY KEY (server_id, "timestamp") INCLUDE (cpu_usage, memory_usage, disk_usage_percent)';
+BEGIN
+    IF to_regclass('public.server') IS NULL THEN
+        RAISE EXCEPTION 'public.server is missing; seed it first (seed_reference_data.py --only server)';
+    END IF;
+
+    -- Foreign keys into server_metrics move to the server dimension. Each is rebuilt from its
+    -- columns as FOREIGN KEY (<its server_id column>) REFERENCES public.server(server_id), with its
+    -- ON DELETE action: Scripts/ALTER.sql left composite (server_id, timestamp) keys, which can't
+    -- simply be pointed at server(server_id).
+    FOR r IN SELECT c.conrelid, c.conrelid::regclass::TEXT AS child, c.conname, k.server_column,
+                    CASE c.confdeltype WHEN 'c' THEN 'CASCADE' WHEN 'n' THEN 'SET NULL' WHEN 'd' THEN 'SET DEFAULT'
+                                       WHEN 'r' THEN 'RESTRICT' ELSE 'NO ACTION' END AS on_delete
+             FROM pg_constraint c
+             LEFT JOIN LATERAL (
+                 SELECT ca.attname AS server_column
+                 FROM unnest(c.conkey, c.confkey) u(child_att, parent_att)
+                 JOIN pg_attribute pa ON pa.attrelid = c.confrelid AND pa.attnum = u.parent_att
+                 JOIN pg_attribute ca ON ca.attrelid = c.conrelid AND ca.attnum = u.child_att
+                 WHERE pa.attname = 'server_id'
+             ) k ON TRUE
+             WHERE c.confrelid = 'public.server_metrics'::regclass AND c.contype = 'f' LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', r.child, r.conname);
+        IF r.server_column IS NULL THEN
+            RAISE NOTICE 'Dropped %.%, which does not include server_id', r.child, r.conname;
+        ELSIF EXISTS (SELECT 1 FROM pg_constraint f WHERE f.conrelid = r.conrelid AND f.contype = 'f'
+                      AND f.confrelid = 'public.server'::regclass) THEN
+            RAISE NOTICE 'Dropped %.%; the table already references public.server', r.child, r.conname;
+        ELSE
+            EXECUTE format('ALTER TABLE %s ADD CONSTRAINT %I FOREIGN KEY (%I) REFERENCES public.server(server_id) ON DELETE %s',
+                           r.child, (SELECT relname FROM pg_class WHERE oid = r.conrelid) || '_' || r.server_column || '_fkey',
+                           r.server_column, r.on_delete);
+            RAISE NOTICE 'Re-pointed %.% at public.server (%)', r.child, r.conname, r.server_column;
+        END IF;
+    END LOOP;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conrelid = 'public.server_metrics'::regclass
+                   AND contype = 'p' AND pg_get_constraintdef(oid) = key_def) THEN
+        ALTER TABLE public.server_metrics DROP CONSTRAINT IF EXISTS server_metrics_pkey;
+        EXECUTE 'ALTER TABLE public.server_metrics ADD CONSTRAINT server_metrics_pkey ' || key_def;
+        RAISE NOTICE 'server_metrics key is now %', key_def;
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conrelid = 'public.server_metrics'::regclass
+                   AND contype = 'f' AND confrelid = 'public.server'::regclass) THEN
+        ALTER TABLE public.server_metrics ADD CONSTRAINT server_metrics_server_id_fkey
+            FOREIGN KEY (server_id) REFERENCES public.server(server_id) ON DELETE CASCADE;
+    END IF;
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_server_metrics_timestamp_brin ON server_metrics USING brin ("timestamp");
+
+COMMIT;
+
+ANALYZE server_metrics;
@@ -0,0 +1,163 @@
+-- 11_rollup_aggregated_metrics.sql - Incremental hourly rollup of server_metrics into aggregated_metrics
+-- aggregated_metrics holds one row per server per hour. Instead of re-aggregating the raw
+-- series, run_rollup() keeps a watermark per source table (rollup_watermark.rolled_up_to):
+--   * every call aggregates only the complete hours between the watermark and now() - settle,
+--     upserting them on (server_id, "timestamp"), and moves the watermark forward;
+--   * a statement-level AFTER INSERT trigger looks at the inserted batch (transition table)
+--     and queues (server_id, hour) for rows that land behind the watermark. The next call
+--     recomputes just those buckets, so late data never triggers a full re-aggregation;
+--   * the trigger reads the watermark FOR KEY SHARE and run_rollup() locks it FOR UPDATE, so
+--     a batch is either visible to the rollup or queued as late, never neither. Inserts wait
+--     while a rollup call runs, which is why a call covers at most max_span of new hours.
+-- Column mapping (the raw series has no request counter since db_queries_per_sec was dropped):
+--   hourly_avg_cpu/memory_usage  avg(cpu_usage), avg(memory_usage)
+--   peak_network_usage           max(network_in_bytes + network_out_bytes)
+--   peak_disk_usage              max(disk_read_throughput + disk_write_throughput)
+--   uptime_percentage            share of the hour up to the last sample the host had been up
+--                                (uptime_in_mins of the last sample; 100 unless it rebooted)
+--   total_requests               I/O requests: avg(disk_read_ops + disk_write_ops per sec) * 3600
+--   error_rate                   network errors (sum(error_count)) per 100 of those requests
+--   average_response_time        avg(latency_in_ms), capped at 999.99
+--   region                       location.region of the server's latest sample, or 'unknown'
+-- Run hourly: python3 rollup_metrics.py (cloud_setup/cloud_vm_data_extraction).
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS rollup_watermark (
+    source_table TEXT PRIMARY KEY,
+    rolled_up_to TIMESTAMP NOT NULL,
+    last_run_at TIMESTAMPTZ NULL
+);
+
+CREATE TABLE IF NOT EXISTS rollup_late_bucket (
+    source_table TEXT NOT NULL REFERENCES rollup_watermark(source_table) ON DELETE CASCADE,
+    server_id UUID NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    PRIMARY KEY (source_table, bucket, server_id)
+);
+
+-- Aggregate the hours in [from_ts, to_ts), optionally for some servers only; returns the rows written.
+CREATE OR REPLACE FUNCTION rollup_hours(from_ts TIMESTAMP, to_ts TIMESTAMP, servers UUID[] DEFAULT NULL)
+RETURNS BIGINT AS $$
+DECLARE
+    written BIGINT;
+BEGIN
+    -- Dynamic so the plan sees the real bounds: partitions outside them are pruned, and a
+    -- late bucket for a few servers is read through the (server_id, "timestamp") key.
+    EXECUTE format($sql$
+        INSERT INTO aggregated_metrics (server_id, region, "timestamp", hourly_avg_cpu_usage,
+            hourly_avg_memory_usage, peak_network_usage, peak_disk_usage, uptime_percentage,
+            total_requests, error_rate, average_response_time)
+        SELECT h.server_id, left(COALESCE(l.region, 'unknown'), 20), h.bucket, h.cpu, h.memory,
+               h.network, h.disk, h.uptime, h.requests,
+               COALESCE(least(100, round(100.0 * h.errors / NULLIF(h.requests, 0), 2)), 0), h.latency
+        FROM (
+            SELECT server_id, date_trunc('hour', "timestamp") AS bucket,
+                   (array_agg(location_id ORDER BY "timestamp" DESC))[1] AS location_id,
+                   round(avg(cpu_usage)::NUMERIC, 2) AS cpu,
+                   round(avg(memory_usage)::NUMERIC, 2) AS memory,
+                   max(network_in_bytes + network_out_bytes) AS network,
+                   max(disk_read_throughput + disk_write_throughput) AS disk,
+                   round((100 * least(1, (array_agg(uptime_in_mins ORDER BY "timestamp" DESC))[1]
+                          / greatest(1, extract(epoch FROM max("timestamp") - date_trunc('hour', max("timestamp"))) / 60)))::NUMERIC, 2) AS uptime,
+                   round(avg(disk_read_ops_per_sec + disk_write_ops_per_sec) * 3600)::BIGINT AS requests,
+                   COALESCE(sum(error_count), 0) AS errors,
+                   least(999.99, round(avg(latency_in_ms)::NUMERIC, 2)) AS latency
+            FROM server_metrics
+            WHERE "timestamp" >= $1 AND "timestamp" < $2 %s
+            GROUP BY 1, 2
+        ) h
+        LEFT JOIN location l ON l.location_id = h.location_id
+        ON CONFLICT (server_id, "timestamp") DO UPDATE SET
+            region = EXCLUDED.region,
+            hourly_avg_cpu_usage = EXCLUDED.hourly_avg_cpu_usage,
+            hourly_avg_memory_usage = EXCLUDED.hourly_avg_memory_usage,
+            peak_network_usage = EXCLUDED.peak_network_usage,
+            peak_disk_usage = EXCLUDED.peak_disk_usage,
+            uptime_percentage = EXCLUDED.uptime_percentage,
+            total_requests = EXCLUDED.total_requests,
+            error_rate = EXCLUDED.error_rate,
+            average_response_time = EXCLUDED.average_response_time
+        WHERE (aggregated_metrics.*) IS DISTINCT FROM (EXCLUDED.*)
+    $sql$, CASE WHEN servers IS NULL THEN '' ELSE 'AND server_id = ANY($3)' END)
+    USING from_ts, to_ts, servers;
+    GET DIAGNOSTICS written = ROW_COUNT;
+    RETURN written;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Queue the (server, hour) buckets of an inserted batch that land behind the watermark.
+CREATE OR REPLACE FUNCTION queue_late_rollup_buckets()
+RETURNS TRIGGER AS $$
+DECLARE
+    watermark TIMESTAMP;
+BEGIN
+    SELECT w.rolled_up_to INTO watermark FROM rollup_watermark w
+    WHERE w.source_table = TG_TABLE_NAME FOR KEY SHARE;
+
+    IF watermark IS NOT NULL THEN
+        INSERT INTO rollup_late_bucket (source_table, server_id, bucket)
+        SELECT DISTINCT TG_TABLE_NAME, n.server_id, date_trunc('hour', n."timestamp")
+        FROM new_rows n WHERE n."timestamp" < watermark
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS rollup_late_data ON server_metrics;
+CREATE TRIGGER rollup_late_data
+AFTER INSERT ON server_metrics
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION queue_late_rollup_buckets();
+
+-- Recompute queued late buckets, then roll up complete hours past the watermark (at most
+-- max_span of them). Call again until caught_up.
+CREATE OR REPLACE FUNCTION run_rollup(settle INTERVAL DEFAULT INTERVAL '5 minutes',
+                                      max_span INTERVAL DEFAULT INTERVAL '1 day')
+RETURNS TABLE(late_buckets BIGINT, new_buckets BIGINT, rolled_up_to TIMESTAMP, caught_up BOOLEAN) AS $$
+DECLARE
+    watermark TIMESTAMP;
+    target TIMESTAMP := date_trunc('hour', now()::TIMESTAMP - settle);
+    advance_to TIMESTAMP;
+    late RECORD;
+BEGIN
+    SELECT w.rolled_up_to INTO watermark FROM rollup_watermark w
+    WHERE w.source_table = 'server_metrics' FOR UPDATE;
+    IF watermark IS NULL THEN
+        RAISE EXCEPTION 'No rollup watermark for server_metrics; apply 11_rollup_aggregated_metrics.sql';
+    END IF;
+
+    late_buckets := 0;
+    FOR late IN SELECT q.bucket, array_agg(q.server_id) AS servers FROM rollup_late_bucket q
+                WHERE q.source_table = 'server_metrics' GROUP BY q.bucket ORDER BY q.bucket LOOP
+        late_buckets := late_buckets + rollup_hours(late.bucket, late.bucket + INTERVAL '1 hour', late.servers);
+    END LOOP;
+    -- Nothing can queue while the watermark is locked, so this clears exactly what was read.
+    DELETE FROM rollup_late_bucket q WHERE q.source_table = 'server_metrics';
+
+    advance_to := least(target, greatest(date_trunc('hour', watermark + max_span), watermark + INTERVAL '1 hour'));
+    new_buckets := 0;
+    IF advance_to > watermark THEN
+        new_buckets := rollup_hours(watermark, advance_to);
+    ELSE
+        advance_to := watermark;
+    END IF;
+
+    UPDATE rollup_watermark w SET rolled_up_to = advance_to, last_run_at = now()
+    WHERE w.source_table = 'server_metrics';
+
+    rolled_up_to := advance_to;
+    caught_up := advance_to >= target;
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Start at the first stored hour, so the first runs backfill the existing history.
+INSERT INTO rollup_watermark (source_table, rolled_up_to)
+SELECT 'server_metrics', COALESCE(date_trunc('hour', min("timestamp")), date_trunc('hour', now()::TIMESTAMP))
+FROM server_metrics
+ON CONFLICT (source_table) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,193 @@
+-- 12_retention_downsampling.sql - Tiered retention for server_metrics: raw -> 1 minute -> 1 hour
+-- Without expiry server_metrics grows forever. Retention is configured per table in
+-- partition_config (09_partition_server_metrics.sql) and always expires whole partitions:
+--   * raw server_metrics is kept for `retention` (30 days). Before a day partition is dropped
+--     its rows are downsampled into server_metrics_1m, one row per server per minute;
+--   * server_metrics_1m is kept for its own `retention` (1 year), then dropped the same way;
+--   * hourly data is aggregated_metrics (11_rollup_aggregated_metrics.sql) and is kept.
+--     A raw partition is only dropped once the hourly rollup watermark has passed it and no
+--     late bucket inside it is still queued, so no hour is lost with its raw rows.
+-- expire_partition() handles one partition in one transaction - downsample, drop, and a row in
+-- retention_log with the space reclaimed. A run that is interrupted has either expired a
+-- partition completely or not at all; the next run picks up the rest.
+-- partition_manager.py (cron) runs it after creating the upcoming partitions.
+
+BEGIN;
+
+-- downsample_into: table that receives a partition's rows (through downsample_<parent_table>(from, to))
+-- before it is dropped. rollup_source: rollup_watermark that must have passed the partition first.
+ALTER TABLE partition_config
+    ADD COLUMN IF NOT EXISTS downsample_into TEXT NULL,
+    ADD COLUMN IF NOT EXISTS rollup_source TEXT NULL REFERENCES rollup_watermark(source_table);
+
+CREATE TABLE IF NOT EXISTS retention_log (
+    log_id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    partition_name TEXT NOT NULL,
+    range_start TIMESTAMP NOT NULL,
+    range_end TIMESTAMP NOT NULL,
+    approx_rows BIGINT NOT NULL,
+    downsampled_rows BIGINT NOT NULL DEFAULT 0,
+    bytes_dropped BIGINT NOT NULL,
+    bytes_added BIGINT NOT NULL DEFAULT 0,
+    expired_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+
+-- 1-minute tier. Gauges are averaged over the minute, uptime is the last sample's, and the
+-- peaks the hourly rollup reports (max network / disk I/O) are kept alongside.
+CREATE TABLE IF NOT EXISTS server_metrics_1m (
+    server_id UUID NOT NULL REFERENCES server(server_id) ON DELETE CASCADE,
+    location_id UUID NOT NULL,
+    "timestamp" TIMESTAMP NOT NULL,
+    samples INTEGER NOT NULL,
+    cpu_usage DOUBLE PRECISION NOT NULL,
+    cpu_usage_max DOUBLE PRECISION NOT NULL,
+    memory_usage DOUBLE PRECISION NOT NULL,
+    disk_usage_percent DOUBLE PRECISION NOT NULL,
+    disk_read_ops_per_sec INTEGER NOT NULL,
+    disk_write_ops_per_sec INTEGER NOT NULL,
+    network_in_bytes BIGINT NOT NULL,
+    network_out_bytes BIGINT NOT NULL,
+    peak_network_bytes BIGINT NOT NULL,
+    disk_read_throughput BIGINT NOT NULL,
+    disk_write_throughput BIGINT NOT NULL,
+    peak_disk_throughput BIGINT NOT NULL,
+    uptime_in_mins INTEGER NOT NULL,
+    latency_in_ms DOUBLE PRECISION NOT NULL,
+    error_count INTEGER NULL,
+    PRIMARY KEY (server_id, "timestamp")
+) PARTITION BY RANGE ("timestamp");
+
+CREATE TABLE IF NOT EXISTS server_metrics_1m_default PARTITION OF server_metrics_1m DEFAULT;
+
+
+-- Copy raw rows in [from_ts, to_ts) into server_metrics_1m; returns the minute rows written.
+CREATE OR REPLACE FUNCTION downsample_server_metrics(from_ts TIMESTAMP, to_ts TIMESTAMP)
+RETURNS BIGINT AS $$
+DECLARE
+    written BIGINT;
+BEGIN
+    PERFORM ensure_time_partitions('server_metrics_1m', from_ts, to_ts);
+    INSERT INTO server_metrics_1m (server_id, location_id, "timestamp", samples, cpu_usage, cpu_usage_max,
+        memory_usage, disk_usage_percent, disk_read_ops_per_sec, disk_write_ops_per_sec, network_in_bytes,
+        network_out_bytes, peak_network_bytes, disk_read_throughput, disk_write_throughput,
+        peak_disk_throughput, uptime_in_mins, latency_in_ms, error_count)
+    SELECT server_id, (array_agg(location_id ORDER BY "timestamp" DESC))[1], date_trunc('minute', "timestamp"),
+           count(*), avg(cpu_usage), max(cpu_usage), avg(memory_usage), max(disk_usage_percent),
+           round(avg(disk_read_ops_per_sec)), round(avg(disk_write_ops_per_sec)),
+           round(avg(network_in_bytes)), round(avg(network_out_bytes)), max(network_in_bytes + network_out_bytes),
+           round(avg(disk_read_throughput)), round(avg(disk_write_throughput)),
+           max(disk_read_throughput + disk_write_throughput),
+           (array_agg(uptime_in_mins ORDER BY "timestamp" DESC))[1], avg(latency_in_ms), sum(error_count)
+    FROM server_metrics
+    WHERE "timestamp" >= from_ts AND "timestamp" < to_ts
+    GROUP BY server_id, date_trunc('minute', "timestamp")
+    ON CONFLICT (server_id, "timestamp") DO NOTHING;
+    GET DIAGNOSTICS written = ROW_COUNT;
+    RETURN written;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Partitions past their table's retention, oldest first. blocked_by says why one has to wait.
+CREATE OR REPLACE FUNCTION expired_partitions(as_of TIMESTAMP DEFAULT now()::TIMESTAMP)
+RETURNS TABLE(table_name TEXT, partition_name TEXT, range_start TIMESTAMP, range_end TIMESTAMP,
+              bytes BIGINT, blocked_by TEXT) AS $$
+    SELECT c.parent_table, p.partition_name, p.range_start, p.range_end,
+           pg_total_relation_size(format('public.%I', p.partition_name)::regclass),
+           CASE WHEN c.rollup_source IS NULL THEN NULL
+                WHEN w.rolled_up_to IS NULL OR w.rolled_up_to < p.range_end
+                    THEN format('%s rollup is at %s', c.rollup_source, COALESCE(w.rolled_up_to::TEXT, 'nothing'))
+                WHEN EXISTS (SELECT 1 FROM rollup_late_bucket q WHERE q.source_table = c.rollup_source
+                             AND q.bucket >= p.range_start AND q.bucket < p.range_end)
+                    THEN format('late %s buckets are queued', c.rollup_source)
+           END
+    FROM partition_config c
+    CROSS JOIN LATERAL time_partitions(c.parent_table) p
+    LEFT JOIN rollup_watermark w ON w.source_table = c.rollup_source
+    WHERE c.retention IS NOT NULL AND NOT p.is_default
+      AND p.range_end <= date_trunc('day', as_of) - c.retention
+    ORDER BY p.range_start, c.parent_table;
+$$ LANGUAGE sql STABLE;
+
+
+-- Expire one partition: downsample it into the next tier, drop it and log what that reclaimed.
+-- Returns the retention_log row, or nothing if the partition is already gone or has to wait.
+CREATE OR REPLACE FUNCTION expire_partition(parent TEXT, part TEXT)
+RETURNS SETOF retention_log AS $$
+DECLARE
+    cfg partition_config;
+    entry retention_log;
+    added_before BIGINT := 0;
+    blocked TEXT;
+BEGIN
+    SELECT * INTO cfg FROM partition_config WHERE parent_table = parent;
+    IF to_regclass(format('public.%I', part)) IS NULL THEN
+        RETURN;
+    END IF;
+    -- No new rows while it is copied; the DROP below takes the stronger locks anyway.
+    EXECUTE format('LOCK TABLE public.%I IN SHARE MODE', part);
+
+    SELECT e.range_start, e.range_end, e.bytes, e.blocked_by
+    INTO entry.range_start, entry.range_end, entry.bytes_dropped, blocked
+    FROM expired_partitions() e WHERE e.table_name = parent AND e.partition_name = part;
+    IF NOT FOUND OR blocked IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    entry.table_name := parent;
+    entry.partition_name := part;
+    entry.approx_rows := (SELECT reltuples::BIGINT FROM pg_class WHERE oid = format('public.%I', part)::regclass);
+    IF entry.approx_rows < 0 THEN
+        -- Never analyzed, so no estimate: count it.
+        EXECUTE format('SELECT count(*) FROM public.%I', part) INTO entry.approx_rows;
+    END IF;
+    entry.downsampled_rows := 0;
+    entry.bytes_added := 0;
+    IF cfg.downsample_into IS NOT NULL THEN
+        SELECT COALESCE(sum(pg_total_relation_size(format('public.%I', p.partition_name)::regclass)), 0)
+        INTO added_before FROM time_partitions(cfg.downsample_into) p;
+        EXECUTE format('SELECT public.%I($1, $2)', 'downsample_' || parent)
+        INTO entry.downsampled_rows USING entry.range_start, entry.range_end;
+        SELECT COALESCE(sum(pg_total_relation_size(format('public.%I', p.partition_name)::regclass)), 0) - added_before
+        INTO entry.bytes_added FROM time_partitions(cfg.downsample_into) p;
+    END IF;
+
+    EXECUTE format('DROP TABLE public.%I', part);
+    INSERT INTO retention_log (table_name, partition_name, range_start, range_end, approx_rows,
+                               downsampled_rows, bytes_dropped, bytes_added)
+    VALUES (entry.table_name, entry.partition_name, entry.range_start, entry.range_end, entry.approx_rows,
+            entry.downsampled_rows, entry.bytes_dropped, entry.bytes_added)
+    RETURNING * INTO entry;
+    RETURN NEXT entry;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Creation only from now on; expiry goes through expire_partition() so it is gated and logged.
+CREATE OR REPLACE FUNCTION run_partition_maintenance()
+RETURNS TABLE(table_name TEXT, action TEXT, partition_name TEXT) AS $$
+DECLARE
+    cfg partition_config;
+    today TIMESTAMP := date_trunc('day', now()::TIMESTAMP);
+BEGIN
+    FOR cfg IN SELECT * FROM partition_config ORDER BY parent_table LOOP
+        RETURN QUERY SELECT cfg.parent_table, 'created', p
+            FROM ensure_time_partitions(cfg.parent_table, today,
+                                        today + cfg.partition_interval * (cfg.premake + 1)) p;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+
+INSERT INTO partition_config (parent_table, partition_interval, premake, retention)
+VALUES ('server_metrics_1m', INTERVAL '1 week', 1, INTERVAL '1 year')
+ON CONFLICT (parent_table) DO NOTHING;
+
+-- Only the first time: a retention chosen by hand is left alone.
+UPDATE partition_config
+SET retention = INTERVAL '30 days', downsample_into = 'server_metrics_1m', rollup_source = 'server_metrics'
+WHERE parent_table = 'server_metrics' AND retention IS NULL AND downsample_into IS NULL;
+
+COMMIT;
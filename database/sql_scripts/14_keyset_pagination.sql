@@ -0,0 +1,103 @@
+-- 14_keyset_pagination.sql - Keyset-paginated "recent" logs and accesses
+-- recent_errors, recent_access_logs and security_sensitive_access sorted whole tables (the
+-- last one with no LIMIT), and an older page could only be had with OFFSET, which reads and
+-- throws away every newer row first. These functions page by a (timestamp, id) cursor instead:
+--   * pass the timestamp and id of the last row of the previous page; the next page is the
+--     page_size rows before it in (timestamp DESC, id DESC) order. The id breaks ties between
+--     rows with the same timestamp, so no row is skipped or repeated across pages;
+--   * a timestamp without an id starts at the rows strictly older than it ("jump to time");
+--   * no cursor is the newest page.
+-- Every filter combination is one index range scan of page_size rows, at any depth:
+--   application_logs   (log_timestamp DESC, log_id DESC)             any level, all servers
+--                      ... WHERE log_level IN ('ERROR', 'CRITICAL')  error levels, all servers
+--                      (server_id, log_timestamp DESC, log_id DESC)  one server
+--   user_access_logs   ("timestamp" DESC, access_id DESC)            any type, all servers
+--                      ... WHERE access_type IN ('WRITE', 'DELETE')  sensitive accesses
+--                      (server_id, "timestamp" DESC, access_id DESC) one server
+-- They replace the timestamp / server_id indexes of 04_indexes.sql and the partial indexes of
+-- 13_index_recommendations.sql, which had no tie-breaker column.
+-- The functions are plain SQL so the planner inlines them: called with constants, a filter
+-- that is not given drops out of the plan and the matching index above is used.
+-- Rows without a timestamp are not paged. The three views stay, now read through the functions:
+-- the newest page, and for security_sensitive_access every row, in index order with no sort.
+-- Python helpers: log_pages.py (cloud_setup/cloud_vm_data_extraction).
+
+BEGIN;
+
+-- --- Indexes ---
+CREATE INDEX IF NOT EXISTS idx_application_logs_time_page ON application_logs (log_timestamp DESC, log_id DESC);
+CREATE INDEX IF NOT EXISTS idx_application_logs_errors_page
+    ON application_logs (log_timestamp DESC, log_id DESC) WHERE log_level IN ('ERROR', 'CRITICAL');
+CREATE INDEX IF NOT EXISTS idx_application_logs_server_page
+    ON application_logs (server_id, log_timestamp DESC, log_id DESC);
+DROP INDEX IF EXISTS idx_application_logs_timestamp;
+DROP INDEX IF EXISTS idx_application_logs_errors;
+DROP INDEX IF EXISTS idx_application_logs_server;
+
+CREATE INDEX IF NOT EXISTS idx_user_access_logs_time_page ON user_access_logs ("timestamp" DESC, access_id DESC);
+CREATE INDEX IF NOT EXISTS idx_user_access_logs_sensitive_page
+    ON user_access_logs ("timestamp" DESC, access_id DESC) WHERE access_type IN ('WRITE', 'DELETE');
+CREATE INDEX IF NOT EXISTS idx_user_access_logs_server_page
+    ON user_access_logs (server_id, "timestamp" DESC, access_id DESC);
+DROP INDEX IF EXISTS idx_user_access_logs_timestamp;
+DROP INDEX IF EXISTS idx_user_access_logs_sensitive;
+DROP INDEX IF EXISTS idx_user_access_logs_server_id;
+
+
+-- --- Functions ---
+-- Application logs at the given levels (default: errors), optionally of one server.
+CREATE OR REPLACE FUNCTION recent_errors_page(before_ts TIMESTAMPTZ DEFAULT NULL, before_id UUID DEFAULT NULL,
+                                              levels log_level_enum[] DEFAULT '{ERROR,CRITICAL}',
+                                              server UUID DEFAULT NULL, page_size INTEGER DEFAULT 100)
+RETURNS SETOF application_logs AS $$
+    SELECT * FROM application_logs
+    WHERE log_timestamp IS NOT NULL
+      AND (before_ts IS NULL OR (log_timestamp, log_id)
+                                < (before_ts, COALESCE(before_id, '00000000-0000-0000-0000-000000000000')))
+      AND (levels IS NULL OR log_level = ANY (levels))
+      AND (server IS NULL OR server_id = server)
+    ORDER BY log_timestamp DESC, log_id DESC
+    LIMIT page_size;
+$$ LANGUAGE sql STABLE;
+
+-- Accesses of the given types (default: all), optionally of one server.
+CREATE OR REPLACE FUNCTION recent_access_page(before_ts TIMESTAMPTZ DEFAULT NULL, before_id UUID DEFAULT NULL,
+                                              access_types TEXT[] DEFAULT NULL,
+                                              server UUID DEFAULT NULL, page_size INTEGER DEFAULT 100)
+RETURNS SETOF user_access_logs AS $$
+    SELECT * FROM user_access_logs
+    WHERE "timestamp" IS NOT NULL
+      AND (before_ts IS NULL OR ("timestamp", access_id)
+                                < (before_ts, COALESCE(before_id, '00000000-0000-0000-0000-000000000000')))
+      AND (access_types IS NULL OR access_type = ANY (access_types))
+      AND (server IS NULL OR server_id = server)
+    ORDER BY "timestamp" DESC, access_id DESC
+    LIMIT page_size;
+$$ LANGUAGE sql STABLE;
+
+-- Security-sensitive (WRITE / DELETE) accesses.
+CREATE OR REPLACE FUNCTION security_sensitive_page(before_ts TIMESTAMPTZ DEFAULT NULL, before_id UUID DEFAULT NULL,
+                                                   server UUID DEFAULT NULL, page_size INTEGER DEFAULT 100)
+RETURNS SETOF user_access_logs AS $$
+    SELECT * FROM recent_access_page(before_ts, before_id, '{WRITE,DELETE}', server, page_size);
+$$ LANGUAGE sql STABLE;
+
+
+-- --- Views ---
+DROP VIEW IF EXISTS recent_errors;
+CREATE VIEW recent_errors AS
+SELECT * FROM recent_errors_page();
+
+DROP VIEW IF EXISTS recent_access_logs;
+CREATE VIEW recent_access_logs AS
+SELECT access_id, user_id, server_id, access_type, timestamp, access_ip, user_agent
+FROM recent_access_page();
+
+DROP VIEW IF EXISTS security_sensitive_access;
+CREATE VIEW security_sensitive_access AS
+SELECT access_id, user_id, server_id, access_type, timestamp, access_ip, user_agent
+FROM security_sensitive_page(page_size => NULL);
+
+COMMIT;
+
+ANALYZE application_logs, user_access_logs;
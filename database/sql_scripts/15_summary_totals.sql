@@ -0,0 +1,306 @@
+-- 15_summary_totals.sql - Incrementally maintained totals behind the summary views
+-- cost_summary, downtime_summary, server_resource_cost, view_error_resolution_stats and
+-- view_avg_resolution_time re-aggregated their whole table on every read, and Power BI /
+-- Grafana read them constantly. Each now reads a small <name>_totals table with one row per
+-- group, so a read costs O(groups) instead of O(rows):
+--   * statement-level AFTER INSERT / UPDATE / DELETE triggers aggregate the statement's
+--     transition tables (new rows +1, old rows -1) and add that delta to the totals in one
+--     upsert; groups whose row count drops to 0 are removed. A bulk insert is one upsert
+--     per touched group, not one per row. TRUNCATE clears the totals;
+--   * the totals keep what the views need to stay exact: row counts next to sums, so an
+--     average is sum / count (what AVG() computes) and a group with no timed downtime still
+--     reports NULL minutes;
+--   * <name>_totals_recompute is the same aggregate over the whole table. check_summary_totals()
+--     compares the two (summary_totals.py runs it from cron), rebuild_summary_totals() resets
+--     one from it; mock_deferred.py rebuilds after a --defer-indexes load, which skips triggers.
+-- cost_data no longer has a region column (it was dropped for the server -> location model),
+-- so costs are kept per server and cost_summary adds them up per location.region.
+-- The views keep their names and columns. Writers to the same group serialize on its totals
+-- row for the rest of their transaction, like any other counter row.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS summary_config (
+    totals_table TEXT PRIMARY KEY,
+    source_table TEXT NOT NULL
+);
+
+-- --- Totals tables ---
+CREATE TABLE IF NOT EXISTS cost_totals (
+    server_id UUID PRIMARY KEY,
+    cost_rows BIGINT NOT NULL,
+    total_cost NUMERIC NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS downtime_totals (
+    server_id UUID PRIMARY KEY,
+    total_downtime_events BIGINT NOT NULL,
+    timed_events BIGINT NOT NULL,              -- events with a duration (end_time set)
+    total_downtime_minutes BIGINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS server_resource_cost_totals (
+    server_id UUID PRIMARY KEY,
+    allocations BIGINT NOT NULL,
+    total_hourly_cost NUMERIC NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS error_resolution_totals (
+    error_severity TEXT PRIMARY KEY,
+    total_errors BIGINT NOT NULL,
+    resolved_errors BIGINT NOT NULL,
+    unresolved_errors BIGINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS resolution_time_totals (
+    priority_level VARCHAR(20) PRIMARY KEY,
+    resolved_incidents BIGINT NOT NULL,
+    total_resolution_minutes BIGINT NOT NULL
+);
+
+INSERT INTO summary_config (totals_table, source_table) VALUES
+    ('cost_totals', 'cost_data'),
+    ('downtime_totals', 'downtime_logs'),
+    ('server_resource_cost_totals', 'resource_allocation'),
+    ('error_resolution_totals', 'error_logs'),
+    ('resolution_time_totals', 'incident_response_logs')
+ON CONFLICT (totals_table) DO NOTHING;
+
+
+-- --- Full recomputes (same columns as the totals) ---
+CREATE OR REPLACE VIEW cost_totals_recompute AS
+SELECT server_id, count(*) AS cost_rows, sum(total_monthly_cost)::NUMERIC AS total_cost
+FROM cost_data GROUP BY server_id;
+
+CREATE OR REPLACE VIEW downtime_totals_recompute AS
+SELECT server_id, count(*) AS total_downtime_events, count(downtime_duration_minutes) AS timed_events,
+       COALESCE(sum(downtime_duration_minutes), 0) AS total_downtime_minutes
+FROM downtime_logs GROUP BY server_id;
+
+CREATE OR REPLACE VIEW server_resource_cost_totals_recompute AS
+SELECT server_id, count(*) AS allocations, sum(cost_per_hour)::NUMERIC AS total_hourly_cost
+FROM resource_allocation GROUP BY server_id;
+
+CREATE OR REPLACE VIEW error_resolution_totals_recompute AS
+SELECT error_severity, count(*) AS total_errors, count(*) FILTER (WHERE resolved) AS resolved_errors,
+       count(*) FILTER (WHERE NOT resolved) AS unresolved_errors
+FROM error_logs GROUP BY error_severity;
+
+CREATE OR REPLACE VIEW resolution_time_totals_recompute AS
+SELECT priority_level, count(*) AS resolved_incidents, sum(resolution_time_minutes) AS total_resolution_minutes
+FROM incident_response_logs WHERE resolution_time_minutes IS NOT NULL GROUP BY priority_level;
+
+
+-- --- Delta maintenance ---
+-- The rows a statement changed, signed: +1 for new rows, -1 for old ones.
+CREATE OR REPLACE FUNCTION summary_changes(op TEXT)
+RETURNS TEXT AS $$
+    SELECT CASE op
+        WHEN 'INSERT' THEN 'SELECT 1 AS sign, * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT -1 AS sign, * FROM old_rows'
+        ELSE 'SELECT -1 AS sign, * FROM old_rows UNION ALL SELECT 1, * FROM new_rows'
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- The upsert that adds a statement's delta to its totals. delta_sql selects the key column and
+-- then the counter deltas from the signed rows (%s); groups left unchanged are skipped. It has
+-- to run in the trigger function itself, the only place the transition tables are visible.
+CREATE OR REPLACE FUNCTION summary_delta_sql(totals TEXT, key_column TEXT, counters TEXT[], delta_sql TEXT, op TEXT)
+RETURNS TEXT AS $$
+    SELECT format('INSERT INTO %I AS t (%I, %s) SELECT * FROM (%s) d WHERE %s ORDER BY 1
+                   ON CONFLICT (%I) DO UPDATE SET %s',
+        totals, key_column, array_to_string(ARRAY(SELECT quote_ident(c) FROM unnest(counters) c), ', '),
+        format(delta_sql, summary_changes(op)),
+        array_to_string(ARRAY(SELECT format('d.%I <> 0', c) FROM unnest(counters) c), ' OR '),
+        key_column,
+        array_to_string(ARRAY(SELECT format('%1$I = t.%1$I + EXCLUDED.%1$I', c) FROM unnest(counters) c), ', '));
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION apply_cost_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    EXECUTE summary_delta_sql('cost_totals', 'server_id', ARRAY['cost_rows', 'total_cost'], $sql$
+        SELECT server_id, sum(sign) AS cost_rows, sum(sign * total_monthly_cost) AS total_cost
+        FROM (%s) c GROUP BY server_id
+    $sql$, TG_OP);
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM cost_totals WHERE cost_rows = 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_downtime_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    EXECUTE summary_delta_sql('downtime_totals', 'server_id',
+                              ARRAY['total_downtime_events', 'timed_events', 'total_downtime_minutes'], $sql$
+        SELECT server_id, sum(sign) AS total_downtime_events,
+               COALESCE(sum(sign) FILTER (WHERE downtime_duration_minutes IS NOT NULL), 0) AS timed_events,
+               COALESCE(sum(sign * downtime_duration_minutes), 0) AS total_downtime_minutes
+        FROM (%s) c GROUP BY server_id
+    $sql$, TG_OP);
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM downtime_totals WHERE total_downtime_events = 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_server_resource_cost_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    EXECUTE summary_delta_sql('server_resource_cost_totals', 'server_id',
+                              ARRAY['allocations', 'total_hourly_cost'], $sql$
+        SELECT server_id, sum(sign) AS allocations, sum(sign * cost_per_hour) AS total_hourly_cost
+        FROM (%s) c GROUP BY server_id
+    $sql$, TG_OP);
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM server_resource_cost_totals WHERE allocations = 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_error_resolution_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    EXECUTE summary_delta_sql('error_resolution_totals', 'error_severity',
+                              ARRAY['total_errors', 'resolved_errors', 'unresolved_errors'], $sql$
+        SELECT error_severity, sum(sign) AS total_errors,
+               COALESCE(sum(sign) FILTER (WHERE resolved), 0) AS resolved_errors,
+               COALESCE(sum(sign) FILTER (WHERE NOT resolved), 0) AS unresolved_errors
+        FROM (%s) c GROUP BY error_severity
+    $sql$, TG_OP);
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM error_resolution_totals WHERE total_errors = 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_resolution_time_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    EXECUTE summary_delta_sql('resolution_time_totals', 'priority_level',
+                              ARRAY['resolved_incidents', 'total_resolution_minutes'], $sql$
+        SELECT priority_level, sum(sign) AS resolved_incidents,
+               sum(sign * resolution_time_minutes) AS total_resolution_minutes
+        FROM (%s) c WHERE resolution_time_minutes IS NOT NULL GROUP BY priority_level
+    $sql$, TG_OP);
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM resolution_time_totals WHERE resolved_incidents = 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- TRUNCATE of a source table empties its totals (TG_ARGV[0]).
+CREATE OR REPLACE FUNCTION clear_summary_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    EXECUTE format('DELETE FROM %I', TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    cfg summary_config;
+BEGIN
+    FOR cfg IN SELECT * FROM summary_config LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', cfg.totals_table || '_insert', cfg.source_table);
+        EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS new_rows
+                        FOR EACH STATEMENT EXECUTE FUNCTION %I()',
+                       cfg.totals_table || '_insert', cfg.source_table, 'apply_' || cfg.totals_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', cfg.totals_table || '_update', cfg.source_table);
+        EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %I REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                        FOR EACH STATEMENT EXECUTE FUNCTION %I()',
+                       cfg.totals_table || '_update', cfg.source_table, 'apply_' || cfg.totals_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', cfg.totals_table || '_delete', cfg.source_table);
+        EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS old_rows
+                        FOR EACH STATEMENT EXECUTE FUNCTION %I()',
+                       cfg.totals_table || '_delete', cfg.source_table, 'apply_' || cfg.totals_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', cfg.totals_table || '_truncate', cfg.source_table);
+        EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %I
+                        FOR EACH STATEMENT EXECUTE FUNCTION clear_summary_totals(%L)',
+                       cfg.totals_table || '_truncate', cfg.source_table, cfg.totals_table);
+    END LOOP;
+END;
+$$;
+
+
+-- --- Rebuild and check ---
+-- Reset one totals table from its recompute; writers to the source wait until commit.
+CREATE OR REPLACE FUNCTION rebuild_summary_totals(totals TEXT)
+RETURNS BIGINT AS $$
+DECLARE
+    source TEXT;
+    groups BIGINT;
+BEGIN
+    SELECT c.source_table INTO source FROM summary_config c WHERE c.totals_table = totals;
+    IF source IS NULL THEN
+        RAISE EXCEPTION 'Unknown summary totals table %', totals;
+    END IF;
+    EXECUTE format('LOCK TABLE %I IN SHARE MODE', source);
+    EXECUTE format('DELETE FROM %I', totals);
+    EXECUTE format('INSERT INTO %I SELECT * FROM %I', totals, totals || '_recompute');
+    GET DIAGNOSTICS groups = ROW_COUNT;
+    RETURN groups;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Per totals table, groups that are missing or wrong (differ from the recompute) and groups
+-- that should not be there. One snapshot, so it needs no locks.
+CREATE OR REPLACE FUNCTION check_summary_totals()
+RETURNS TABLE(totals_table TEXT, groups BIGINT, wrong_or_missing BIGINT, extra BIGINT) AS $$
+DECLARE
+    cfg summary_config;
+BEGIN
+    FOR cfg IN SELECT * FROM summary_config ORDER BY 1 LOOP
+        totals_table := cfg.totals_table;
+        EXECUTE format('SELECT (SELECT count(*) FROM %1$I),
+                               (SELECT count(*) FROM (SELECT * FROM %2$I EXCEPT SELECT * FROM %1$I) m),
+                               (SELECT count(*) FROM (SELECT * FROM %1$I EXCEPT SELECT * FROM %2$I) e)',
+                       cfg.totals_table, cfg.totals_table || '_recompute')
+        INTO groups, wrong_or_missing, extra;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+
+-- --- Views (same names and columns as 05_views.sql) ---
+DROP VIEW IF EXISTS cost_summary;
+CREATE VIEW cost_summary AS
+SELECT l.region, SUM(t.total_cost) AS total_cost
+FROM cost_totals t
+JOIN server s ON s.server_id = t.server_id
+JOIN location l ON l.location_id = s.location_id
+GROUP BY l.region;
+
+DROP VIEW IF EXISTS downtime_summary;
+CREATE VIEW downtime_summary AS
+SELECT server_id, total_downtime_events,
+       CASE WHEN timed_events > 0 THEN total_downtime_minutes END AS total_downtime_minutes
+FROM downtime_totals;
+
+DROP VIEW IF EXISTS server_resource_cost;
+CREATE VIEW server_resource_cost AS
+SELECT server_id, total_hourly_cost
+FROM server_resource_cost_totals;
+
+DROP VIEW IF EXISTS view_error_resolution_stats;
+CREATE VIEW view_error_resolution_stats AS
+SELECT error_severity, total_errors, resolved_errors, unresolved_errors
+FROM error_resolution_totals;
+
+DROP VIEW IF EXISTS view_avg_resolution_time;
+CREATE VIEW view_avg_resolution_time AS
+SELECT priority_level, total_resolution_minutes::NUMERIC / resolved_incidents AS avg_resolution_time
+FROM resolution_time_totals;
+
+-- Fill the totals from what is already stored.
+SELECT totals_table, rebuild_summary_totals(totals_table) AS groups FROM summary_config ORDER BY 1;
+
+COMMIT;
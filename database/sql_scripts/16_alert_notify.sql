@@ -0,0 +1,179 @@
+-- 16_alert_notify.sql - One NOTIFY per statement instead of a RAISE NOTICE per row
+-- check_high_cpu, check_high_error_rate and notify_high_severity_alerts (07_triggers.sql) ran
+-- for every inserted or updated row and only RAISEd a NOTICE, which no client reads. They are
+-- replaced by AFTER ... FOR EACH STATEMENT triggers that look at the statement's transition
+-- table and send one pg_notify on channel cimd_alerts for the whole batch:
+--   event            rows                                    table
+--   high_cpu         cpu_usage > 90                          server_metrics
+--   high_error_rate  error_rate > 5.00                       aggregated_metrics
+--   critical_alert   alert_severity = 'CRITICAL'             alert_history
+-- On UPDATE only rows that newly match are reported (their old version did not), so a
+-- rollup re-upserting an hour or an alert being closed does not alert again.
+-- The payload is JSON: event, table, op, rows (matching rows in the statement), server_count,
+-- at, and servers - per server its rows, peak value, latest timestamp and up to 3 ids, the
+-- highest peaks first and at most 20 of them (NOTIFY payloads are limited to 8000 bytes;
+-- truncated says whether some were left out). A statement with no matching row sends nothing.
+-- Notifications are delivered when the transaction commits, and not at all if it rolls back.
+-- alert_listener.py (cloud_setup/cloud_vm_data_extraction) turns them into alert events.
+
+BEGIN;
+
+-- Summarise a statement's matching rows (parallel arrays, one entry per row) and notify.
+CREATE OR REPLACE FUNCTION notify_alert_batch(event TEXT, source TEXT, op TEXT, servers UUID[],
+                                              times TIMESTAMP[], vals NUMERIC[], ids UUID[] DEFAULT NULL)
+RETURNS VOID AS $$
+DECLARE
+    per_server JSON;
+    server_count BIGINT;
+    payload TEXT;
+BEGIN
+    IF COALESCE(cardinality(servers), 0) = 0 THEN
+        RETURN;
+    END IF;
+    SELECT json_agg(json_build_object('server_id', s.server_id, 'rows', s.hits, 'peak', s.peak,
+                                      'last_at', s.last_at, 'ids', s.ids) ORDER BY s.rank)
+               FILTER (WHERE s.rank <= 20),
+           count(*)
+    INTO per_server, server_count
+    FROM (
+        SELECT u.server_id, count(*) AS hits, max(u.val) AS peak, max(u.at) AS last_at,
+               (array_agg(u.id ORDER BY u.at DESC) FILTER (WHERE u.id IS NOT NULL))[1:3] AS ids,
+               row_number() OVER (ORDER BY max(u.val) DESC NULLS LAST, count(*) DESC, max(u.at) DESC) AS rank
+        FROM unnest(servers, times, vals, ids) u(server_id, at, val, id)
+        GROUP BY u.server_id
+    ) s;
+
+    payload := json_build_object('event', event, 'table', source, 'op', op, 'rows', cardinality(servers),
+                                 'server_count', server_count, 'at', clock_timestamp(),
+                                 'truncated', server_count > 20, 'servers', per_server)::TEXT;
+    IF octet_length(payload) >= 8000 THEN
+        payload := json_build_object('event', event, 'table', source, 'op', op, 'rows', cardinality(servers),
+                                     'server_count', server_count, 'at', clock_timestamp(),
+                                     'truncated', TRUE, 'servers', json_build_array())::TEXT;
+    END IF;
+    PERFORM pg_notify('cimd_alerts', payload);
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE OR REPLACE FUNCTION notify_high_cpu()
+RETURNS TRIGGER AS $$
+DECLARE
+    servers UUID[];
+    times TIMESTAMP[];
+    vals NUMERIC[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(n.server_id), array_agg(n."timestamp"), array_agg(n.cpu_usage)
+        INTO servers, times, vals
+        FROM new_rows n WHERE n.cpu_usage > 90;
+    ELSE
+        SELECT array_agg(n.server_id), array_agg(n."timestamp"), array_agg(n.cpu_usage)
+        INTO servers, times, vals
+        FROM new_rows n
+        LEFT JOIN old_rows o ON o.server_id = n.server_id AND o."timestamp" = n."timestamp"
+        WHERE n.cpu_usage > 90 AND (o.server_id IS NULL OR o.cpu_usage <= 90);
+    END IF;
+    PERFORM notify_alert_batch('high_cpu', TG_TABLE_NAME, TG_OP, servers, times, vals);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_high_error_rate()
+RETURNS TRIGGER AS $$
+DECLARE
+    servers UUID[];
+    times TIMESTAMP[];
+    vals NUMERIC[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(n.server_id), array_agg(n."timestamp"), array_agg(n.error_rate)
+        INTO servers, times, vals
+        FROM new_rows n WHERE n.error_rate > 5.00;
+    ELSE
+        SELECT array_agg(n.server_id), array_agg(n."timestamp"), array_agg(n.error_rate)
+        INTO servers, times, vals
+        FROM new_rows n
+        LEFT JOIN old_rows o ON o.server_id = n.server_id AND o."timestamp" = n."timestamp"
+        WHERE n.error_rate > 5.00 AND (o.server_id IS NULL OR o.error_rate <= 5.00);
+    END IF;
+    PERFORM notify_alert_batch('high_error_rate', TG_TABLE_NAME, TG_OP, servers, times, vals);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_critical_alerts()
+RETURNS TRIGGER AS $$
+DECLARE
+    servers UUID[];
+    times TIMESTAMP[];
+    ids UUID[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(n.server_id), array_agg(n.alert_triggered_at), array_agg(n.alert_id)
+        INTO servers, times, ids
+        FROM new_rows n WHERE n.alert_severity = 'CRITICAL';
+    ELSE
+        SELECT array_agg(n.server_id), array_agg(n.alert_triggered_at), array_agg(n.alert_id)
+        INTO servers, times, ids
+        FROM new_rows n
+        LEFT JOIN old_rows o ON o.alert_id = n.alert_id
+        WHERE n.alert_severity = 'CRITICAL' AND (o.alert_id IS NULL OR o.alert_severity <> 'CRITICAL');
+    END IF;
+    PERFORM notify_alert_batch('critical_alert', TG_TABLE_NAME, TG_OP, servers, times, NULL, ids);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- --- Replace the row triggers ---
+DROP TRIGGER IF EXISTS trigger_high_cpu ON server_metrics;
+DROP TRIGGER IF EXISTS error_rate_check ON aggregated_metrics;
+DROP TRIGGER IF EXISTS high_severity_alert_check ON alert_history;
+DROP FUNCTION IF EXISTS check_high_cpu();
+DROP FUNCTION IF EXISTS check_high_error_rate();
+DROP FUNCTION IF EXISTS notify_high_severity_alerts();
+
+DROP TRIGGER IF EXISTS high_cpu_notify_insert ON server_metrics;
+CREATE TRIGGER high_cpu_notify_insert
+AFTER INSERT ON server_metrics
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_high_cpu();
+
+DROP TRIGGER IF EXISTS high_cpu_notify_update ON server_metrics;
+CREATE TRIGGER high_cpu_notify_update
+AFTER UPDATE ON server_metrics
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_high_cpu();
+
+DROP TRIGGER IF EXISTS high_error_rate_notify_insert ON aggregated_metrics;
+CREATE TRIGGER high_error_rate_notify_insert
+AFTER INSERT ON aggregated_metrics
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_high_error_rate();
+
+DROP TRIGGER IF EXISTS high_error_rate_notify_update ON aggregated_metrics;
+CREATE TRIGGER high_error_rate_notify_update
+AFTER UPDATE ON aggregated_metrics
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_high_error_rate();
+
+DROP TRIGGER IF EXISTS critical_alert_notify_insert ON alert_history;
+CREATE TRIGGER critical_alert_notify_insert
+AFTER INSERT ON alert_history
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_critical_alerts();
+
+DROP TRIGGER IF EXISTS critical_alert_notify_update ON alert_history;
+CREATE TRIGGER critical_alert_notify_update
+AFTER UPDATE ON alert_history
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_critical_alerts();
+
+COMMIT;
@@ -0,0 +1,381 @@
+-- 17_compact_types.sql - Compact column types and row layout
+-- The busiest tables stored short codes and numbers wider than they are:
+--   * access_ip was VARCHAR(45) text, and "internal" meant NOT LIKE '192.168.%'. It becomes
+--     inet (7 bytes for IPv4, invalid addresses rejected) and internal addresses are the ones
+--     inside a network of the internal_networks allowlist (CIDR match, is_internal_ip());
+--   * access_type, alert_status, alert_severity and allocation_status were VARCHARs with a CHECK
+--     list. They become enums like log_level_enum (4 bytes, same literals, same sort order as
+--     the CHECK list). cost_basis stays text: it has no fixed set of values;
+--   * the server_metrics / server_metrics_1m percentages and latency were DOUBLE PRECISION.
+--     Sensors report them with 2 decimals, so REAL (4 bytes, ~7 digits) holds them exactly
+--     enough, and with the 8-byte columns gone server_metrics rows have no alignment padding;
+--   * user_access_logs, application_logs, alert_history and resource_allocation are rebuilt
+--     with their columns in compact_column_order(): 8-byte aligned first, then 4-, 2- and
+--     1-byte aligned, variable length last, so no fixed-width column waits behind padding
+--     (this also drops the space of columns dropped earlier). PostgreSQL cannot reorder
+--     columns in place; rebuild_in_column_order() copies the table and recreates its
+--     constraints, indexes, triggers, incoming foreign keys and grants. The partitioned
+--     tables are only retyped. SELECT * column order changes for the rebuilt tables.
+-- Views over the changed tables are recreated from their definitions, and the functions of
+-- 14_keyset_pagination.sql with them (recent_access_page now takes access_type_enum[]), as is
+-- get_high_severity_alerts() of 06_functions.sql (it returns alert_severity_enum).
+-- Every table is rewritten under an ACCESS EXCLUSIVE lock; run it in a quiet window.
+-- The last statement before COMMIT reports each table's size before and after.
+
+BEGIN;
+
+-- Total size of a table with its indexes and TOAST, summed over the partitions if partitioned.
+CREATE OR REPLACE FUNCTION relation_bytes(tbl REGCLASS) RETURNS BIGINT AS $$
+    SELECT COALESCE((SELECT sum(pg_total_relation_size(p.relid))::BIGINT FROM pg_partition_tree(tbl) p),
+                    pg_total_relation_size(tbl));
+$$ LANGUAGE sql STABLE;
+
+CREATE TEMP TABLE compact_sizes ON COMMIT DROP AS
+    SELECT t AS table_name, relation_bytes(format('public.%I', t)::regclass) AS bytes_before
+    FROM unnest(ARRAY['user_access_logs', 'application_logs', 'alert_history', 'resource_allocation',
+                      'server_metrics', 'server_metrics_1m']) t;
+
+
+-- --- Types ---
+DO $$
+BEGIN
+    IF to_regtype('public.access_type_enum') IS NULL THEN
+        CREATE TYPE access_type_enum AS ENUM ('READ', 'WRITE', 'DELETE', 'EXECUTE');
+    END IF;
+    IF to_regtype('public.alert_status_enum') IS NULL THEN
+        CREATE TYPE alert_status_enum AS ENUM ('OPEN', 'CLOSED');
+    END IF;
+    IF to_regtype('public.alert_severity_enum') IS NULL THEN
+        CREATE TYPE alert_severity_enum AS ENUM ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL');
+    END IF;
+    IF to_regtype('public.allocation_status_enum') IS NULL THEN
+        CREATE TYPE allocation_status_enum AS ENUM ('active', 'pending', 'deallocated');
+    END IF;
+END;
+$$;
+
+
+-- --- Internal networks ---
+-- DELETE accesses are only allowed from these networks (enforce_internal_deletes).
+CREATE TABLE IF NOT EXISTS internal_networks (
+    network CIDR PRIMARY KEY,
+    description TEXT
+);
+INSERT INTO internal_networks (network, description)
+VALUES ('192.168.0.0/16', 'Private LAN (the 192.168.% rule of 07_triggers.sql)')
+ON CONFLICT (network) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION is_internal_ip(ip INET) RETURNS BOOLEAN AS $$
+    SELECT EXISTS (SELECT 1 FROM internal_networks WHERE ip <<= network);
+$$ LANGUAGE sql STABLE;
+
+
+-- --- Column order ---
+-- Columns of a table in the order that needs the least alignment padding. Ties keep their
+-- current order.
+CREATE OR REPLACE FUNCTION compact_column_order(tbl REGCLASS) RETURNS TEXT[] AS $$
+    SELECT array_agg(a.attname::TEXT ORDER BY t.typlen < 0,
+                     CASE t.typalign WHEN 'd' THEN 0 WHEN 'i' THEN 1 WHEN 's' THEN 2 ELSE 3 END,
+                     t.typlen DESC, a.attnum)
+    FROM pg_attribute a
+    JOIN pg_type t ON t.oid = a.atttypid
+    WHERE a.attrelid = tbl AND a.attnum > 0 AND NOT a.attisdropped;
+$$ LANGUAGE sql STABLE;
+
+-- Rebuild a (non-partitioned) table with its columns in compact_column_order(); returns FALSE
+-- if it already is in that order with no dropped columns. Views and functions that use the
+-- table's row type must be dropped first (the DROP TABLE fails otherwise).
+CREATE OR REPLACE FUNCTION rebuild_in_column_order(tbl TEXT) RETURNS BOOLEAN AS $$
+DECLARE
+    old_table REGCLASS := format('public.%I', tbl)::regclass;
+    new_table TEXT := tbl || '_compact';
+    cols TEXT[] := compact_column_order(old_table);
+    column_defs TEXT;
+    column_list TEXT;
+    options TEXT;
+    r RECORD;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class WHERE oid = old_table AND (relkind = 'p' OR relispartition)) THEN
+        RAISE EXCEPTION '% is partitioned; its columns cannot be reordered here', tbl;
+    END IF;
+    IF cols = (SELECT array_agg(attname::TEXT ORDER BY attnum) FROM pg_attribute
+               WHERE attrelid = old_table AND attnum > 0 AND NOT attisdropped)
+       AND NOT EXISTS (SELECT 1 FROM pg_attribute WHERE attrelid = old_table AND attisdropped) THEN
+        RETURN FALSE;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_attribute WHERE attrelid = old_table AND attidentity <> '') THEN
+        RAISE EXCEPTION '% has identity columns; rebuild it by hand', tbl;
+    END IF;
+    EXECUTE format('LOCK TABLE %s IN ACCESS EXCLUSIVE MODE', old_table);
+
+    CREATE TEMP TABLE rb_constraints ON COMMIT DROP AS
+        SELECT conname, contype, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint WHERE conrelid = old_table AND contype IN ('p', 'u', 'x', 'c', 'f');
+    CREATE TEMP TABLE rb_fkeys_in ON COMMIT DROP AS
+        SELECT conrelid::regclass::TEXT AS child, conname, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint WHERE confrelid = old_table AND contype = 'f' AND conrelid <> old_table;
+    CREATE TEMP TABLE rb_indexes ON COMMIT DROP AS
+        SELECT pg_get_indexdef(i.indexrelid) AS definition
+        FROM pg_index i WHERE i.indrelid = old_table
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid);
+    CREATE TEMP TABLE rb_triggers ON COMMIT DROP AS
+        SELECT pg_get_triggerdef(oid) AS definition, tgenabled FROM pg_trigger WHERE tgrelid = old_table AND NOT tgisinternal;
+    CREATE TEMP TABLE rb_grants ON COMMIT DROP AS
+        SELECT CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END AS grantee,
+               a.privilege_type
+        FROM pg_class c CROSS JOIN LATERAL aclexplode(c.relacl) a
+        WHERE c.oid = old_table AND a.grantee <> c.relowner;
+
+    SELECT string_agg(format('%I %s%s%s%s', a.attname, format_type(a.atttypid, a.atttypmod),
+                             CASE WHEN a.attcollation <> t.typcollation
+                                  THEN ' COLLATE ' || a.attcollation::regcollation::TEXT ELSE '' END,
+                             CASE WHEN a.attgenerated = 's'
+                                  THEN format(' GENERATED ALWAYS AS (%s) STORED', pg_get_expr(d.adbin, d.adrelid))
+                                  WHEN d.adbin IS NOT NULL THEN ' DEFAULT ' || pg_get_expr(d.adbin, d.adrelid)
+                                  ELSE '' END,
+                             CASE WHEN a.attnotnull THEN ' NOT NULL' ELSE '' END),
+                      ', ' ORDER BY array_position(cols, a.attname::TEXT)),
+           string_agg(quote_ident(a.attname), ', ' ORDER BY array_position(cols, a.attname::TEXT))
+               FILTER (WHERE a.attgenerated = '')
+    INTO column_defs, column_list
+    FROM pg_attribute a
+    JOIN pg_type t ON t.oid = a.atttypid
+    LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    WHERE a.attrelid = old_table AND a.attnum > 0 AND NOT a.attisdropped;
+    SELECT COALESCE(' WITH (' || array_to_string(reloptions, ', ') || ')', '') INTO options
+    FROM pg_class WHERE oid = old_table;
+
+    EXECUTE format('CREATE TABLE public.%I (%s)%s', new_table, column_defs, options);
+    EXECUTE format('INSERT INTO public.%I (%s) SELECT %s FROM %s', new_table, column_list, column_list, old_table);
+
+    FOR r IN SELECT * FROM rb_fkeys_in LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', r.child, r.conname);
+    END LOOP;
+    EXECUTE format('DROP TABLE %s', old_table);
+    EXECUTE format('ALTER TABLE public.%I RENAME TO %I', new_table, tbl);
+
+    FOR r IN SELECT * FROM rb_constraints ORDER BY position(contype::TEXT IN 'puxcf') LOOP
+        EXECUTE format('ALTER TABLE public.%I ADD CONSTRAINT %I %s', tbl, r.conname, r.definition);
+    END LOOP;
+    FOR r IN SELECT * FROM rb_indexes LOOP
+        EXECUTE r.definition;
+    END LOOP;
+    -- Triggers after the copy, so the existing rows don't fire them again.
+    FOR r IN SELECT * FROM rb_triggers LOOP
+        EXECUTE r.definition;
+        IF r.tgenabled = 'D' THEN
+            EXECUTE format('ALTER TABLE public.%I DISABLE TRIGGER %s', tbl,
+                           substring(r.definition FROM '^CREATE (?:CONSTRAINT )?TRIGGER (\S+)'));
+        END IF;
+    END LOOP;
+    FOR r IN SELECT * FROM rb_fkeys_in LOOP
+        EXECUTE format('ALTER TABLE %s ADD CONSTRAINT %I %s', r.child, r.conname, r.definition);
+    END LOOP;
+    FOR r IN SELECT * FROM rb_grants LOOP
+        EXECUTE format('GRANT %s ON public.%I TO %s', r.privilege_type, tbl, r.grantee);
+    END LOOP;
+
+    DROP TABLE rb_constraints, rb_fkeys_in, rb_indexes, rb_triggers, rb_grants;
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- --- Views and functions over the changed tables ---
+-- The keyset functions return the tables' row types; they are recreated below.
+DROP VIEW IF EXISTS recent_errors;
+DROP VIEW IF EXISTS recent_access_logs;
+DROP VIEW IF EXISTS security_sensitive_access;
+DROP FUNCTION IF EXISTS security_sensitive_page(TIMESTAMPTZ, UUID, UUID, INTEGER);
+DROP FUNCTION IF EXISTS recent_access_page(TIMESTAMPTZ, UUID, TEXT[], UUID, INTEGER);
+DROP FUNCTION IF EXISTS recent_access_page(TIMESTAMPTZ, UUID, access_type_enum[], UUID, INTEGER);
+DROP FUNCTION IF EXISTS recent_errors_page(TIMESTAMPTZ, UUID, log_level_enum[], UUID, INTEGER);
+
+-- Every other view that reads them, directly or through another view, is recreated at the end.
+CREATE TEMP TABLE compact_views ON COMMIT DROP AS
+WITH RECURSIVE deps AS (
+    SELECT rw.ev_class AS view_oid, 1 AS depth
+    FROM pg_depend d JOIN pg_rewrite rw ON rw.oid = d.objid
+    WHERE d.classid = 'pg_rewrite'::regclass AND rw.ev_class <> d.refobjid
+      AND d.refobjid IN (SELECT format('public.%I', table_name)::regclass FROM compact_sizes)
+    UNION ALL
+    SELECT rw.ev_class, deps.depth + 1
+    FROM deps
+    JOIN pg_depend d ON d.refobjid = deps.view_oid AND d.classid = 'pg_rewrite'::regclass
+    JOIN pg_rewrite rw ON rw.oid = d.objid
+    WHERE rw.ev_class <> deps.view_oid
+)
+SELECT c.oid::regclass::TEXT AS name, c.relkind, pg_get_viewdef(c.oid) AS definition, max(deps.depth) AS depth
+FROM deps JOIN pg_class c ON c.oid = deps.view_oid
+GROUP BY c.oid, c.relkind;
+
+DO $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN SELECT * FROM compact_views ORDER BY depth DESC LOOP
+        EXECUTE format('DROP %s %s', CASE r.relkind WHEN 'm' THEN 'MATERIALIZED VIEW' ELSE 'VIEW' END, r.name);
+    END LOOP;
+END;
+$$;
+
+
+-- --- Retype ---
+-- The CHECK lists are now the enums; partial indexes on the old text comparisons are
+-- recreated on the enums below.
+ALTER TABLE user_access_logs DROP CONSTRAINT IF EXISTS user_access_logs_access_type_check;
+ALTER TABLE alert_history DROP CONSTRAINT IF EXISTS alert_history_alert_status_check;
+ALTER TABLE alert_history DROP CONSTRAINT IF EXISTS alert_history_alert_severity_check;
+ALTER TABLE resource_allocation DROP CONSTRAINT IF EXISTS resource_allocation_allocation_status_check;
+DROP INDEX IF EXISTS idx_user_access_logs_sensitive_page;
+DROP INDEX IF EXISTS idx_alert_history_open;
+DROP INDEX IF EXISTS idx_alert_history_critical;
+
+-- One ALTER TABLE (one rewrite) per table, for the columns not converted yet.
+DO $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN
+        SELECT c.table_name, string_agg(format('ALTER COLUMN %I TYPE %s USING %I::%s', c.column_name, c.new_type,
+                                               c.column_name, c.new_type), ', ') AS changes
+        FROM (VALUES
+            ('user_access_logs', 'access_type', 'access_type_enum'),
+            ('user_access_logs', 'access_ip', 'inet'),
+            ('alert_history', 'alert_status', 'alert_status_enum'),
+            ('alert_history', 'alert_severity', 'alert_severity_enum'),
+            ('resource_allocation', 'allocation_status', 'allocation_status_enum'),
+            ('server_metrics', 'cpu_usage', 'real'),
+            ('server_metrics', 'memory_usage', 'real'),
+            ('server_metrics', 'disk_usage_percent', 'real'),
+            ('server_metrics', 'latency_in_ms', 'real'),
+            ('server_metrics_1m', 'cpu_usage', 'real'),
+            ('server_metrics_1m', 'cpu_usage_max', 'real'),
+            ('server_metrics_1m', 'memory_usage', 'real'),
+            ('server_metrics_1m', 'disk_usage_percent', 'real'),
+            ('server_metrics_1m', 'latency_in_ms', 'real')
+        ) c(table_name, column_name, new_type)
+        JOIN pg_attribute a ON a.attrelid = format('public.%I', c.table_name)::regclass AND a.attname = c.column_name
+        WHERE format_type(a.atttypid, NULL) <> c.new_type
+        GROUP BY c.table_name
+    LOOP
+        EXECUTE format('ALTER TABLE public.%I %s', r.table_name, r.changes);
+        RAISE NOTICE 'Retyped %: %', r.table_name, r.changes;
+    END LOOP;
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_user_access_logs_sensitive_page
+    ON user_access_logs ("timestamp" DESC, access_id DESC) WHERE access_type IN ('WRITE', 'DELETE');
+CREATE INDEX IF NOT EXISTS idx_alert_history_open
+    ON alert_history (alert_triggered_at DESC) WHERE alert_status = 'OPEN';
+CREATE INDEX IF NOT EXISTS idx_alert_history_critical
+    ON alert_history (alert_triggered_at DESC) WHERE alert_severity = 'CRITICAL';
+
+CREATE OR REPLACE FUNCTION prevent_external_deletes()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.access_type = 'DELETE' AND NOT is_internal_ip(NEW.access_ip) THEN
+        RAISE EXCEPTION 'DELETE actions are only allowed from internal IP addresses';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- --- Reorder ---
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY['user_access_logs', 'application_logs', 'alert_history', 'resource_allocation'] LOOP
+        IF rebuild_in_column_order(tbl) THEN
+            RAISE NOTICE 'Rebuilt % as (%)', tbl, array_to_string(compact_column_order(format('public.%I', tbl)::regclass), ', ');
+        END IF;
+    END LOOP;
+END;
+$$;
+
+
+-- --- Recreate ---
+-- As in 14_keyset_pagination.sql, with access types as access_type_enum.
+CREATE OR REPLACE FUNCTION recent_errors_page(before_ts TIMESTAMPTZ DEFAULT NULL, before_id UUID DEFAULT NULL,
+                                              levels log_level_enum[] DEFAULT '{ERROR,CRITICAL}',
+                                              server UUID DEFAULT NULL, page_size INTEGER DEFAULT 100)
+RETURNS SETOF application_logs AS $$
+    SELECT * FROM application_logs
+    WHERE log_timestamp IS NOT NULL
+      AND (before_ts IS NULL OR (log_timestamp, log_id)
+                                < (before_ts, COALESCE(before_id, '00000000-0000-0000-0000-000000000000')))
+      AND (levels IS NULL OR log_level = ANY (levels))
+      AND (server IS NULL OR server_id = server)
+    ORDER BY log_timestamp DESC, log_id DESC
+    LIMIT page_size;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION recent_access_page(before_ts TIMESTAMPTZ DEFAULT NULL, before_id UUID DEFAULT NULL,
+                                              access_types access_type_enum[] DEFAULT NULL,
+                                              server UUID DEFAULT NULL, page_size INTEGER DEFAULT 100)
+RETURNS SETOF user_access_logs AS $$
+    SELECT * FROM user_access_logs
+    WHERE "timestamp" IS NOT NULL
+      AND (before_ts IS NULL OR ("timestamp", access_id)
+                                < (before_ts, COALESCE(before_id, '00000000-0000-0000-0000-000000000000')))
+      AND (access_types IS NULL OR access_type = ANY (access_types))
+      AND (server IS NULL OR server_id = server)
+    ORDER BY "timestamp" DESC, access_id DESC
+    LIMIT page_size;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION security_sensitive_page(before_ts TIMESTAMPTZ DEFAULT NULL, before_id UUID DEFAULT NULL,
+                                                   server UUID DEFAULT NULL, page_size INTEGER DEFAULT 100)
+RETURNS SETOF user_access_logs AS $$
+    SELECT * FROM recent_access_page(before_ts, before_id, '{WRITE,DELETE}', server, page_size);
+$$ LANGUAGE sql STABLE;
+
+-- As in 06_functions.sql, returning alert_severity as alert_severity_enum. The columns are
+-- qualified: unqualified they are ambiguous with the OUT parameters of the same name.
+DROP FUNCTION IF EXISTS get_high_severity_alerts();
+CREATE FUNCTION get_high_severity_alerts()
+RETURNS TABLE(alert_id UUID, alert_type VARCHAR, alert_severity alert_severity_enum) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT a.alert_id, a.alert_type, a.alert_severity FROM alert_history a WHERE a.alert_severity = 'CRITICAL';
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE VIEW recent_errors AS
+SELECT * FROM recent_errors_page();
+
+CREATE VIEW recent_access_logs AS
+SELECT access_id, user_id, server_id, access_type, timestamp, access_ip, user_agent
+FROM recent_access_page();
+
+CREATE VIEW security_sensitive_access AS
+SELECT access_id, user_id, server_id, access_type, timestamp, access_ip, user_agent
+FROM security_sensitive_page(page_size => NULL);
+
+DO $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN SELECT * FROM compact_views ORDER BY depth LOOP
+        EXECUTE format('CREATE %s %s AS %s', CASE r.relkind WHEN 'm' THEN 'MATERIALIZED VIEW' ELSE 'VIEW' END,
+                       r.name, r.definition);
+    END LOOP;
+END;
+$$;
+
+
+-- --- Report ---
+SELECT s.table_name,
+       pg_size_pretty(s.bytes_before) AS size_before,
+       pg_size_pretty(relation_bytes(format('public.%I', s.table_name)::regclass)) AS size_after,
+       round(100.0 * (relation_bytes(format('public.%I', s.table_name)::regclass) - s.bytes_before)
+             / NULLIF(s.bytes_before, 0), 1) AS change_pct
+FROM compact_sizes s
+ORDER BY s.bytes_before DESC;
+
+COMMIT;
+
+ANALYZE user_access_logs, application_logs, alert_history, resource_allocation, server_metrics, server_metrics_1m;
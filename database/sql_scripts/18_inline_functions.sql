@@ -0,0 +1,99 @@
+-- 18_inline_functions.sql - Inlinable, time-bounded versions of the 06_functions.sql lookups
+-- get_avg_cpu_usage, calculate_annual_cost, get_high_error_servers and get_downtime_for_server
+-- were plpgsql: every call ran its query as a separate, opaque plan, none of them could be
+-- limited in time, and get_avg_cpu_usage averaged a server's whole raw history. They become
+-- single-statement LANGUAGE sql STABLE PARALLEL SAFE functions that return a set, which the
+-- planner inlines into the calling query when they are used in FROM:
+--   SELECT * FROM get_avg_cpu_usage('<server>', since => now()::TIMESTAMP - INTERVAL '1 day');
+--   SELECT s.server_id, c.* FROM server s CROSS JOIN LATERAL calculate_annual_cost(s.server_id) c;
+-- The arguments then reach the table scans: a filter that is not given drops out, and the
+-- server / time bounds become index conditions and prune server_metrics partitions. Called
+-- in the SELECT list (SELECT get_avg_cpu_usage('<server>')) they still return one value, just
+-- without inlining.
+-- Every function takes an optional window since <= t < until (NULL: unbounded) and reads the
+-- rollups where they hold the answer:
+--   get_avg_cpu_usage        average of the hourly averages: aggregated_metrics for the hours
+--                            the rollup has passed (whole hours), the raw server_metrics for the
+--                            rest (11_rollup_aggregated_metrics.sql)
+--   calculate_annual_cost    12 x the monthly costs; cost_totals when there is no window
+--                            (15_summary_totals.sql), cost_data rows in the window otherwise
+--   get_high_error_servers   hours above the threshold, from aggregated_metrics, newest first;
+--                            now also returns the hour
+--   get_downtime_for_server  downtimes overlapping the window (still open ones included), newest first
+-- function_benchmark.py (cloud_setup/cloud_vm_data_extraction) compares the plans with the
+-- 06_functions.sql versions.
+
+BEGIN;
+
+-- (server_id, start_time) serves the downtime window; it replaces the server_id index.
+CREATE INDEX IF NOT EXISTS idx_downtime_logs_server_start ON downtime_logs (server_id, start_time DESC);
+DROP INDEX IF EXISTS idx_downtime_server;
+
+-- Argument lists and return types change, so the plpgsql versions are dropped first.
+DROP FUNCTION IF EXISTS get_avg_cpu_usage(UUID);
+DROP FUNCTION IF EXISTS calculate_annual_cost(UUID);
+DROP FUNCTION IF EXISTS get_high_error_servers(DECIMAL);
+DROP FUNCTION IF EXISTS get_downtime_for_server(UUID);
+
+
+CREATE OR REPLACE FUNCTION get_avg_cpu_usage(server UUID, since TIMESTAMP DEFAULT NULL, until TIMESTAMP DEFAULT NULL)
+RETURNS TABLE(avg_cpu_usage DOUBLE PRECISION) AS $$
+    SELECT avg(h.cpu_usage)
+    FROM (
+        SELECT a.hourly_avg_cpu_usage::DOUBLE PRECISION AS cpu_usage
+        FROM aggregated_metrics a
+        WHERE a.server_id = server
+          AND (since IS NULL OR a."timestamp" >= date_trunc('hour', since))
+          AND (until IS NULL OR a."timestamp" < until)
+          AND a."timestamp" < (SELECT COALESCE(max(w.rolled_up_to), '-infinity') FROM rollup_watermark w
+                               WHERE w.source_table = 'server_metrics')
+        UNION ALL
+        SELECT avg(m.cpu_usage)
+        FROM server_metrics m
+        WHERE m.server_id = server
+          AND m."timestamp" >= GREATEST(since, (SELECT COALESCE(max(w.rolled_up_to), '-infinity')
+                                                FROM rollup_watermark w WHERE w.source_table = 'server_metrics'))
+          AND (until IS NULL OR m."timestamp" < until)
+        GROUP BY date_trunc('hour', m."timestamp")
+    ) h;
+$$ LANGUAGE sql STABLE PARALLEL SAFE;
+
+
+CREATE OR REPLACE FUNCTION calculate_annual_cost(server UUID, since TIMESTAMP DEFAULT NULL, until TIMESTAMP DEFAULT NULL)
+RETURNS TABLE(annual_cost DECIMAL(10,2)) AS $$
+    SELECT (CASE WHEN since IS NULL AND until IS NULL
+                 THEN (SELECT t.total_cost FROM cost_totals t WHERE t.server_id = server)
+                 ELSE (SELECT sum(c.total_monthly_cost) FROM cost_data c
+                       WHERE c.server_id = server
+                         AND (since IS NULL OR c."timestamp" >= since)
+                         AND (until IS NULL OR c."timestamp" < until))
+            END * 12)::DECIMAL(10,2);
+$$ LANGUAGE sql STABLE PARALLEL SAFE;
+
+
+CREATE OR REPLACE FUNCTION get_high_error_servers(threshold DECIMAL(5,2), since TIMESTAMP DEFAULT NULL,
+                                                  until TIMESTAMP DEFAULT NULL)
+RETURNS TABLE(server_id UUID, error_rate DECIMAL(5,2), hour TIMESTAMP) AS $$
+    SELECT a.server_id, a.error_rate, a."timestamp"
+    FROM aggregated_metrics a
+    WHERE a.error_rate > threshold
+      AND (since IS NULL OR a."timestamp" >= since)
+      AND (until IS NULL OR a."timestamp" < until)
+    ORDER BY a."timestamp" DESC, a.server_id;
+$$ LANGUAGE sql STABLE PARALLEL SAFE;
+
+
+CREATE OR REPLACE FUNCTION get_downtime_for_server(p_server_id UUID, since TIMESTAMP DEFAULT NULL,
+                                                   until TIMESTAMP DEFAULT NULL)
+RETURNS TABLE(start_time TIMESTAMP, end_time TIMESTAMP, downtime_cause VARCHAR(255), downtime_duration_minutes INTEGER) AS $$
+    SELECT d.start_time, d.end_time, d.downtime_cause, d.downtime_duration_minutes
+    FROM downtime_logs d
+    WHERE d.server_id = p_server_id
+      AND (until IS NULL OR d.start_time < until)
+      AND (since IS NULL OR d.end_time IS NULL OR d.end_time > since)
+    ORDER BY d.start_time DESC;
+$$ LANGUAGE sql STABLE PARALLEL SAFE;
+
+COMMIT;
+
+ANALYZE downtime_logs;
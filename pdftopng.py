@@ -1,53 +1,307 @@
+"""
+Convert every page of one or more PDFs to JPEGs under a size target.
+Pages are rendered in a process pool; each worker takes a run of consecutive pages
+and finds the highest JPEG quality that fits the target by binary search, starting
+from the quality the previous page needed (neighbouring pages usually need the
+same one), so most pages take two or three encodes instead of up to eighteen.
+
+Memory is bounded: a page is one pixmap, wrapped by PIL without a copy, and every
+encode goes into one of two fixed target-sized buffers per worker (an encode that
+outgrows the target is abandoned as soon as it does). The worker count is capped
+so that workers x (page + overhead) stays under --max-memory (default: half the
+available memory), and a page too big for its worker's share is rendered at a
+lower DPI. Pages whose JPEG is newer than the PDF are skipped, so re-running on
+a folder only converts new or changed PDFs (--force redoes everything).
+
+python pdftopng.py                                     (pick a folder in a dialog)
+python pdftopng.py docs/architecture --dpi 150 --target-size 500000 --workers 8
+python pdftopng.py a.pdf b.pdf --output out/ --max-memory 2000
+"""
+
+import argparse
+import math
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from PIL import Image
+
 import fitz  # PyMuPDF
-import tkinter as tk
-from tkinter import filedialog
-import io
-
-def compress_image_to_target_size(img, out_path, target_size=1_000_000, min_quality=10):
-    """Compress and save image as JPEG, reducing quality until under target_size bytes."""
-    quality = 95
-    step = 5
-    img = img.convert("RGB")
-    while quality >= min_quality:
-        buffer = io.BytesIO()
+from PIL import Image
+
+TARGET_SIZE = 1_000_000
+MIN_QUALITY = 10
+MAX_QUALITY = 95
+DPI = 72
+PAGES_PER_JOB = 8
+# Per-worker memory model: interpreter + MuPDF + PIL, plus per rendered pixel the
+# RGB pixmap (3 bytes) and libjpeg's optimize=True working buffers (measured ~6-7 bytes).
+WORKER_OVERHEAD = 80 << 20
+BYTES_PER_PIXEL = 10
+MEMORY_FRACTION = 0.5
+
+_buffers = None
+
+
+class TooLarge(Exception):
+    pass
+
+class EncodeBuffer:
+    """Reusable fixed-capacity write target; a write past capacity raises TooLarge."""
+
+    def __init__(self, capacity):
+        self.data = bytearray(capacity)
+        self.size = 0
+
+    def write(self, chunk):
+        end = self.size + len(chunk)
+        if end > len(self.data):
+            raise TooLarge
+        self.data[self.size:end] = chunk
+        self.size = end
+        return len(chunk)
+
+    def view(self):
+        return memoryview(self.data)[:self.size]
+
+def encode_buffers(target_size):
+    """This process's [probe, best] buffers, allocated once per target size."""
+    global _buffers
+    if _buffers is None or len(_buffers[0].data) != target_size:
+        _buffers = [EncodeBuffer(target_size), EncodeBuffer(target_size)]
+    return _buffers
+
+def encode(img, quality, buffer):
+    """JPEG-encode into buffer; False (with the encode cut short) if it doesn't fit."""
+    buffer.size = 0
+    try:
         img.save(buffer, format="JPEG", quality=quality, optimize=True)
-        size = buffer.tell()
-        if size <= target_size:
-            with open(out_path, "wb") as f:
-                f.write(buffer.getvalue())
-            return
-        quality -= step
-    # If can't reach target size, save with lowest quality
-    img.save(out_path, format="JPEG", quality=min_quality, optimize=True)
+    except TooLarge:
+        return False
+    return True
+
+def write_atomic(out_path, write):
+    """Write via a temp file, so a crash never leaves a partial JPEG that looks up to date."""
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, out_path)
+
+def compress_image_to_target_size(img, out_path, target_size=TARGET_SIZE, min_quality=MIN_QUALITY,
+                                  max_quality=MAX_QUALITY, start_quality=None):
+    """Save img as the highest-quality JPEG within target_size bytes; returns (quality, encodes).
+
+    Probes start_quality (e.g. the previous page's result, default max_quality), gallops
+    up or down from it until the answer is bracketed, then binary-searches the bracket.
+    If even min_quality is too big the image is saved at min_quality anyway.
+    """
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    buffers = encode_buffers(target_size)
+    best, encodes = None, 0
+
+    def fits(quality):
+        nonlocal best, encodes
+        encodes += 1
+        if not encode(img, quality, buffers[0]):
+            return False
+        if best is None or quality > best:
+            best = quality
+            buffers.reverse()  # the probe buffer now holds the best encode
+        return True
+
+    # Invariant: lo fits (or is min_quality - 1), hi doesn't (or is max_quality + 1).
+    quality = min(max(start_quality or max_quality, min_quality), max_quality)
+    step = 1
+    if fits(quality):
+        lo, hi = quality, max_quality + 1
+        while lo + step < hi and fits(lo + step):
+            lo += step
+            step *= 2
+        hi = min(hi, lo + step)
+    else:
+        lo, hi = min_quality - 1, quality
+        while hi - step > lo and not fits(hi - step):
+            hi -= step
+            step *= 2
+        lo = max(lo, hi - step)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid
+    if best is None:
+        write_atomic(out_path, lambda f: img.save(f, format="JPEG", quality=min_quality, optimize=True))
+        return min_quality, encodes + 1
+    write_atomic(out_path, lambda f: f.write(buffers[1].view()))
+    return best, encodes
 
-def pdfs_to_jpgs(folder):
-    folder = Path(folder)
-    pdf_files = list(folder.glob("*.pdf"))
+def page_out_path(pdf_path, page_num, output=None):
+    folder = Path(output) if output else pdf_path.parent
+    return folder / (pdf_path.with_suffix('').name + f"_page_{page_num + 1}.jpg")
+
+def page_pixels(rect, dpi):
+    return math.ceil(rect.width * dpi / 72) * math.ceil(rect.height * dpi / 72)
+
+def page_cost(rect, dpi, target_size):
+    """Bytes a worker needs to render and encode a page of rect (points) at dpi."""
+    return page_pixels(rect, dpi) * BYTES_PER_PIXEL + 2 * target_size
+
+def page_dpi(rect, dpi, target_size, page_budget):
+    """dpi, lowered just enough for the page to fit page_budget bytes (None: no limit)."""
+    if page_budget is None or page_cost(rect, dpi, target_size) <= page_budget:
+        return dpi
+    allowed = max(page_budget - 2 * target_size, 0) / BYTES_PER_PIXEL
+    return max(1, int(dpi * math.sqrt(allowed / page_pixels(rect, dpi))))
+
+def convert_pages(pdf_path, first, last, output, dpi, target_size, min_quality, max_quality, page_budget=None):
+    """Worker: render pages [first, last) of one PDF; returns [(page, quality, encodes, bytes, dpi)]."""
+    results, quality = [], None
+    with fitz.open(str(pdf_path)) as doc:
+        for page_num in range(first, last):
+            page = doc.load_page(page_num)
+            render_dpi = page_dpi(page.rect, dpi, target_size, page_budget)
+            pix = page.get_pixmap(dpi=render_dpi)
+            # Wraps the pixmap's samples in place; pix must stay alive while img is used.
+            img = Image.frombuffer("RGB", (pix.width, pix.height), pix.samples_mv, "raw", "RGB", pix.stride, 1)
+            out_path = page_out_path(pdf_path, page_num, output)
+            quality, encodes = compress_image_to_target_size(img, out_path, target_size, min_quality,
+                                                             max_quality, quality)
+            results.append((page_num, quality, encodes, out_path.stat().st_size, render_dpi))
+            # Release this page (and MuPDF's cached fonts/images) before rendering the next.
+            del img, pix, page
+            fitz.TOOLS.store_shrink(100)
+    return results
+
+def find_pdfs(paths):
+    pdfs = []
+    for path in map(Path, paths):
+        pdfs.extend(sorted(path.glob("*.pdf")) if path.is_dir() else [path])
+    return pdfs
+
+def pending_pages(pdf_path, output, force=False):
+    """(page count, largest page rect, pages whose JPEG is missing or older than the PDF)."""
+    pdf_mtime = pdf_path.stat().st_mtime
+    with fitz.open(str(pdf_path)) as doc:
+        pages = len(doc)
+        rects = [doc.page_cropbox(n) for n in range(pages)]
+    pending = []
+    for page_num in range(pages):
+        out_path = page_out_path(pdf_path, page_num, output)
+        if force or not out_path.exists() or out_path.stat().st_mtime < pdf_mtime:
+            pending.append(page_num)
+    largest = max(rects, key=lambda r: r.width * r.height) if rects else None
+    return pages, largest, pending
+
+def page_runs(pending, pages_per_job):
+    """Split sorted page numbers into runs of consecutive pages, at most pages_per_job long."""
+    runs = []
+    for page_num in pending:
+        if runs and runs[-1][1] == page_num and runs[-1][1] - runs[-1][0] < pages_per_job:
+            runs[-1][1] += 1
+        else:
+            runs.append([page_num, page_num + 1])
+    return runs
+
+def available_memory():
+    """MemAvailable in bytes (Linux), or None when unknown."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def plan_memory(max_memory, workers, largest_cost):
+    """(workers, per-page budget) keeping workers x (WORKER_OVERHEAD + page) under max_memory."""
+    if max_memory is None:
+        return workers, None
+    if max_memory <= WORKER_OVERHEAD:
+        raise SystemExit(f"--max-memory must be above {WORKER_OVERHEAD >> 20} MB per worker")
+    workers = max(1, min(workers, max_memory // (WORKER_OVERHEAD + largest_cost)))
+    return workers, max_memory // workers - WORKER_OVERHEAD
+
+def pdfs_to_jpgs(paths, output=None, dpi=DPI, target_size=TARGET_SIZE, min_quality=MIN_QUALITY,
+                 max_quality=MAX_QUALITY, workers=None, pages_per_job=PAGES_PER_JOB, max_memory=None,
+                 force=False):
+    pdf_files = find_pdfs([paths] if isinstance(paths, (str, Path)) else paths)
     if not pdf_files:
         print("No PDF files found.")
         return
+    if output:
+        Path(output).mkdir(parents=True, exist_ok=True)
 
+    jobs, largest_cost, skipped = [], 0, 0
     for pdf_path in pdf_files:
-        print(f"Converting: {pdf_path.name}")
-        doc = fitz.open(str(pdf_path))
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            pix = page.get_pixmap()
-            out_name = pdf_path.with_suffix('').name + f"_page_{page_num+1}.jpg"
-            out_path = folder / out_name
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            compress_image_to_target_size(img, out_path)
-            print(f"Saved: {out_path} (<=1MB)")
-        doc.close()
+        pages, largest, pending = pending_pages(pdf_path, output, force)
+        skipped += pages - len(pending)
+        if not pending:
+            print(f"Up to date: {pdf_path.name} ({pages} pages)")
+            continue
+        print(f"Converting: {pdf_path.name} ({len(pending)} of {pages} pages)")
+        largest_cost = max(largest_cost, page_cost(largest, dpi, target_size))
+        jobs += [(pdf_path, first, last) for first, last in page_runs(pending, pages_per_job)]
+    if not jobs:
+        print(f"Nothing to convert ({skipped} pages up to date).")
+        return
+
+    if max_memory is None and available_memory():
+        max_memory = int(available_memory() * MEMORY_FRACTION)
+    workers, page_budget = plan_memory(max_memory, min(workers or os.cpu_count(), len(jobs)), largest_cost)
+    if max_memory:
+        print(f"Using {workers} workers within {max_memory >> 20:,} MB")
+
+    started = time.monotonic()
+    total_pages = total_encodes = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(convert_pages, pdf, first, last, output, dpi, target_size, min_quality,
+                               max_quality, page_budget): pdf for pdf, first, last in jobs}
+        for future in as_completed(futures):
+            pdf_path = futures[future]
+            for page_num, quality, encodes, size, render_dpi in future.result():
+                total_pages += 1
+                total_encodes += encodes
+                note = f", rendered at {render_dpi} dpi to fit memory" if render_dpi != dpi else ""
+                print(f"Saved: {page_out_path(pdf_path, page_num, output)} "
+                      f"(quality {quality}, {size / 1000:,.0f} KB, {encodes} encodes{note})")
+    elapsed = time.monotonic() - started
+    print(f"Converted {total_pages} pages from {len(pdf_files)} PDFs in {elapsed:.1f}s "
+          f"({total_encodes / max(total_pages, 1):.1f} encodes per page, {skipped} pages up to date)")
+
+def choose_folder():
+    import tkinter as tk
+    from tkinter import filedialog
 
-if __name__ == "__main__":
     root = tk.Tk()
     root.withdraw()
-    selected_folder = filedialog.askdirectory(title="Select folder with PDFs")
-    if selected_folder:
-        pdfs_to_jpgs(selected_folder)
-    else:
-        print("No folder selected.")
\ No newline at end of file
+    return filedialog.askdirectory(title="Select folder with PDFs")
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert PDF pages to size-capped JPEGs.")
+    parser.add_argument("paths", nargs="*", help="PDF files or folders (none: pick a folder in a dialog)")
+    parser.add_argument("--output", help="folder for the JPEGs (default: next to each PDF)")
+    parser.add_argument("--dpi", type=int, default=DPI, help="render resolution")
+    parser.add_argument("--target-size", type=int, default=TARGET_SIZE, help="max bytes per JPEG")
+    parser.add_argument("--min-quality", type=int, default=MIN_QUALITY)
+    parser.add_argument("--max-quality", type=int, default=MAX_QUALITY)
+    parser.add_argument("--workers", type=int, help="render processes (default: CPU count)")
+    parser.add_argument("--max-memory", type=int,
+                        help="MB all workers may use together (default: half the available memory)")
+    parser.add_argument("--force", action="store_true", help="reconvert pages whose JPEG is up to date")
+    args = parser.parse_args()
+
+    paths = args.paths
+    if not paths:
+        selected_folder = choose_folder()
+        if not selected_folder:
+            print("No folder selected.")
+            return
+        paths = [selected_folder]
+    max_memory = args.max_memory << 20 if args.max_memory else None
+    pdfs_to_jpgs(paths, args.output, args.dpi, args.target_size, args.min_quality, args.max_quality, args.workers,
+                 max_memory=max_memory, force=args.force)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,28 @@
-import csv
-import random
+"""
+Customer-like mock CSV generator (id, first_name, last_name, email, age, city).
+Rows are generated in vectorized chunks of --chunk-rows: numpy picks an index per
+row into a pre-rendered pool of every name/email/age/city combination, so a row
+costs one lookup plus its id. Chunks are rendered (and gzip-compressed) in parallel
+worker processes and written in order through a large buffered file, so big runs
+are limited by disk, not CPU. At most two chunks per worker are in flight, so memory
+stays flat when the disk is the bottleneck. Each chunk has its own seed, so a given
+--seed gives the same file whatever --workers is.
+
+python db_mock_data_generator.py                                   (100 rows -> database_mock_data.csv)
+python db_mock_data_generator.py --rows 100000000 --seed 42 --output data/customers.csv.gz
+python db_mock_data_generator.py --rows 100000000 --shards 16 --output data/customers.csv
+"""
+
+import argparse
+import gzip
+import math
 import os
+import time
+from collections import deque
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
 
 #mock data pool
 first_names = [
@@ -18,31 +40,113 @@ cities = [
     "Phoenix", "Philadelphia", "Dallas", "San Diego", "San Jose", "Orlando", "Atlanta", "Detroit", "Portland",
     "Las Vegas"
 ]
-#define the file location before opening it
 
-folder_path = "C:/Users/burha/Desktop/Python Files"  #absolute path
-file_name = "database_mock_data.csv"
+AGE_MIN, AGE_MAX = 16, 81
+HEADER = "id,first_name,last_name,email,age,city\n"
+DEFAULT_OUTPUT = "database_mock_data.csv"
+CHUNK_ROWS = 1_000_000
+WRITE_BUFFER = 16 << 20
+
+_tails = None
+
+
+def row_tails():
+    """Every 'first,last,email,age,city' combination, built once per process."""
+    global _tails
+    if _tails is None:
+        _tails = np.array([
+            f"{first},{last},{first.lower()}.{last.lower()}@mockmail.com,{age},{city}"
+            for first in first_names for last in last_names
+            for age in range(AGE_MIN, AGE_MAX + 1) for city in cities
+        ], dtype=object)
+    return _tails
+
+def render_chunk(job):
+    """CSV bytes for rows [start, stop), gzip-compressed when asked (gzip members concatenate)."""
+    seed, index, start, stop, compress = job
+    rng = np.random.default_rng([seed, index])
+    tails = row_tails()
+    # first/last/age/city are drawn independently, like random.choice per column
+    picks = (((rng.integers(0, len(first_names), stop - start) * len(last_names)
+               + rng.integers(0, len(last_names), stop - start)) * (AGE_MAX - AGE_MIN + 1)
+              + rng.integers(0, AGE_MAX - AGE_MIN + 1, stop - start)) * len(cities)
+             + rng.integers(0, len(cities), stop - start))
+    text = "\n".join([f"{i},{t}" for i, t in zip(range(start, stop), tails[picks].tolist())]) + "\n"
+    data = text.encode()
+    return gzip.compress(data, compresslevel=1) if compress else data
 
-if not os.path.exists(folder_path):
-    os.makedirs(folder_path)
+def shard_paths(output, shards):
+    path = Path(output)
+    if shards == 1:
+        return [path]
+    suffixes = "".join(path.suffixes)
+    stem = path.name[:len(path.name) - len(suffixes)] if suffixes else path.name
+    return [path.with_name(f"{stem}-{i:05d}-of-{shards:05d}{suffixes}") for i in range(shards)]
 
-file_path = os.path.join(folder_path, file_name)
-print (file_path)
+def plan(rows, shards, chunk_rows):
+    """[(path, [(start, stop), ...])] - ids run from 1, shards split them evenly."""
+    per_shard = math.ceil(rows / shards)
+    out = []
+    for shard in range(shards):
+        first, last = 1 + shard * per_shard, min(rows, (shard + 1) * per_shard) + 1
+        out.append([(s, min(s + chunk_rows, last)) for s in range(first, last, chunk_rows)])
+    return out
 
+def bounded_imap(pool, fn, jobs, in_flight):
+    """Like pool.imap, but with at most `in_flight` jobs submitted and not yet consumed, so
+    rendered chunks can't pile up in memory when writing is slower than rendering."""
+    pending = deque()
+    for job in jobs:
+        if len(pending) >= in_flight:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(fn, (job,)))
+    while pending:
+        yield pending.popleft().get()
 
-#open csv file
+def generate(rows, output, seed=None, chunk_rows=CHUNK_ROWS, shards=1, compress=None, workers=None):
+    seed = seed if seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+    compress = str(output).endswith(".gz") if compress is None else compress
+    paths = shard_paths(output, shards)
+    chunks = plan(rows, shards, chunk_rows)
+    jobs, index = [], 0
+    for shard_chunks in chunks:
+        for start, stop in shard_chunks:
+            jobs.append((seed, index, start, stop, compress))
+            index += 1
+    header = gzip.compress(HEADER.encode()) if compress else HEADER.encode()
 
-with open(file_name, "w", newline="") as ezzy:
-    writer = csv.writer(ezzy)
-    writer.writerow(["id", "first_name", "last_name", "email", "age", "city"])  #Header Row
+    started = time.monotonic()
+    written = 0
+    workers = workers or os.cpu_count()
+    with Pool(workers) as pool:
+        results = bounded_imap(pool, render_chunk, jobs, 2 * workers)
+        for path, shard_chunks in zip(paths, chunks):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "wb", buffering=WRITE_BUFFER) as f:
+                f.write(header)
+                for _ in shard_chunks:
+                    data = next(results)
+                    f.write(data)
+                    written += len(data)
+    elapsed = time.monotonic() - started
+    print(f"Wrote {rows:,} rows ({written / 1e6:,.1f} MB) to {len(paths)} file(s) in {elapsed:.1f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/s), seed {seed}")
+    return paths
 
-    for i in range(1, 101):
-        first_name = random.choice(first_names)
-        last_name = random.choice(last_names)
-        email = f"{first_name.lower()}.{last_name.lower()}@mockmail.com"
-        age = random.randint(16, 81)
-        city = random.choice(cities)
-        writer.writerow([i, first_name, last_name, email, age, city])
+def main():
+    parser = argparse.ArgumentParser(description="Generate customer-like mock CSV data.")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--seed", type=int, help="random seed (default: random, printed at the end)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows generated per chunk")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="output file; a .gz suffix compresses")
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress even without a .gz suffix")
+    parser.add_argument("--shards", type=int, default=1, help="split into this many files, each with a header")
+    parser.add_argument("--workers", type=int, help="rendering processes (default: CPU count)")
+    args = parser.parse_args()
+    paths = generate(args.rows, args.output, args.seed, args.chunk_rows, args.shards,
+                     True if args.gzip else None, args.workers)
+    print(f"Mock data file '{paths[0]}' created successfully!" if len(paths) == 1 else
+          f"Mock data shards '{paths[0]}' .. '{paths[-1]}' created successfully!")
 
-print("Mock data file 'database_mock_data.csv' created successfully, Burhanuddin!")
-print("Current Working Directory:", os.getcwd())
+if __name__ == "__main__":
+    main()